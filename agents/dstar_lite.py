@@ -0,0 +1,230 @@
+import heapq
+
+INF = float('inf')
+
+
+class DStarLite:
+    """
+    Planejador incremental D* Lite para grades 4-conectadas de custo unitário.
+
+    A busca é feita dos objetivos para o agente e o estado (g, rhs e fila de
+    prioridade) é mantido entre chamadas. Quando o agente anda, quando um
+    obstáculo novo é descoberto ou quando objetivos entram e saem do
+    conjunto, apenas os vértices afetados são reparados, sem refazer a busca.
+
+    Células desconhecidas contam como livres (hipótese de espaço livre). A
+    busca fica restrita a uma região retangular, que pode crescer com
+    `set_region` à medida que o mapa conhecido aumenta.
+    """
+
+    def __init__(self, start, goals, blocked, region):
+        """
+        Args:
+            start: Posição atual do agente (y, x)
+            goals: Coleção de posições objetivo
+            blocked: Conjunto de posições bloqueadas (compartilhado, não copiado)
+            region: Retângulo (min_y, max_y, min_x, max_x) da busca
+        """
+
+        self.start = start
+        self.last = start
+        self.km = 0
+        self.blocked = blocked
+        self.region = region
+        self.goals = set()
+        self.g = {}
+        self.rhs = {}
+        self.queue = []
+        self.open = {}  # {posição: chave} dos vértices na fila
+        self.expanded = 0
+        for goal in goals:
+            self.add_goal(goal)
+
+    def _h(self, pos):
+        """Heurística Manhattan de `pos` até a posição atual do agente."""
+
+        return abs(pos[0] - self.start[0]) + abs(pos[1] - self.start[1])
+
+    def _key(self, pos):
+        best = min(self.g.get(pos, INF), self.rhs.get(pos, INF))
+        return (best + self._h(pos) + self.km, best)
+
+    def _inside(self, pos):
+        min_y, max_y, min_x, max_x = self.region
+        return min_y <= pos[0] <= max_y and min_x <= pos[1] <= max_x
+
+    def _neighbors(self, pos):
+        y, x = pos
+        for nxt in ((y-1, x), (y+1, x), (y, x-1), (y, x+1)):
+            if self._inside(nxt):
+                yield nxt
+
+    def _update_vertex(self, pos):
+        """Recalcula rhs de `pos` e ajusta sua presença na fila."""
+
+        if pos not in self.goals:
+            if pos in self.blocked or not self._inside(pos):
+                best = INF
+            else:
+                g = self.g
+                best = INF
+                for nxt in self._neighbors(pos):
+                    if nxt not in self.blocked:
+                        cost = g.get(nxt, INF) + 1
+                        if cost < best:
+                            best = cost
+            if best == INF:
+                self.rhs.pop(pos, None)
+            else:
+                self.rhs[pos] = best
+        if self.g.get(pos, INF) != self.rhs.get(pos, INF):
+            key = self._key(pos)
+            self.open[pos] = key
+            heapq.heappush(self.queue, (key, pos))
+        else:
+            self.open.pop(pos, None)
+
+    def _top_key(self):
+        """Retorna a menor chave válida da fila, descartando entradas obsoletas."""
+
+        queue = self.queue
+        while queue:
+            key, pos = queue[0]
+            if self.open.get(pos) == key:
+                return key
+            heapq.heappop(queue)
+        return (INF, INF)
+
+    def compute(self):
+        """Processa a fila até que o custo da posição atual esteja correto."""
+
+        start = self.start
+        g, rhs = self.g, self.rhs
+        while True:
+            top = self._top_key()
+            start_g = g.get(start, INF)
+            start_rhs = rhs.get(start, INF)
+            if not (top < self._key(start) or start_rhs != start_g):
+                break
+            if top == (INF, INF):
+                break
+            _, pos = heapq.heappop(self.queue)
+            del self.open[pos]
+            new_key = self._key(pos)
+            if top < new_key:
+                self.open[pos] = new_key
+                heapq.heappush(self.queue, (new_key, pos))
+                continue
+            self.expanded += 1
+            if g.get(pos, INF) > rhs.get(pos, INF):
+                g[pos] = rhs[pos]
+                for prev in self._neighbors(pos):
+                    self._update_vertex(prev)
+            else:
+                g.pop(pos, None)
+                self._update_vertex(pos)
+                for prev in self._neighbors(pos):
+                    self._update_vertex(prev)
+
+    def move_start(self, pos):
+        """Informa a nova posição do agente."""
+
+        if pos == self.start:
+            return
+        self.start = pos
+        self.km += abs(self.last[0] - pos[0]) + abs(self.last[1] - pos[1])
+        self.last = pos
+
+    def set_blocked(self, pos):
+        """Informa que `pos` acabou de ser adicionada ao conjunto de bloqueios."""
+
+        self.goals.discard(pos)
+        self._update_vertex(pos)
+        for prev in self._neighbors(pos):
+            self._update_vertex(prev)
+
+    def add_goal(self, pos):
+        """Adiciona um objetivo."""
+
+        if pos in self.goals:
+            return
+        self.goals.add(pos)
+        self.rhs[pos] = 0
+        self._update_vertex(pos)
+
+    def remove_goal(self, pos):
+        """Remove um objetivo (por exemplo, uma célula de fronteira já visitada)."""
+
+        if pos not in self.goals:
+            return
+        self.goals.discard(pos)
+        self._update_vertex(pos)
+
+    def set_region(self, region):
+        """
+        Amplia a região de busca para conter `region` (a região nunca
+        diminui). Os vértices das faixas novas são atualizados; os antigos
+        continuam válidos porque vértices novos ainda não contribuem para
+        nenhum custo.
+        """
+
+        old = self.region
+        o_min_y, o_max_y, o_min_x, o_max_x = old
+        min_y = min(region[0], o_min_y)
+        max_y = max(region[1], o_max_y)
+        min_x = min(region[2], o_min_x)
+        max_x = max(region[3], o_max_x)
+        if (min_y, max_y, min_x, max_x) == old:
+            return
+        self.region = (min_y, max_y, min_x, max_x)
+        for y in range(min_y, max_y + 1):
+            if o_min_y <= y <= o_max_y:
+                xs = [*range(min_x, o_min_x), *range(o_max_x + 1, max_x + 1)]
+            else:
+                xs = range(min_x, max_x + 1)
+            for x in xs:
+                self._update_vertex((y, x))
+
+    def next_step(self):
+        """
+        Retorna o vizinho da posição atual por onde segue o caminho mais
+        curto, ou None se nenhum objetivo é alcançável (ou se o agente já
+        está em um objetivo).
+        """
+
+        if self.start in self.goals:
+            return None
+        self.compute()
+        if self.g.get(self.start, INF) == INF:
+            return None
+        best, best_cost = None, INF
+        for nxt in self._neighbors(self.start):
+            if nxt in self.blocked:
+                continue
+            cost = self.g.get(nxt, INF) + 1
+            if cost < best_cost:
+                best, best_cost = nxt, cost
+        return best
+
+    def path(self):
+        """Reconstrói o caminho completo da posição atual até um objetivo."""
+
+        self.compute()
+        if self.g.get(self.start, INF) == INF and self.start not in self.goals:
+            return None
+        path = [self.start]
+        node = self.start
+        min_y, max_y, min_x, max_x = self.region
+        max_len = (max_y - min_y + 1) * (max_x - min_x + 1)
+        while node not in self.goals:
+            if len(path) > max_len:
+                return None
+            best, best_cost = None, INF
+            for nxt in self._neighbors(node):
+                if nxt not in self.blocked and self.g.get(nxt, INF) < best_cost:
+                    best, best_cost = nxt, self.g.get(nxt, INF)
+            if best is None or best_cost == INF:
+                return None
+            path.append(best)
+            node = best
+        return path
@@ -0,0 +1,248 @@
+import random
+from agents.occupancy_map import OccupancyMap, UNKNOWN, FREE, VISITED, OBSTACLE
+from agents.planners import build_path
+from environment.percept import MOVES, MOVE_BITS, MOVE_DELTAS, MOVES_BY_MASK, percept_parts
+
+DELTA_MOVES = {delta: move for move, delta in MOVE_DELTAS.items()}
+
+
+class FleetCoordinator:
+    """
+    Coordena uma frota de aspiradores com um único mapa compartilhado.
+
+    As percepções de todos os agentes alimentam o mesmo OccupancyMap e o
+    mesmo conjunto de fronteira (células livres conhecidas e ainda não
+    visitadas). Cada célula da fronteira é reservada por no máximo um agente
+    (`claims`), então dois agentes nunca perseguem o mesmo alvo.
+
+    A divisão da fronteira é incremental:
+
+    1. Um agente com vizinho na fronteira ainda livre anda até ele (O(1)).
+    2. Um agente com plano válido continua seguindo o plano.
+    3. Os demais recebem a célula de fronteira livre mais próxima dentro da
+       sua região de Voronoi (ver `_assign`), com uma BFS limitada ao
+       entorno do agente.
+
+    Um agente bloqueado por outro por mais de `patience` passos dá um passo
+    aleatório para uma célula vazia e replaneja, o que desfaz impasses em
+    corredores.
+    """
+
+    def __init__(self, n_agents, rng=None, patience=2):
+        """
+        Args:
+            n_agents: Número de agentes da frota
+            rng: Gerador aleatório (random.Random); usa o módulo random se None
+            patience: Passos bloqueados antes de desviar
+        """
+
+        self.rng = rng if rng is not None else random
+        self.n_agents = n_agents
+        self.patience = patience
+        self.map = OccupancyMap()
+        self.visited = self.map.visited
+        self.frontier = set()
+        self.claims = {}  # célula da fronteira -> agente que a reservou
+        self.targets = [None] * n_agents
+        self.paths = [[] for _ in range(n_agents)]  # invertidos: próximo passo no fim
+        self.waiting = [0] * n_agents  # passos seguidos sem sair do lugar com movimento pendente
+        self.last_actions = [None] * n_agents
+        self.last_positions = [None] * n_agents
+        # Custo da coordenação: buscas feitas e células expandidas
+        self.searches = 0
+        self.expanded = 0
+
+    def select_actions(self, percepts, positions):
+        """
+        Escolhe uma ação por agente.
+
+        Args:
+            percepts: Percepção de cada agente (tupla compacta ou dict)
+            positions: Posição real (y, x) de cada agente no ambiente
+
+        Retorna:
+            Lista de ações (CLEAN, UP, DOWN, LEFT, RIGHT ou None para ficar parado)
+        """
+
+        parts = [percept_parts(percept) for percept in percepts]
+        for i, pos in enumerate(positions):
+            self._observe(pos, parts[i][0])
+        occupied = set(positions)
+        actions = [None] * self.n_agents
+        pending = []
+        for i, pos in enumerate(positions):
+            mask, dirty = parts[i]
+            if self.last_actions[i] in MOVE_BITS and self.last_positions[i] == pos:
+                self.waiting[i] += 1
+            else:
+                self.waiting[i] = 0
+            self.last_positions[i] = pos
+            if dirty:
+                actions[i] = 'CLEAN'
+            elif self.waiting[i] > self.patience:
+                actions[i] = self._detour(i, pos, mask, occupied)
+            else:
+                actions[i] = self._greedy_step(i, pos, mask) or self._follow_path(i, pos, mask)
+                if actions[i] is None and self.frontier:
+                    pending.append(i)
+        for i in pending:
+            self._assign(i, positions)
+            actions[i] = self._follow_path(i, positions[i], parts[i][0])
+        self.last_actions = actions
+        return actions
+
+    def _observe(self, pos, mask):
+        """Integra ao mapa compartilhado a percepção de um agente em `pos`."""
+
+        here, *around = self.map.neighborhood(pos)
+        if here != VISITED:
+            self.map.set(pos, VISITED)
+            self.frontier.discard(pos)
+            owner = self.claims.pop(pos, None)
+            if owner is not None:
+                self._drop_target(owner)
+        y, x = pos
+        for move, state in zip(MOVES, around):
+            if state != UNKNOWN:
+                continue
+            dy, dx = MOVE_DELTAS[move]
+            cell = (y+dy, x+dx)
+            if mask & MOVE_BITS[move]:
+                self.map.set(cell, FREE)
+                self.frontier.add(cell)
+            else:
+                self.map.set(cell, OBSTACLE)
+
+    def _claim(self, i, cell):
+        """Troca o alvo do agente `i` por `cell`."""
+
+        self._release(i)
+        self.targets[i] = cell
+        self.claims[cell] = i
+
+    def _drop_target(self, i):
+        """Descarta o alvo e o plano do agente `i`."""
+
+        self._release(i)
+        self.targets[i] = None
+        self.paths[i] = []
+
+    def _release(self, i):
+        """Libera a reserva do alvo do agente `i` (alvos de ajuda não são reservados)."""
+
+        target = self.targets[i]
+        if target is not None and self.claims.get(target) == i:
+            del self.claims[target]
+
+    def _greedy_step(self, i, pos, mask):
+        """Move para um vizinho da fronteira sem dono, se houver."""
+
+        y, x = pos
+        options = []
+        for move in MOVES_BY_MASK[mask]:
+            dy, dx = MOVE_DELTAS[move]
+            cell = (y+dy, x+dx)
+            if cell in self.frontier and self.claims.get(cell, i) == i:
+                options.append((move, cell))
+        if not options:
+            return None
+        move, cell = self.rng.choice(options)
+        self._claim(i, cell)
+        self.paths[i] = [cell]
+        return move
+
+    def _follow_path(self, i, pos, mask):
+        """Próximo movimento do plano do agente `i`, ou None se não há plano válido."""
+
+        path = self.paths[i]
+        if path and path[-1] == pos:
+            path.pop()
+        if not path or self.targets[i] not in self.frontier:
+            self._drop_target(i)
+            return None
+        ny, nx = path[-1]
+        move = DELTA_MOVES.get((ny - pos[0], nx - pos[1]))
+        if move is None or not mask & MOVE_BITS[move]:
+            self._drop_target(i)
+            return None
+        return move
+
+    def _detour(self, i, pos, mask, occupied):
+        """Passo aleatório para uma célula vazia, descartando o plano atual."""
+
+        self._drop_target(i)
+        self.waiting[i] = 0
+        y, x = pos
+        free = [move for move in MOVES_BY_MASK[mask]
+                if (y + MOVE_DELTAS[move][0], x + MOVE_DELTAS[move][1]) not in occupied]
+        return self.rng.choice(free) if free else None
+
+    def _assign(self, i, positions):
+        """
+        Dá alvo e plano ao agente `i` com uma BFS a partir da posição dele.
+
+        Aceita a primeira célula de fronteira sem dono que está na região de
+        Voronoi do agente: nenhum outro agente chega a ela em menos passos,
+        usando a distância Manhattan dos outros (limite inferior da distância
+        BFS deles). Se a região não tem fronteira livre, fica com a célula
+        disputada mais próxima, e sem nenhuma livre ajuda a mais próxima com
+        dono. A busca termina ao passar do dobro da distância da primeira
+        célula disputada ou com dono, o que limita o custo ao entorno do agente.
+        """
+
+        self.searches += 1
+        start = positions[i]
+        others = [pos for j, pos in enumerate(positions) if j != i]
+        frontier = self.frontier
+        visited = self.visited
+        claims = self.claims
+        saturated = len(claims) >= len(frontier)
+        parents = {start: None}
+        level = [start]
+        contested = helped = None
+        limit = None
+        dist = 0
+        expanded = 0
+        while level and (limit is None or dist < limit):
+            dist += 1
+            next_level = []
+            for current in level:
+                expanded += 1
+                cy, cx = current
+                for cell in ((cy-1, cx), (cy+1, cx), (cy, cx-1), (cy, cx+1)):
+                    if cell in parents:
+                        continue
+                    if cell in frontier:
+                        parents[cell] = current
+                        if cell in claims:
+                            if helped is None:
+                                helped = cell
+                                # Sem fronteira livre em lugar nenhum, não adianta continuar
+                                limit = dist if saturated else (limit or 2 * dist)
+                            continue
+                        y, x = cell
+                        if all(abs(oy - y) + abs(ox - x) >= dist for oy, ox in others):
+                            self.expanded += expanded
+                            self._set_plan(i, build_path(parents, cell))
+                            return
+                        if contested is None:
+                            contested = cell
+                            limit = min(limit or 2 * dist, 2 * dist)
+                    elif cell in visited:
+                        parents[cell] = current
+                        next_level.append(cell)
+            level = next_level
+        self.expanded += expanded
+        if contested is not None:
+            self._set_plan(i, build_path(parents, contested))
+        elif helped is not None:
+            # Toda a fronteira alcançável tem dono: ajuda quem está mais perto dela
+            self._drop_target(i)
+            self.targets[i] = helped
+            self.paths[i] = build_path(parents, helped)[:0:-1]
+
+    def _set_plan(self, i, path):
+        """Reserva o fim de `path` para o agente `i` e adota o caminho como plano."""
+
+        self._claim(i, path[-1])
+        self.paths[i] = path[:0:-1]
@@ -1,5 +1,9 @@
 import random
-from collections import deque
+import time
+from agents.dstar_lite import DStarLite
+from agents.occupancy_map import OccupancyMap, UNKNOWN, FREE, VISITED, OBSTACLE
+from agents.planners import make_planner
+from environment.percept import MOVES, MOVE_BITS, MOVES_BY_MASK, percept_parts
 
 
 class ModelBasedAgent:
@@ -9,16 +13,34 @@ class ModelBasedAgent:
     e retorna à posição inicial quando termina.
     """
     
-    def __init__(self):
+    def __init__(self, rng=None, incremental=True, planner='bfs'):
         """
         Inicializa o modelo interno do agente com mapas e variáveis de controle.
+
+        Args:
+            rng: Gerador aleatório (random.Random); usa o módulo random se None
+            incremental: Se True, repara os planos quando surgem obstáculos:
+                o caminho até a fronteira ganha um desvio local e a volta
+                para (0,0) usa D* Lite; se False, refaz a BFS a cada plano
+                invalidado e não replaneja a volta para casa
+            planner: Planejador de caminho ('bfs', 'astar', 'jps', 'hpa' ou
+                uma instância de agents.planners.Planner)
         """
+        self.rng = rng if rng is not None else random
         self.pos = (0, 0)
-        self.visited = set()
-        self.obstacles = set()
-        self.map = {}  # {(y, x): {'visited': bool, 'obstacle': bool}}
+        self.map = OccupancyMap()  # estado de cada célula conhecida (2 bits)
+        self.visited = self.map.visited  # visões de conjunto sobre o mapa
+        self.obstacles = self.map.obstacles
+        self.frontier = set()  # índice das células FREE do mapa, usado como objetivos
+        self.frontier_path = []  # plano até a fronteira, invertido (próximo passo no fim)
+        self.frontier_path_cells = set()
+        self.frontier_path_broken = False
+        self.incremental = incremental
+        self.home_planner = None
         self.returning_home = False
         self.home_path = []
+        self.planner = make_planner(planner)
+        self.profiler = None  # simulation.instrumentation.Profiler opcional
 
     def select_action(self, percept):
         """
@@ -31,85 +53,238 @@ class ModelBasedAgent:
         4. Retorna à posição inicial (0,0) se não há mais a explorar
         
         Args:
-            percept: Percepção local do ambiente
+            percept: Percepção local do ambiente (dict ou tupla compacta)
             
         Retorna:
             Ação a ser executada (CLEAN, UP, DOWN, LEFT, RIGHT)
         """
-        y, x = self.pos
-        self.visited.add((y, x))
-        self.map[(y, x)] = self.map.get((y, x), {'visited': False, 'obstacle': False})
-        self.map[(y, x)]['visited'] = True
-
-        # Marca obstáculos ao redor
-        for move in ['UP', 'DOWN', 'LEFT', 'RIGHT']:
-            ny, nx = self._get_new_pos(move)
-            if move not in percept['possible_moves']:
-                self.obstacles.add((ny, nx))
-                self.map[(ny, nx)] = self.map.get((ny, nx), {'visited': False, 'obstacle': False})
-                self.map[(ny, nx)]['obstacle'] = True
+        mask, dirty = percept_parts(percept)
+        here, *around = self.map.neighborhood(self.pos)
+        if here != VISITED:
+            self._mark_visited(self.pos)
+
+        # Marca obstáculos ao redor e células livres ainda não visitadas (fronteira)
+        for move, state in zip(MOVES, around):
+            pos = self._get_new_pos(move)
+            if not mask & MOVE_BITS[move]:
+                if state != OBSTACLE:
+                    self._mark_obstacle(pos)
+            elif state == UNKNOWN:
+                self._add_frontier(pos)
 
         # Limpa se estiver sujo
-        if percept['current_dirty']:
+        if dirty:
             return 'CLEAN'
 
         # Movimentos para locais não visitados e não obstáculos
         unvisited_moves = []
-        for move in ['UP', 'DOWN', 'LEFT', 'RIGHT']:
-            ny, nx = self._get_new_pos(move)
-            if move in percept['possible_moves']:
-                if not self.map.get((ny, nx), {'visited': False, 'obstacle': False})['visited'] and not self.map.get((ny, nx), {'visited': False, 'obstacle': False})['obstacle']:
-                    unvisited_moves.append(move)
+        for move in MOVES:
+            if mask & MOVE_BITS[move] and self._get_new_pos(move) in self.frontier:
+                unvisited_moves.append(move)
 
         if unvisited_moves and not self.returning_home:
-            move = random.choice(unvisited_moves)
+            move = self.rng.choice(unvisited_moves)
             self.pos = self._get_new_pos(move)
+            self._clear_frontier_path()
             return move
 
-        # Se não há locais não visitados acessíveis, verifica se há locais não visitados no mapa
-        all_known_positions = set(self.map.keys())
-        not_visited = [pos for pos in all_known_positions if not self.map[pos]['visited'] and not self.map[pos]['obstacle']]
-        if not_visited and not self.returning_home:
-            # Tenta encontrar caminho até algum não visitado
-            path = self._shortest_path(self.pos, not_visited)
-            if path and len(path) > 1:
-                next_pos = path[1]
+        # Se não há locais não visitados acessíveis, segue (ou refaz) o plano até a fronteira
+        if self.frontier and not self.returning_home:
+            next_pos = self._next_frontier_step(mask)
+            if next_pos is not None:
                 move = self._move_to_pos(next_pos)
-                if move and move in percept['possible_moves']:
-                    self.pos = next_pos
-                    return move
+                self.pos = next_pos
+                return move
 
         # Se não há mais locais não visitados, retorna à posição inicial pelo caminho mais curto
-        if not self.returning_home and (not unvisited_moves and not not_visited):
+        if not self.returning_home and (not unvisited_moves and not self.frontier):
             self.returning_home = True
-            self.home_path = self._shortest_path(self.pos, [(0, 0)])
-            if self.home_path and len(self.home_path) > 1:
-                self.home_path = self.home_path[1:]
+            if self.incremental:
+                self.home_planner = DStarLite(self.pos, [(0, 0)], self.obstacles, self._planner_region())
+            else:
+                self.home_path = self._shortest_path(self.pos, [(0, 0)])
+                if self.home_path and len(self.home_path) > 1:
+                    self.home_path = self.home_path[1:]
+
+        if self.returning_home and self.home_planner is not None:
+            next_pos = self._next_planner_step(self.home_planner, mask)
+            if next_pos is not None:
+                move = self._move_to_pos(next_pos)
+                self.pos = next_pos
+                return move
 
         if self.returning_home and self.home_path:
             next_pos = self.home_path[0]
             move = self._move_to_pos(next_pos)
-            if move and move in percept['possible_moves']:
+            if move and mask & MOVE_BITS[move]:
                 self.pos = next_pos
                 self.home_path.pop(0)
                 return move
             else:
                 # Se não pode seguir o caminho, tenta qualquer movimento possível
-                possible = [m for m in percept['possible_moves']]
+                possible = MOVES_BY_MASK[mask]
                 if possible:
-                    move = random.choice(possible)
+                    move = self.rng.choice(possible)
                     self.pos = self._get_new_pos(move)
                     return move
 
         # Se nada mais, faz movimento aleatório permitido
-        possible = [m for m in percept['possible_moves']]
+        possible = MOVES_BY_MASK[mask]
         if possible:
-            move = random.choice(possible)
+            move = self.rng.choice(possible)
             self.pos = self._get_new_pos(move)
             return move
 
         return 'CLEAN'
 
+    def restart_exploration(self):
+        """
+        Recomeça a exploração mantendo os obstáculos conhecidos.
+
+        As células visitadas voltam para a fronteira e o retorno para casa é
+        descartado. Usado na operação contínua, em que a sujeira reaparece em
+        células já limpas e o agente precisa voltar a percorrer o mapa.
+        """
+
+        for pos in self.map.cells(VISITED):
+            self._add_frontier(pos)
+        self._clear_frontier_path()
+        self.frontier_path_broken = False
+        self.returning_home = False
+        self.home_planner = None
+        self.home_path = []
+
+    def _add_frontier(self, pos):
+        """Registra uma célula livre conhecida e ainda não visitada."""
+
+        self.frontier.add(pos)
+        self.map.set(pos, FREE)
+
+    def _mark_visited(self, pos):
+        """Registra no modelo interno que a posição foi visitada."""
+
+        self.map.set(pos, VISITED)
+        self.frontier.discard(pos)
+
+    def _mark_obstacle(self, pos):
+        """Registra no modelo interno um obstáculo (ou limite do ambiente)."""
+
+        if pos in self.obstacles:
+            return
+        self.map.set(pos, OBSTACLE)
+        self.frontier.discard(pos)
+        if pos in self.frontier_path_cells:
+            if self.incremental:
+                self.frontier_path_broken = True
+            else:
+                self._clear_frontier_path()
+        self.planner.notify_blocked(pos)
+        if self.home_planner is not None:
+            self.home_planner.set_blocked(pos)
+
+    def _next_frontier_step(self, mask):
+        """
+        Retorna a próxima posição do plano até a fronteira.
+
+        O plano é reaproveitado entre passos enquanto continua válido: o alvo
+        ainda está na fronteira, nenhum obstáculo novo apareceu no caminho e
+        o próximo passo é um movimento possível. No modo incremental, um
+        plano cortado por obstáculo ganha um desvio local. Caso contrário, é
+        refeito com uma busca até o conjunto da fronteira.
+
+        Args:
+            mask: Máscara de movimentos possíveis na posição atual
+
+        Retorna:
+            Posição adjacente para onde mover, ou None se não há caminho
+        """
+
+        if self.frontier_path_broken:
+            self.frontier_path_broken = False
+            if not (self.frontier_path and self.frontier_path[0] in self.frontier and self._repair_frontier_path()):
+                self._clear_frontier_path()
+        path = self.frontier_path
+        if not (path and path[0] in self.frontier and self._can_step(path[-1], mask)):
+            found = self._shortest_path(self.pos, self.frontier)
+            if not found or len(found) < 2:
+                self._clear_frontier_path()
+                return None
+            path = found[:0:-1]
+            self.frontier_path = path
+            self.frontier_path_cells = set(path)
+            if not self._can_step(path[-1], mask):
+                self._clear_frontier_path()
+                return None
+        next_pos = path.pop()
+        self.frontier_path_cells.discard(next_pos)
+        return next_pos
+
+    def _repair_frontier_path(self):
+        """
+        Repara o plano até a fronteira depois que um obstáculo novo o cortou.
+
+        Mantém o trecho entre o alvo e o obstáculo mais próximo dele e busca
+        um desvio (BFS) da posição atual até qualquer célula desse trecho, o
+        que em geral explora bem menos que uma busca até toda a fronteira.
+
+        Retorna:
+            True se o plano foi reparado
+        """
+
+        path = self.frontier_path
+        cut = next((i for i, pos in enumerate(path) if pos in self.obstacles), len(path))
+        tail = path[:cut]
+        if not tail:
+            return False
+        detour = self._shortest_path(self.pos, set(tail))
+        if not detour or len(detour) < 2:
+            return False
+        joined = tail.index(detour[-1])
+        self.frontier_path = tail[:joined] + detour[:0:-1]
+        self.frontier_path_cells = set(self.frontier_path)
+        return True
+
+    def _next_planner_step(self, planner, mask):
+        """
+        Sincroniza um planejador D* Lite com a posição e a região atuais e
+        retorna o próximo passo, ou None se não há caminho possível.
+        """
+
+        planner.set_region(self._planner_region())
+        planner.move_start(self.pos)
+        if self.profiler is None:
+            next_pos = planner.next_step()
+        else:
+            expanded = planner.expanded
+            start = time.perf_counter_ns()
+            next_pos = planner.next_step()
+            self.profiler.record('select_action/dstar', start, time.perf_counter_ns())
+            self.profiler.count('dstar.steps')
+            self.profiler.sample('dstar.expanded', planner.expanded - expanded)
+        if next_pos is None or not self._can_step(next_pos, mask):
+            return None
+        return next_pos
+
+    def _planner_region(self):
+        """Região de busca dos planejadores: células conhecidas e (0,0), com margem 1."""
+
+        return self._search_bounds(self.pos, ((0, 0),))
+
+    def _can_step(self, target_pos, mask):
+        """Verifica se `target_pos` é adjacente e alcançável com um movimento possível."""
+
+        y, x = self.pos
+        ty, tx = target_pos
+        if abs(ty - y) + abs(tx - x) != 1:
+            return False
+        return bool(mask & MOVE_BITS[self._move_to_pos(target_pos)])
+
+    def _clear_frontier_path(self):
+        """Descarta o plano atual até a fronteira."""
+
+        self.frontier_path = []
+        self.frontier_path_cells = set()
+
     def _get_new_pos(self, move):
         """
         Calcula nova posição após movimento específico.
@@ -149,32 +324,55 @@ class ModelBasedAgent:
 
     def _shortest_path(self, start, goals):
         """
-        Calcula caminho mais curto da posição atual até qualquer objetivo usando BFS.
-        
+        Calcula caminho mais curto da posição atual até qualquer objetivo
+        com o planejador configurado (BFS por padrão).
+
+        Células desconhecidas contam como livres, mas a busca fica restrita ao
+        retângulo das células conhecidas (mais os objetivos e a origem) com
+        uma margem de uma célula: qualquer caminho que saia dele pode ser
+        trocado por um de mesmo tamanho pela margem, que não tem obstáculos
+        conhecidos.
+
         Args:
             start: Posição inicial
-            goals: Lista de possíveis posições objetivo
+            goals: Coleção de possíveis posições objetivo
 
         Retorna:
             Lista de posições representando o caminho ou None se não houver caminho
         """
 
-        queue = deque()
-        queue.append((start, [start]))
-        visited = set()
-        visited.add(start)
-        while queue:
-            current, path = queue.popleft()
-            if current in goals:
-                return path
-            for move in ['UP', 'DOWN', 'LEFT', 'RIGHT']:
-                ny, nx = self._get_pos_from(current, move)
-                if self.map.get((ny, nx), {'obstacle': False})['obstacle']:
-                    continue
-                if (ny, nx) not in visited:
-                    visited.add((ny, nx))
-                    queue.append(((ny, nx), path + [(ny, nx)]))
-        return None
+        if not isinstance(goals, (set, frozenset)):
+            goals = set(goals)
+        if start in goals:
+            return [start]
+        bounds = self._search_bounds(start, goals)
+        profiler = self.profiler
+        if profiler is None:
+            return self.planner.find_path(start, goals, self.obstacles, bounds)
+        began = time.perf_counter_ns()
+        path = self.planner.find_path(start, goals, self.obstacles, bounds)
+        profiler.record('select_action/plan', began, time.perf_counter_ns())
+        profiler.count(f'plan.{self.planner.name}')
+        profiler.sample('plan.expanded', self.planner.expanded)
+        profiler.sample('plan.path_len', len(path) if path else 0)
+        return path
+
+    def _search_bounds(self, start, goals):
+        """
+        Calcula o retângulo (min_y, max_y, min_x, max_x) em que a busca de
+        caminho acontece: células conhecidas, origem e objetivos, com margem 1.
+        """
+
+        if self.map.bounds is not None:
+            min_y, max_y, min_x, max_x = self.map.bounds
+        else:
+            min_y, max_y, min_x, max_x = start[0], start[0], start[1], start[1]
+        for y, x in (start, *goals):
+            if y < min_y: min_y = y
+            if y > max_y: max_y = y
+            if x < min_x: min_x = x
+            if x > max_x: max_x = x
+        return min_y - 1, max_y + 1, min_x - 1, max_x + 1
 
     def _get_pos_from(self, pos, move):
         """
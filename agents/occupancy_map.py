@@ -0,0 +1,232 @@
+import numpy as np
+
+# Estados de uma célula no mapa de ocupação (2 bits)
+UNKNOWN = 0
+FREE = 1  # livre conhecida, ainda não visitada
+VISITED = 2
+OBSTACLE = 3
+
+# Deslocamento de cada estado dentro do byte, para as 4 células de um byte
+_SHIFTS = np.array([0, 2, 4, 6], dtype=np.uint8)
+
+
+class OccupancyMap:
+    """
+    Mapa de ocupação compacto e expansível, com 2 bits por célula.
+
+    O agente não conhece o tamanho do ambiente, então as coordenadas são
+    relativas a uma origem que se desloca quando o mapa cresce para cima ou
+    para a esquerda. As células ficam em um bytearray (4 por byte, linha a
+    linha): consultas pontuais são feitas em Python puro e consultas sobre o
+    mapa inteiro usam uma visão NumPy do mesmo buffer, sem cópia. Um mapa de
+    1000x1000 ocupa cerca de 250 KB (mais a margem de crescimento).
+    """
+
+    def __init__(self, margin=16):
+        """
+        Args:
+            margin: Margem mínima, em células, alocada em cada direção quando o mapa cresce
+        """
+
+        self.margin = margin
+        self.origin_y = 0
+        self.origin_x = 0  # sempre múltiplo de 4, para copiar linhas byte a byte
+        self.height = 0
+        self.row_bytes = 0
+        self.data = bytearray()
+        self.bounds = None  # (min_y, max_y, min_x, max_x) das células conhecidas
+        self.counts = [0, 0, 0, 0]  # células em cada estado (UNKNOWN só conta as alocadas)
+        self.visited = StateView(self, VISITED)
+        self.obstacles = StateView(self, OBSTACLE)
+
+    def get(self, pos):
+        """
+        Retorna:
+            Estado da célula (UNKNOWN, FREE, VISITED ou OBSTACLE)
+        """
+
+        y = pos[0] - self.origin_y
+        x = pos[1] - self.origin_x
+        if y < 0 or x < 0 or y >= self.height or x >= self.row_bytes << 2:
+            return UNKNOWN
+        return (self.data[y * self.row_bytes + (x >> 2)] >> ((x & 3) << 1)) & 3
+
+    def neighborhood(self, pos):
+        """
+        Lê de uma vez o estado de `pos` e dos quatro vizinhos.
+
+        Retorna:
+            Tupla (centro, cima, baixo, esquerda, direita)
+        """
+
+        y = pos[0] - self.origin_y
+        x = pos[1] - self.origin_x
+        if 0 < y < self.height - 1 and 0 < x < (self.row_bytes << 2) - 1:
+            data = self.data
+            rb = self.row_bytes
+            row = y * rb
+            xb, xs = x >> 2, (x & 3) << 1
+            return (
+                (data[row + xb] >> xs) & 3,
+                (data[row - rb + xb] >> xs) & 3,
+                (data[row + rb + xb] >> xs) & 3,
+                (data[row + ((x - 1) >> 2)] >> (((x - 1) & 3) << 1)) & 3,
+                (data[row + ((x + 1) >> 2)] >> (((x + 1) & 3) << 1)) & 3,
+            )
+        py, px = pos
+        get = self.get
+        return get(pos), get((py-1, px)), get((py+1, px)), get((py, px-1)), get((py, px+1))
+
+    def set(self, pos, state):
+        """
+        Define o estado de uma célula, ampliando o mapa se necessário.
+
+        Retorna:
+            Estado anterior da célula
+        """
+
+        y = pos[0] - self.origin_y
+        x = pos[1] - self.origin_x
+        if y < 0 or x < 0 or y >= self.height or x >= self.row_bytes << 2:
+            self._grow(pos)
+            y = pos[0] - self.origin_y
+            x = pos[1] - self.origin_x
+        index = y * self.row_bytes + (x >> 2)
+        shift = (x & 3) << 1
+        byte = self.data[index]
+        old = (byte >> shift) & 3
+        if old != state:
+            self.data[index] = (byte & ~(3 << shift) & 0xFF) | (state << shift)
+            self.counts[old] -= 1
+            self.counts[state] += 1
+        if state != UNKNOWN:
+            self._extend_bounds(pos)
+        return old
+
+    def _extend_bounds(self, pos):
+        y, x = pos
+        if self.bounds is None:
+            self.bounds = (y, y, x, x)
+            return
+        min_y, max_y, min_x, max_x = self.bounds
+        if y < min_y or y > max_y or x < min_x or x > max_x:
+            self.bounds = (min(min_y, y), max(max_y, y), min(min_x, x), max(max_x, x))
+
+    def _grow(self, pos):
+        """Realoca o buffer para conter `pos`, com margem em todas as direções."""
+
+        y, x = pos
+        # A margem cresce com o mapa, para que o custo das realocações seja amortizado
+        my = max(self.margin, self.height // 2)
+        mx = max(self.margin, self.row_bytes * 2)
+        if self.height == 0:
+            min_y, max_y, min_x, max_x = y - my, y + my, x - mx, x + mx
+        else:
+            min_y = min(self.origin_y, y - my)
+            max_y = max(self.origin_y + self.height - 1, y + my)
+            min_x = min(self.origin_x, x - mx)
+            max_x = max(self.origin_x + (self.row_bytes << 2) - 1, x + mx)
+        min_x -= min_x % 4
+        row_bytes = (max_x - min_x) // 4 + 1
+        height = max_y - min_y + 1
+        data = bytearray(height * row_bytes)
+        if self.height:
+            dy = self.origin_y - min_y
+            dx = (self.origin_x - min_x) >> 2
+            old_rb = self.row_bytes
+            for row in range(self.height):
+                start = (row + dy) * row_bytes + dx
+                data[start:start + old_rb] = self.data[row * old_rb:(row + 1) * old_rb]
+        self.counts[UNKNOWN] += height * (row_bytes << 2) - self.height * (self.row_bytes << 2)
+        self.origin_y, self.origin_x = min_y, min_x
+        self.height, self.row_bytes = height, row_bytes
+        self.data = data
+        self.visited.sync()
+        self.obstacles.sync()
+
+    def state_array(self):
+        """
+        Desempacota o mapa em uma matriz com um estado por célula.
+
+        Retorna:
+            Tupla (array uint8 de forma (altura, largura), (origin_y, origin_x))
+        """
+
+        packed = np.frombuffer(self.data, dtype=np.uint8).reshape(self.height, self.row_bytes)
+        states = (packed[:, :, None] >> _SHIFTS) & 3
+        return states.reshape(self.height, self.row_bytes * 4), (self.origin_y, self.origin_x)
+
+    def _positions(self, mask, origin):
+        ys, xs = np.nonzero(mask)
+        return list(zip((ys + origin[0]).tolist(), (xs + origin[1]).tolist()))
+
+    def cells(self, state):
+        """Lista as posições (y, x) em um estado conhecido (vetorizado)."""
+
+        states, origin = self.state_array()
+        return self._positions(states == state, origin)
+
+    def unknown_adjacent_to(self, state=VISITED):
+        """
+        Lista as células desconhecidas vizinhas (4-conectadas) de alguma célula
+        no estado `state` (vetorizado).
+        """
+
+        states, origin = self.state_array()
+        # Borda extra de células desconhecidas: o mapa pode crescer em qualquer direção
+        padded = np.pad(states, 1)
+        hit = padded == state
+        near = np.zeros_like(hit)
+        near[1:, :] |= hit[:-1, :]
+        near[:-1, :] |= hit[1:, :]
+        near[:, 1:] |= hit[:, :-1]
+        near[:, :-1] |= hit[:, 1:]
+        return self._positions(near & (padded == UNKNOWN), (origin[0] - 1, origin[1] - 1))
+
+    def count(self, state):
+        """Número de células em um estado conhecido."""
+
+        return self.counts[state]
+
+    def nbytes(self):
+        """Memória ocupada pelo buffer das células, em bytes."""
+
+        return len(self.data)
+
+
+class StateView:
+    """
+    Visão de conjunto (somente leitura) das células de um mapa de ocupação
+    em um estado. Pode ser passada onde se espera um conjunto de posições
+    bloqueadas (`pos in view`) e acompanha o mapa mesmo quando ele cresce.
+    """
+
+    def __init__(self, occupancy, state):
+        self.occupancy = occupancy
+        self.state = state
+        self.sync()
+
+    def sync(self):
+        """Copia a geometria e o buffer atuais do mapa (chamado quando ele cresce)."""
+
+        occupancy = self.occupancy
+        self.origin_y = occupancy.origin_y
+        self.origin_x = occupancy.origin_x
+        self.height = occupancy.height
+        self.width = occupancy.row_bytes << 2
+        self.row_bytes = occupancy.row_bytes
+        self.data = occupancy.data
+
+    def __contains__(self, pos):
+        # Chamado no laço interno dos planejadores: sem chamadas auxiliares
+        y = pos[0] - self.origin_y
+        x = pos[1] - self.origin_x
+        if 0 <= y < self.height and 0 <= x < self.width:
+            return (self.data[y * self.row_bytes + (x >> 2)] >> ((x & 3) << 1)) & 3 == self.state
+        return False
+
+    def __len__(self):
+        return self.occupancy.counts[self.state]
+
+    def __iter__(self):
+        return iter(self.occupancy.cells(self.state))
@@ -0,0 +1,526 @@
+import heapq
+import itertools
+from collections import deque
+
+INF = float('inf')
+
+
+class Planner:
+    """
+    Interface dos planejadores de caminho usados pelo ModelBasedAgent.
+
+    `find_path` recebe a origem, o conjunto de objetivos, o conjunto de
+    posições bloqueadas e o retângulo (min_y, max_y, min_x, max_x) em que a
+    busca acontece; células fora dele contam como bloqueadas e as demais
+    desconhecidas contam como livres. `expanded` guarda quantos nós a última
+    busca expandiu.
+    """
+
+    name = None
+
+    def __init__(self):
+        self.expanded = 0
+
+    def find_path(self, start, goals, blocked, bounds):
+        """
+        Retorna:
+            Lista de posições da origem até um objetivo ou None se não houver caminho
+        """
+
+        raise NotImplementedError
+
+    def notify_blocked(self, pos):
+        """Avisa que `pos` passou a ser obstáculo (usado por planejadores com cache)."""
+
+
+def build_path(parents, goal):
+    """Reconstrói o caminho da origem até `goal` seguindo os ponteiros de pai."""
+
+    path = []
+    node = goal
+    while node is not None:
+        path.append(node)
+        node = parents[node]
+    path.reverse()
+    return path
+
+
+def goal_heuristic(goals):
+    """
+    Cria uma heurística admissível e consistente para um conjunto de objetivos:
+    distância Manhattan exata para poucos objetivos e, para muitos, distância
+    até o retângulo que os contém.
+    """
+
+    if len(goals) == 1:
+        (gy, gx), = goals
+        return lambda pos: abs(pos[0] - gy) + abs(pos[1] - gx)
+    if len(goals) <= 8:
+        targets = tuple(goals)
+        return lambda pos: min(abs(pos[0] - gy) + abs(pos[1] - gx) for gy, gx in targets)
+    min_y = min(y for y, _ in goals)
+    max_y = max(y for y, _ in goals)
+    min_x = min(x for _, x in goals)
+    max_x = max(x for _, x in goals)
+
+    def heuristic(pos):
+        y, x = pos
+        dy = min_y - y if y < min_y else (y - max_y if y > max_y else 0)
+        dx = min_x - x if x < min_x else (x - max_x if x > max_x else 0)
+        return dy + dx
+    return heuristic
+
+
+class BFSPlanner(Planner):
+    """Busca em largura limitada, com ponteiros de pai e parada no primeiro objetivo."""
+
+    name = 'bfs'
+
+    def find_path(self, start, goals, blocked, bounds):
+        if start in goals:
+            self.expanded = 0
+            return [start]
+        min_y, max_y, min_x, max_x = bounds
+        parents = {start: None}
+        queue = deque([start])
+        expanded = 0
+        while queue:
+            current = queue.popleft()
+            expanded += 1
+            cy, cx = current
+            for nxt in ((cy-1, cx), (cy+1, cx), (cy, cx-1), (cy, cx+1)):
+                ny, nx = nxt
+                if ny < min_y or ny > max_y or nx < min_x or nx > max_x:
+                    continue
+                if nxt in parents or nxt in blocked:
+                    continue
+                parents[nxt] = current
+                if nxt in goals:
+                    self.expanded = expanded
+                    return build_path(parents, nxt)
+                queue.append(nxt)
+        self.expanded = expanded
+        return None
+
+
+class AStarPlanner(Planner):
+    """A* com heurística Manhattan; em mapas abertos segue quase direto ao objetivo."""
+
+    name = 'astar'
+
+    def find_path(self, start, goals, blocked, bounds):
+        self.expanded = 0
+        if start in goals:
+            return [start]
+        h = goal_heuristic(goals)
+        min_y, max_y, min_x, max_x = bounds
+        g = {start: 0}
+        parents = {start: None}
+        # Empates em f favorecem o nó mais profundo (maior g)
+        heap = [(h(start), 0, start)]
+        expanded = 0
+        while heap:
+            _, neg_g, current = heapq.heappop(heap)
+            cost = -neg_g
+            if cost > g[current]:
+                continue
+            expanded += 1
+            if current in goals:
+                self.expanded = expanded
+                return build_path(parents, current)
+            cy, cx = current
+            cost += 1
+            for nxt in ((cy-1, cx), (cy+1, cx), (cy, cx-1), (cy, cx+1)):
+                ny, nx = nxt
+                if ny < min_y or ny > max_y or nx < min_x or nx > max_x or nxt in blocked:
+                    continue
+                if cost < g.get(nxt, INF):
+                    g[nxt] = cost
+                    parents[nxt] = current
+                    heapq.heappush(heap, (cost + h(nxt), -cost, nxt))
+        self.expanded = expanded
+        return None
+
+
+class JumpPointPlanner(Planner):
+    """
+    Jump point search para grades 4-conectadas de custo uniforme.
+
+    Movimentos horizontais "saltam" em linha reta até um vizinho forçado,
+    um objetivo ou um bloqueio. Movimentos verticais, a cada passo, procuram
+    pontos de salto na horizontal. Só os pontos de salto entram na fila do
+    A*, e o caminho é reconstruído interpolando os trechos retos.
+
+    Com poucos objetivos, as linhas e colunas deles também viram pontos de
+    salto; sem isso, em mapas abertos cada passo vertical varreria a linha
+    inteira até a borda.
+    """
+
+    name = 'jps'
+
+    def find_path(self, start, goals, blocked, bounds):
+        self.expanded = 0
+        if start in goals:
+            return [start]
+        self._goals = goals
+        self._blocked = blocked
+        self._bounds = bounds
+        if len(goals) <= 8:
+            self._goal_rows = {y for y, _ in goals}
+            self._goal_cols = {x for _, x in goals}
+        else:
+            self._goal_rows = self._goal_cols = ()
+        h = goal_heuristic(goals)
+        g = {start: 0}
+        parents = {start: None}
+        heap = [(h(start), 0, start)]
+        expanded = 0
+        while heap:
+            _, neg_g, current = heapq.heappop(heap)
+            cost = -neg_g
+            if cost > g[current]:
+                continue
+            expanded += 1
+            if current in goals:
+                self.expanded = expanded
+                return self._interpolate(build_path(parents, current))
+            for jump in self._successors(current, parents[current]):
+                new_cost = cost + abs(jump[0] - current[0]) + abs(jump[1] - current[1])
+                if new_cost < g.get(jump, INF):
+                    g[jump] = new_cost
+                    parents[jump] = current
+                    heapq.heappush(heap, (new_cost + h(jump), -new_cost, jump))
+        self.expanded = expanded
+        return None
+
+    def _walkable(self, y, x):
+        min_y, max_y, min_x, max_x = self._bounds
+        return min_y <= y <= max_y and min_x <= x <= max_x and (y, x) not in self._blocked
+
+    def _successors(self, node, parent):
+        """Gera os pontos de salto a partir de `node`, podando direções pelo pai."""
+
+        y, x = node
+        if parent is None:
+            directions = ((-1, 0), (1, 0), (0, -1), (0, 1))
+        else:
+            dy = (y > parent[0]) - (y < parent[0])
+            dx = (x > parent[1]) - (x < parent[1])
+            if dx:
+                directions = ((-1, 0), (1, 0), (0, dx))
+            else:
+                directions = ((0, -1), (0, 1), (dy, 0))
+        for dy, dx in directions:
+            jump = self._jump(y, x, dy, dx)
+            if jump is not None:
+                yield jump
+
+    def _jump(self, y, x, dy, dx):
+        """Avança de (y, x) na direção (dy, dx) até encontrar um ponto de salto."""
+
+        if dx:
+            return self._jump_horizontal(y, x, dx)
+        walkable = self._walkable
+        goals = self._goals
+        goal_rows = self._goal_rows
+        horizontal = self._jump_horizontal
+        while True:
+            y += dy
+            if not walkable(y, x):
+                return None
+            if (y, x) in goals or y in goal_rows:
+                return (y, x)
+            if (walkable(y, x-1) and not walkable(y-dy, x-1)) or (walkable(y, x+1) and not walkable(y-dy, x+1)):
+                return (y, x)
+            # Na vertical, é preciso procurar pontos de salto na horizontal
+            if horizontal(y, x, 1) is not None or horizontal(y, x, -1) is not None:
+                return (y, x)
+
+    def _jump_horizontal(self, y, x, dx):
+        """Salto horizontal, o mais frequente; testes de bloqueio feitos em linha."""
+
+        min_y, max_y, min_x, max_x = self._bounds
+        blocked = self._blocked
+        goals = self._goals
+        goal_cols = self._goal_cols
+        up_inside = y - 1 >= min_y
+        down_inside = y + 1 <= max_y
+        while True:
+            x += dx
+            if x < min_x or x > max_x or (y, x) in blocked:
+                return None
+            if (y, x) in goals or x in goal_cols:
+                return (y, x)
+            behind = x - dx
+            if up_inside and (y-1, x) not in blocked and (y-1, behind) in blocked:
+                return (y, x)
+            if down_inside and (y+1, x) not in blocked and (y+1, behind) in blocked:
+                return (y, x)
+
+    def _interpolate(self, jumps):
+        """Expande a sequência de pontos de salto em um caminho célula a célula."""
+
+        path = [jumps[0]]
+        for ty, tx in jumps[1:]:
+            y, x = path[-1]
+            dy = (ty > y) - (ty < y)
+            dx = (tx > x) - (tx < x)
+            while (y, x) != (ty, tx):
+                y += dy
+                x += dx
+                path.append((y, x))
+        return path
+
+
+class HierarchicalPlanner(Planner):
+    """
+    Planejador hierárquico por agrupamento (no estilo HPA*) para mapas grandes.
+
+    O mapa é dividido em clusters de `cluster_size` x `cluster_size` células
+    alinhados às coordenadas absolutas. Entre clusters vizinhos há entradas
+    (uma por trecho livre contínuo da borda) e, dentro de cada cluster, as
+    distâncias e caminhos entre suas entradas ficam em cache. Uma consulta
+    busca no grafo abstrato das entradas e só depois refina o caminho; o
+    resultado é quase ótimo. O cache de um cluster é descartado quando um
+    obstáculo novo aparece nele ou quando a região de busca muda na borda.
+    """
+
+    name = 'hpa'
+
+    def __init__(self, cluster_size=16):
+        super().__init__()
+        self.cluster_size = cluster_size
+        self._cache = {}  # {cluster: (entradas, {entrada: (dist, pais)})}
+        self._bounds = None
+        self._blocked = None
+
+    def notify_blocked(self, pos):
+        """Descarta o cache do cluster de `pos` e dos vizinhos cujas bordas o contêm."""
+
+        c = self.cluster_size
+        y, x = pos
+        for ny, nx in ((y, x), (y-1, x), (y+1, x), (y, x-1), (y, x+1)):
+            self._cache.pop((ny // c, nx // c), None)
+
+    def _sync(self, blocked, bounds):
+        """Invalida clusters afetados por mudança do conjunto bloqueado ou da região."""
+
+        if blocked is not self._blocked:
+            self._cache.clear()
+            self._blocked = blocked
+        if bounds != self._bounds:
+            if self._bounds is not None:
+                c = self.cluster_size
+                for key in list(self._cache):
+                    y0, x0 = key[0] * c, key[1] * c
+                    # Clusters inteiramente dentro das duas regiões continuam válidos
+                    if not (self._fully_inside(y0, x0, self._bounds) and self._fully_inside(y0, x0, bounds)):
+                        del self._cache[key]
+            self._bounds = bounds
+
+    def _fully_inside(self, y0, x0, bounds):
+        c = self.cluster_size
+        min_y, max_y, min_x, max_x = bounds
+        # Inclui a margem de uma célula usada pelas entradas vizinhas
+        return min_y <= y0 - 1 and y0 + c <= max_y and min_x <= x0 - 1 and x0 + c <= max_x
+
+    def _walkable(self, pos):
+        min_y, max_y, min_x, max_x = self._bounds
+        y, x = pos
+        return min_y <= y <= max_y and min_x <= x <= max_x and pos not in self._blocked
+
+    def _cluster_of(self, pos):
+        return (pos[0] // self.cluster_size, pos[1] // self.cluster_size)
+
+    def _cluster_rect(self, cluster):
+        """Retângulo (min_y, max_y, min_x, max_x) do cluster recortado pela região."""
+
+        c = self.cluster_size
+        min_y, max_y, min_x, max_x = self._bounds
+        y0, x0 = cluster[0] * c, cluster[1] * c
+        return max(y0, min_y), min(y0 + c - 1, max_y), max(x0, min_x), min(x0 + c - 1, max_x)
+
+    def _local_bfs(self, cluster, sources):
+        """
+        BFS restrita ao cluster a partir de `sources`.
+
+        Retorna:
+            (dist, pais) para todas as células alcançadas
+        """
+
+        min_y, max_y, min_x, max_x = self._cluster_rect(cluster)
+        blocked = self._blocked
+        dist = {s: 0 for s in sources}
+        parents = {s: None for s in sources}
+        queue = deque(sources)
+        while queue:
+            current = queue.popleft()
+            self.expanded += 1
+            cy, cx = current
+            d = dist[current] + 1
+            for nxt in ((cy-1, cx), (cy+1, cx), (cy, cx-1), (cy, cx+1)):
+                ny, nx = nxt
+                if ny < min_y or ny > max_y or nx < min_x or nx > max_x:
+                    continue
+                if nxt in dist or nxt in blocked:
+                    continue
+                dist[nxt] = d
+                parents[nxt] = current
+                queue.append(nxt)
+        return dist, parents
+
+    def _entrances(self, cluster):
+        """
+        Lista as entradas do cluster: pares (célula interna, célula vizinha)
+        no meio de cada trecho livre contínuo das quatro bordas.
+        """
+
+        min_y, max_y, min_x, max_x = self._cluster_rect(cluster)
+        if min_y > max_y or min_x > max_x:
+            return []
+        c = self.cluster_size
+        y0, x0 = cluster[0] * c, cluster[1] * c
+        sides = []
+        if min_y == y0:
+            sides.append([((min_y, x), (min_y - 1, x)) for x in range(min_x, max_x + 1)])
+        if max_y == y0 + c - 1:
+            sides.append([((max_y, x), (max_y + 1, x)) for x in range(min_x, max_x + 1)])
+        if min_x == x0:
+            sides.append([((y, min_x), (y, min_x - 1)) for y in range(min_y, max_y + 1)])
+        if max_x == x0 + c - 1:
+            sides.append([((y, max_x), (y, max_x + 1)) for y in range(min_y, max_y + 1)])
+        entrances = []
+        for side in sides:
+            run = []
+            for inner, outer in side + [(None, None)]:
+                if inner is not None and self._walkable(inner) and self._walkable(outer):
+                    run.append((inner, outer))
+                elif run:
+                    entrances.append(run[len(run) // 2])
+                    run = []
+        return entrances
+
+    def _cluster_data(self, cluster):
+        """Entradas do cluster e BFS local a partir de cada uma (em cache)."""
+
+        data = self._cache.get(cluster)
+        if data is None:
+            entrances = self._entrances(cluster)
+            searches = {}
+            for inner, _ in entrances:
+                if inner not in searches:
+                    searches[inner] = self._local_bfs(cluster, [inner])
+            data = (entrances, searches)
+            self._cache[cluster] = data
+        return data
+
+    def find_path(self, start, goals, blocked, bounds):
+        self.expanded = 0
+        if start in goals:
+            return [start]
+        self._sync(blocked, bounds)
+        sink = None
+        # Conexões dos objetivos: BFS multi-origem dentro de cada cluster com objetivos
+        goal_clusters = {}
+        for goal in goals:
+            if self._walkable(goal):
+                goal_clusters.setdefault(self._cluster_of(goal), []).append(goal)
+        goal_search = {cl: self._local_bfs(cl, cells) for cl, cells in goal_clusters.items()}
+        start_cluster = self._cluster_of(start)
+        start_dist, start_parents = self._local_bfs(start_cluster, [start])
+
+        # Dijkstra no grafo abstrato; nós são células de entrada, `start` e `sink`
+        dist = {start: 0}
+        prev = {start: None}  # {nó: (nó anterior, tipo do trecho)}
+        order = itertools.count()  # desempate: `sink` (None) não é comparável
+        heap = [(0, next(order), start)]
+        closed = set()
+        while heap:
+            d, _, node = heapq.heappop(heap)
+            if node in closed:
+                continue
+            closed.add(node)
+            if node == sink:
+                break
+            for nxt, cost, kind in self._abstract_edges(node, start, start_cluster, start_dist, goal_search):
+                nd = d + cost
+                if nd < dist.get(nxt, INF):
+                    dist[nxt] = nd
+                    prev[nxt] = (node, kind)
+                    heapq.heappush(heap, (nd, next(order), nxt))
+        if sink not in closed:
+            return None
+        return self._refine(prev, start, start_parents, goal_search)
+
+    def _abstract_edges(self, node, start, start_cluster, start_dist, goal_search):
+        """Gera as arestas (vizinho, custo, tipo) de um nó do grafo abstrato."""
+
+        if node == start:
+            cluster, local = start_cluster, start_dist
+        else:
+            cluster = self._cluster_of(node)
+            local = self._cluster_data(cluster)[1].get(node, ({}, {}))[0]
+        entrances, _ = self._cluster_data(cluster)
+        # Dentro do cluster: até cada entrada e até o objetivo mais próximo
+        for inner, outer in entrances:
+            if inner != node and inner in local:
+                yield inner, local[inner], 'local'
+            if inner == node:
+                yield outer, 1, 'cross'
+        if cluster in goal_search:
+            goal_dist = goal_search[cluster][0]
+            if node in goal_dist:
+                yield None, goal_dist[node], 'goal'
+
+    def _refine(self, prev, start, start_parents, goal_search):
+        """Transforma a sequência de nós abstratos em um caminho célula a célula."""
+
+        chain = []
+        node = None
+        while node != start:
+            before, kind = prev[node]
+            chain.append((before, node, kind))
+            node = before
+        chain.reverse()
+        path = [start]
+        for before, node, kind in chain:
+            if kind == 'cross':
+                path.append(node)
+            elif kind == 'local':
+                if before == start:
+                    parents = start_parents
+                    segment = build_path(parents, node)
+                else:
+                    cluster = self._cluster_of(before)
+                    parents = self._cluster_data(cluster)[1][before][1]
+                    segment = build_path(parents, node)
+                path.extend(segment[1:])
+            else:
+                # Até o objetivo: segue os pais da BFS multi-origem dos objetivos
+                goal_parents = goal_search[self._cluster_of(before)][1]
+                current = goal_parents[before]
+                while current is not None:
+                    path.append(current)
+                    current = goal_parents[current]
+        return path
+
+
+PLANNERS = {
+    'bfs': BFSPlanner,
+    'astar': AStarPlanner,
+    'jps': JumpPointPlanner,
+    'hpa': HierarchicalPlanner,
+}
+
+
+def make_planner(planner):
+    """
+    Cria um planejador a partir do nome ('bfs', 'astar', 'jps', 'hpa') ou
+    devolve a instância recebida.
+    """
+
+    if isinstance(planner, Planner):
+        return planner
+    if planner not in PLANNERS:
+        raise ValueError(f"Planejador desconhecido: {planner}")
+    return PLANNERS[planner]()
@@ -1,4 +1,5 @@
 import random
+from environment.percept import MOVES, percept_parts
 
 
 class ReactiveAgent:
@@ -6,22 +7,30 @@ class ReactiveAgent:
     Agente reativo simples que toma decisões apenas com base na percepção atual,
     sem manter modelo do ambiente ou histórico de ações.
     """
-    
+
+    def __init__(self, rng=None):
+        """
+        Args:
+            rng: Gerador aleatório (random.Random); usa o módulo random se None
+        """
+
+        self.rng = rng if rng is not None else random
+
     def select_action(self, percept):
         """
         Seleciona uma ação com base na percepção atual.
         Limpa se estiver sujo, caso contrário move aleatoriamente.
         
         Args:
-            percept: Percepção local do ambiente
+            percept: Percepção local do ambiente (dict ou tupla compacta)
             
         Retorna:
             Ação a ser executada (CLEAN, UP, DOWN, LEFT, RIGHT)
         """
         
-        if percept['current_dirty']:
+        _, dirty = percept_parts(percept)
+        if dirty:
             return 'CLEAN'
         else:
-            actions = ['UP', 'DOWN', 'LEFT', 'RIGHT']
             # Tenta qualquer direção, mas penalidade só conta se movimento for possível
-            return random.choice(actions)
\ No newline at end of file
+            return self.rng.choice(MOVES)
\ No newline at end of file
@@ -0,0 +1,34 @@
+import numpy as np
+from environment.vec_environment import CLEAN, UP, RIGHT
+
+
+class VecReactiveAgent:
+    """
+    Versão vetorizada do agente reativo simples: escolhe K ações de uma vez
+    para os K ambientes de um VecGridEnvironment. Limpa onde está sujo e,
+    nos demais, sorteia uma direção qualquer, como ReactiveAgent.
+    """
+
+    def __init__(self, rng=None):
+        """
+        Args:
+            rng: numpy.random.Generator ou semente inteira; aleatório se None
+        """
+
+        self.rng = np.random.default_rng(rng)
+
+    def select_actions(self, percepts):
+        """
+        Seleciona uma ação para cada ambiente.
+
+        Args:
+            percepts: Tupla (dirty, moves) de VecGridEnvironment
+
+        Retorna:
+            Array (K,) de códigos de ação
+        """
+
+        dirty, _ = percepts
+        actions = self.rng.integers(UP, RIGHT + 1, size=len(dirty))
+        actions[dirty] = CLEAN
+        return actions
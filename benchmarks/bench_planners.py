@@ -0,0 +1,100 @@
+"""
+Benchmark dos planejadores de caminho de agents.planners.
+
+Compara BFS, A*, jump point search e o planejador hierárquico (HPA*) em
+mapas conhecidos abertos e com obstáculos: nós expandidos por consulta,
+tempo médio por consulta e tamanho médio do caminho em relação à BFS (que
+é ótimo). Cada planejador responde às consultas duas vezes com a mesma
+instância: a primeira passada ("fria") inclui, no HPA*, as BFS locais que
+preenchem o cache dos clusters; a segunda mostra o custo com o cache pronto,
+que é o caso do agente ao longo de um episódio.
+
+Uso:
+    python -m benchmarks.bench_planners [--sizes 100 500] [--queries 30]
+"""
+import argparse
+import random
+import time
+from agents.planners import PLANNERS
+from environment.grid_environment import GridEnvironment
+
+
+def build_blocked(env):
+    """Conjunto de obstáculos do ambiente, mais a borda externa."""
+
+    blocked = {(y, x) for y in range(env.height) for x in range(env.width) if env.is_obstacle(y, x)}
+    for y in range(-1, env.height + 1):
+        blocked.add((y, -1))
+        blocked.add((y, env.width))
+    for x in range(-1, env.width + 1):
+        blocked.add((-1, x))
+        blocked.add((env.height, x))
+    return blocked
+
+
+def make_queries(env, count, rng):
+    """Sorteia pares (origem, objetivo) de células livres distantes entre si."""
+
+    free = [(y, x) for y in range(env.height) for x in range(env.width) if not env.is_obstacle(y, x)]
+    queries = []
+    min_dist = (env.width + env.height) // 2
+    while len(queries) < count:
+        start, goal = rng.choice(free), rng.choice(free)
+        if abs(start[0] - goal[0]) + abs(start[1] - goal[1]) >= min_dist:
+            queries.append((start, {goal}))
+    return queries
+
+
+def measure(planner, queries, blocked, bounds):
+    """
+    Retorna:
+        (ms médios por consulta, expansões médias, tamanhos dos caminhos)
+    """
+
+    expanded = 0
+    lengths = []
+    began = time.perf_counter()
+    for start, goals in queries:
+        path = planner.find_path(start, goals, blocked, bounds)
+        expanded += planner.expanded
+        lengths.append(len(path) if path else None)
+    elapsed = time.perf_counter() - began
+    return 1000 * elapsed / len(queries), expanded / len(queries), lengths
+
+
+def run(sizes, queries, obstacle_probs, seed):
+    """Executa o benchmark e imprime uma tabela com os resultados."""
+
+    print(f"{'mapa':>9} {'obst.':>6} {'planejador':>10} {'fria (ms)':>10} {'expansões':>10} "
+          f"{'ms/consulta':>12} {'ganho':>7} {'caminho':>8}")
+    for size in sizes:
+        for obstacle_prob in obstacle_probs:
+            rng = random.Random(seed)
+            env = GridEnvironment(size, size, dirt_prob=0.0, obstacle_prob=obstacle_prob, rng=rng)
+            blocked = build_blocked(env)
+            bounds = (-1, env.height, -1, env.width)
+            cases = make_queries(env, queries, rng)
+            base_ms, _, base_lengths = measure(PLANNERS['bfs'](), cases, blocked, bounds)
+            for name, planner_class in PLANNERS.items():
+                planner = planner_class()
+                cold_ms, _, _ = measure(planner, cases, blocked, bounds)
+                ms, expanded, lengths = measure(planner, cases, blocked, bounds)
+                pairs = [(a, b) for a, b in zip(lengths, base_lengths) if a and b]
+                ratio = sum(a / b for a, b in pairs) / len(pairs) if pairs else 0.0
+                print(f"{size:>4}x{size:<4} {obstacle_prob:6.2f} {name:>10} {cold_ms:10.2f} {expanded:10.0f} {ms:12.2f} "
+                      f"{base_ms / ms:6.1f}x {ratio:8.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos planejadores de caminho")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500], help="Lados dos mapas")
+    parser.add_argument('--queries', type=int, default=30, help="Consultas por mapa")
+    parser.add_argument('--obstacle-probs', type=float, nargs='+', default=[0.0, 0.2],
+                        help="Densidades de obstáculos (0 = mapa aberto)")
+    parser.add_argument('--seed', type=int, default=0, help="Semente dos mapas e consultas")
+    args = parser.parse_args(argv)
+    run(args.sizes, args.queries, args.obstacle_probs, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Micro-benchmark do planejamento de caminho do ModelBasedAgent.
+
+Mede o custo por decisão de `_shortest_path` em mapas totalmente conhecidos
+de 100x100 e 500x500, comparando com a BFS original (que copiava o caminho
+inteiro em cada entrada da fila e não tinha limites).
+
+Também mede a volta para (0,0) em mapas desconhecidos, em que obstáculos
+aparecem no caminho: D* Lite (reparo incremental) contra refazer a BFS a
+cada passo, com latência média e p99 por passo.
+
+Uso:
+    python -m benchmarks.bench_planning [--sizes 100 500] [--queries 50]
+"""
+import argparse
+import random
+import time
+from collections import deque
+from environment.grid_environment import GridEnvironment
+from agents.model_based_agent import ModelBasedAgent
+from agents.dstar_lite import DStarLite
+
+
+def legacy_shortest_path(agent, start, goals):
+    """BFS original de ModelBasedAgent._shortest_path, mantida para comparação."""
+
+    queue = deque()
+    queue.append((start, [start]))
+    visited = set()
+    visited.add(start)
+    while queue:
+        current, path = queue.popleft()
+        if current in goals:
+            return path
+        for move in ['UP', 'DOWN', 'LEFT', 'RIGHT']:
+            ny, nx = agent._get_pos_from(current, move)
+            if (ny, nx) in agent.obstacles:
+                continue
+            if (ny, nx) not in visited:
+                visited.add((ny, nx))
+                queue.append(((ny, nx), path + [(ny, nx)]))
+    return None
+
+
+def build_known_agent(env):
+    """
+    Cria um ModelBasedAgent que já conhece todo o ambiente: células livres
+    como visitadas e obstáculos (inclusive a borda externa) como obstáculos.
+    """
+
+    agent = ModelBasedAgent(rng=random.Random(0))
+    for y in range(-1, env.height + 1):
+        for x in range(-1, env.width + 1):
+            inside = 0 <= y < env.height and 0 <= x < env.width
+            if inside and not env.is_obstacle(y, x):
+                agent._mark_visited((y, x))
+            else:
+                agent._mark_obstacle((y, x))
+    return agent
+
+
+def make_queries(env, count, goals_per_query, rng):
+    """Sorteia consultas (origem, objetivos) entre células livres."""
+
+    free = [(y, x) for y in range(env.height) for x in range(env.width) if not env.is_obstacle(y, x)]
+    return [(rng.choice(free), rng.sample(free, goals_per_query)) for _ in range(count)]
+
+
+def time_queries(plan, queries):
+    """Retorna (ms médios por decisão, número de caminhos encontrados)."""
+
+    found = 0
+    start = time.perf_counter()
+    for origin, goals in queries:
+        if plan(origin, goals) is not None:
+            found += 1
+    elapsed = time.perf_counter() - start
+    return 1000 * elapsed / len(queries), found
+
+
+def reachable_far_cell(env):
+    """Retorna a célula livre alcançável a partir de (0,0) mais distante em y+x."""
+
+    seen = {(0, 0)}
+    queue = deque([(0, 0)])
+    while queue:
+        y, x = queue.popleft()
+        for ny, nx in ((y-1, x), (y+1, x), (y, x-1), (y, x+1)):
+            if 0 <= ny < env.height and 0 <= nx < env.width and not env.is_obstacle(ny, nx) and (ny, nx) not in seen:
+                seen.add((ny, nx))
+                queue.append((ny, nx))
+    return max(seen, key=lambda pos: pos[0] + pos[1])
+
+
+def home_return(env, incremental, max_steps):
+    """
+    Faz um agente sem mapa voltar da célula mais distante até (0,0).
+
+    Retorna:
+        (chegou, lista de latências por passo em segundos)
+    """
+
+    start = reachable_far_cell(env)
+    env.agent_pos = start
+    agent = ModelBasedAgent(rng=random.Random(0), incremental=incremental)
+    agent.pos = start
+    agent.returning_home = True
+    latencies = []
+    for _ in range(max_steps):
+        began = time.perf_counter()
+        if incremental:
+            if agent.home_planner is None:
+                agent.home_planner = DStarLite(start, [(0, 0)], agent.obstacles, agent._planner_region())
+        else:
+            # Sem reparo incremental: refaz a BFS inteira a cada passo
+            path = agent._shortest_path(agent.pos, [(0, 0)])
+            agent.home_path = path[1:] if path else []
+        action = agent.select_action(env.get_compact_percept())
+        latencies.append(time.perf_counter() - began)
+        env.execute_action(action)
+        agent.pos = env.agent_pos
+        if env.agent_pos == (0, 0):
+            return True, latencies
+    return False, latencies
+
+
+def run_home(sizes, obstacle_prob, seed):
+    """Compara D* Lite e BFS refeita a cada passo na volta para casa."""
+
+    print()
+    print(f"{'mapa':>9} {'planejador':>11} {'chegou':>7} {'passos':>7} {'média (ms)':>11} {'p99 (ms)':>9}")
+    for size in sizes:
+        for name, incremental in (('bfs', False), ('d*lite', True)):
+            env = GridEnvironment(size, size, dirt_prob=0.0, obstacle_prob=obstacle_prob, rng=random.Random(seed))
+            reached, latencies = home_return(env, incremental, max_steps=8 * size * size)
+            latencies.sort()
+            mean = 1000 * sum(latencies) / len(latencies)
+            p99 = 1000 * latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+            print(f"{size:>4}x{size:<4} {name:>11} {'sim' if reached else 'não':>7} {len(latencies):>7} {mean:11.3f} {p99:9.3f}")
+
+
+def run(sizes, queries, goals_per_query, obstacle_prob, legacy_max_size, seed):
+    """Executa o benchmark e imprime uma tabela com os resultados."""
+
+    print(f"{'mapa':>9} {'consulta':>10} {'antes (ms)':>11} {'depois (ms)':>12} {'ganho':>7}")
+    for size in sizes:
+        rng = random.Random(seed)
+        env = GridEnvironment(size, size, dirt_prob=0.0, obstacle_prob=obstacle_prob, rng=rng)
+        agent = build_known_agent(env)
+        cases = {
+            'fronteira': make_queries(env, queries, goals_per_query, rng),
+            'casa': [(origin, [(0, 0)]) for origin, _ in make_queries(env, queries, 1, rng)],
+        }
+        for name, case in cases.items():
+            after, _ = time_queries(agent._shortest_path, case)
+            # A BFS original guarda O(L²) posições por busca; em mapas grandes
+            # a volta para casa não cabe em memória razoável.
+            if size <= legacy_max_size or name == 'fronteira':
+                before, _ = time_queries(lambda s, g: legacy_shortest_path(agent, s, g), case)
+                before_txt = f"{before:11.2f}"
+                gain_txt = f"{before / after:6.1f}x" if after > 0 else "      -"
+            else:
+                before_txt = f"{'-':>11}"
+                gain_txt = "      -"
+            print(f"{size:>4}x{size:<4} {name:>10} {before_txt} {after:12.2f} {gain_txt}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do planejamento do ModelBasedAgent")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500], help="Lados dos mapas")
+    parser.add_argument('--queries', type=int, default=50, help="Consultas por caso")
+    parser.add_argument('--goals', type=int, default=8, help="Objetivos por consulta de fronteira")
+    parser.add_argument('--obstacle-prob', type=float, default=0.15, help="Densidade de obstáculos")
+    parser.add_argument('--legacy-max-size', type=int, default=100,
+                        help="Maior mapa em que a BFS original roda a volta para casa")
+    parser.add_argument('--home-sizes', type=int, nargs='+', default=[50, 100],
+                        help="Lados dos mapas do teste de volta para casa")
+    parser.add_argument('--seed', type=int, default=0, help="Semente dos mapas e consultas")
+    args = parser.parse_args(argv)
+    run(args.sizes, args.queries, args.goals, args.obstacle_prob, args.legacy_max_size, args.seed)
+    run_home(args.home_sizes, args.obstacle_prob, args.seed)
+
+
+if __name__ == "__main__":
+    main()
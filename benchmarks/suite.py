@@ -0,0 +1,340 @@
+"""
+Suíte de benchmarks de desempenho com comparação contra uma linha de base.
+
+Casos medidos (todos com sementes fixas):
+    env_step      vazão de get_local_percept + execute_action por ambiente e tamanho
+    select_action latência p50/p90/p99 de ModelBasedAgent.select_action
+    episode       tempo de um episódio completo por tamanho de grade (4x4 até
+                  1000x1000), densidade de obstáculos e tipo de agente
+    memory        pico de memória (tracemalloc) alocada durante um episódio
+
+Cada métrica é registrada com o sentido em que é melhor ('higher' ou
+'lower'). `compare` aponta regressão quando uma métrica piora mais que o
+limite configurado em relação à linha de base e termina com código 1.
+
+Antes de cada grupo, uma carga fixa de Python puro é cronometrada
+(calibração). Na comparação, tempos e vazões são normalizados pela razão
+entre as calibrações, o que compensa máquinas diferentes e variações de
+velocidade da mesma máquina; use --no-normalize para comparar valores
+brutos. A linha de base deve ser gerada com o modo completo.
+
+Uso:
+    python -m benchmarks.suite run [--quick] [--output resultados.json]
+    python -m benchmarks.suite compare resultados.json [--baseline benchmarks/baseline.json]
+        [--threshold 0.25] [--memory-threshold 0.10]
+    python -m benchmarks.suite run --quick --compare benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from environment.grid_environment import GridEnvironment
+from environment.array_environment import ArrayGridEnvironment
+from environment.percept import MOVES
+from agents.model_based_agent import ModelBasedAgent
+from simulation.headless import make_agent, run_episode
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+ACTIONS = ('CLEAN',) + MOVES
+
+# Casos completos e reduzidos (--quick); o modo reduzido é um subconjunto
+# do completo, então pode ser comparado com a mesma linha de base.
+FULL = {
+    'step_sizes': [10, 100, 1000],
+    'step_count': 200000,
+    'latency_size': 50,
+    'episode_sizes': [4, 16, 64, 256, 1000],
+    'episode_densities': [0.0, 0.15, 0.3],
+    'memory_sizes': [64, 256, 1000],
+    'repeats': 5,
+}
+QUICK = {
+    'step_sizes': [10, 100],
+    'step_count': 50000,
+    'latency_size': 50,
+    'episode_sizes': [4, 16, 64],
+    'episode_densities': [0.15],
+    'memory_sizes': [64],
+    'repeats': 5,
+}
+
+
+def episode_steps(size):
+    """Limite de passos de um episódio: proporcional à área, até 200 mil."""
+
+    return min(8 * size * size, 200000)
+
+
+def metric(results, name, key, value, better, unit):
+    """Registra uma métrica no dicionário de resultados."""
+
+    results[f"{name}:{key}"] = {'value': value, 'better': better, 'unit': unit}
+
+
+def calibration_work():
+    """Carga fixa de referência (dicionário com chaves tupla, como o simulador)."""
+
+    table = {}
+    for i in range(100000):
+        table[(i >> 3, i & 7)] = i
+    return sum(table.values())
+
+
+def calibrate(repeats=5):
+    """Retorna o menor tempo, em segundos, da carga de referência."""
+
+    return best_of(repeats, calibration_work)
+
+
+def best_of(repeats, func, setup=None):
+    """
+    Executa `func` algumas vezes e retorna o menor tempo (menos ruído).
+    `setup`, se informado, roda fora da medição e seu retorno é passado a `func`.
+    """
+
+    best = None
+    for _ in range(repeats):
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_env_step(results, config, seed):
+    """Vazão do laço percepção + ação com ações sorteadas."""
+
+    for env_name, env_class in (('list', GridEnvironment), ('array', ArrayGridEnvironment)):
+        for size in config['step_sizes']:
+            count = config['step_count']
+            rng = random.Random(seed)
+            actions = [rng.choice(ACTIONS) for _ in range(count)]
+
+            def setup():
+                return env_class(size, size, 0.3, 0.15, rng=random.Random(seed))
+
+            def loop(env):
+                for action in actions:
+                    env.get_local_percept()
+                    env.execute_action(action)
+            elapsed = best_of(config['repeats'], loop, setup)
+            metric(results, f"env_step/{env_name}/{size}x{size}", 'steps_per_sec',
+                   count / elapsed, 'higher', 'passos/s')
+
+
+def bench_select_action(results, config, seed):
+    """Percentis da latência de ModelBasedAgent.select_action em um episódio."""
+
+    size = config['latency_size']
+    env = GridEnvironment(size, size, 0.3, 0.15, rng=random.Random(seed))
+    agent = ModelBasedAgent(rng=random.Random(seed))
+    agent.pos = env.agent_pos
+    latencies = []
+    started = False
+    for _ in range(episode_steps(size)):
+        percept = env.get_compact_percept()
+        began = time.perf_counter()
+        action = agent.select_action(percept)
+        latencies.append(time.perf_counter() - began)
+        env.execute_action(action)
+        agent.pos = env.agent_pos
+        if env.agent_pos != (0, 0):
+            started = True
+        elif started:
+            break
+    latencies.sort()
+    name = f"select_action/model/{size}x{size}"
+    for p in (50, 90, 99):
+        value = latencies[min(len(latencies) - 1, len(latencies) * p // 100)]
+        metric(results, name, f"p{p}_us", 1e6 * value, 'lower', 'µs')
+
+
+def episode_setup(agent_type, size, density, seed):
+    """Cria ambiente e agente de um episódio com semente fixa."""
+
+    env = GridEnvironment(size, size, 0.3, density, rng=random.Random(seed))
+    return env, make_agent(agent_type, env, random.Random(seed))
+
+
+def bench_episodes(results, config, seed):
+    """Tempo de episódio por tamanho, densidade de obstáculos e tipo de agente."""
+
+    for agent_type in ('reactive', 'model'):
+        for size in config['episode_sizes']:
+            for density in config['episode_densities']:
+                outcome = {}
+
+                def setup():
+                    return episode_setup(agent_type, size, density, seed)
+
+                def episode(pair):
+                    outcome.update(run_episode(*pair, episode_steps(size)))
+                # Episódios longos (modelo em mapas grandes) bastam com uma medição
+                repeats = 1 if agent_type == 'model' and size > 256 else config['repeats']
+                elapsed = best_of(repeats, episode, setup)
+                name = f"episode/{agent_type}/{size}x{size}/obst{density:g}"
+                metric(results, name, 'ms', 1000 * elapsed, 'lower', 'ms')
+                metric(results, name, 'steps_per_sec', outcome['steps'] / elapsed, 'higher', 'passos/s')
+
+
+def bench_memory(results, config, seed):
+    """Pico de memória alocada durante um episódio do agente baseado em modelo."""
+
+    for size in config['memory_sizes']:
+        env, agent = episode_setup('model', size, 0.15, seed)
+        # Mede só o episódio: a grade do ambiente fica fora do pico
+        tracemalloc.start()
+        run_episode(env, agent, episode_steps(size))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        metric(results, f"memory/model/{size}x{size}", 'peak_kb', peak / 1024, 'lower', 'KB')
+
+
+def run_suite(quick=False, seed=0, only=None):
+    """
+    Executa a suíte.
+
+    Args:
+        quick: Usa o conjunto reduzido de casos
+        seed: Semente de mapas, ações e agentes
+        only: Lista opcional de grupos ('env_step', 'select_action', 'episode', 'memory')
+
+    Retorna:
+        Dict com 'meta' e 'results' ({nome:métrica: {value, better, unit}})
+    """
+
+    config = QUICK if quick else FULL
+    groups = {
+        'env_step': bench_env_step,
+        'select_action': bench_select_action,
+        'episode': bench_episodes,
+        'memory': bench_memory,
+    }
+    results = {}
+    calibration = {}
+    for group, bench in groups.items():
+        if only and group not in only:
+            continue
+        print(f"[{group}]", file=sys.stderr)
+        calibration[group] = calibrate()
+        bench(results, config, seed)
+    meta = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'quick': quick,
+        'seed': seed,
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    return {'meta': meta, 'calibration': calibration, 'results': results}
+
+
+def compare(current, baseline, threshold=0.25, memory_threshold=0.10, normalize=True):
+    """
+    Compara resultados com a linha de base.
+
+    Uma métrica regride quando piora, no seu sentido, mais que o limite
+    relativo: `threshold` para tempo e vazão, `memory_threshold` para memória.
+    Métricas ausentes em um dos lados são ignoradas.
+
+    Args:
+        normalize: Ajusta tempos e vazões pela razão entre as calibrações
+            do grupo (memória nunca é ajustada)
+
+    Retorna:
+        Lista de (nome, base, atual ajustado, variação relativa, regrediu)
+    """
+
+    rows = []
+    for name, entry in sorted(current['results'].items()):
+        base = baseline['results'].get(name)
+        if base is None or not base['value']:
+            continue
+        value = entry['value']
+        group = name.split('/', 1)[0]
+        if normalize and group != 'memory':
+            cur_cal = current.get('calibration', {}).get(group)
+            base_cal = baseline.get('calibration', {}).get(group)
+            if cur_cal and base_cal:
+                # Máquina 2x mais lenta: tempos valem metade, vazões o dobro
+                factor = base_cal / cur_cal
+                value = value * factor if entry['better'] == 'lower' else value / factor
+        change = (value - base['value']) / base['value']
+        worse = -change if entry['better'] == 'higher' else change
+        limit = memory_threshold if name.startswith('memory/') else threshold
+        rows.append((name, base['value'], value, change, worse > limit))
+    return rows
+
+
+def print_results(data):
+    for name, entry in sorted(data['results'].items()):
+        print(f"{name:<48} {entry['value']:14.2f} {entry['unit']}")
+
+
+def print_comparison(rows):
+    """Imprime a comparação e retorna o número de regressões."""
+
+    print(f"{'métrica':<48} {'base':>14} {'atual':>14} {'variação':>9}  (atual ajustado pela calibração)")
+    for name, base, value, change, regressed in rows:
+        flag = "  REGRESSÃO" if regressed else ""
+        print(f"{name:<48} {base:14.2f} {value:14.2f} {100 * change:+8.1f}%{flag}")
+    regressions = sum(1 for row in rows if row[4])
+    print(f"{regressions} regressão(ões) em {len(rows)} métricas")
+    return regressions
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks de desempenho")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help="Executa os benchmarks")
+    run_parser.add_argument('--quick', action='store_true', help="Conjunto reduzido de casos")
+    run_parser.add_argument('--seed', type=int, default=0, help="Semente fixa dos casos")
+    run_parser.add_argument('--only', nargs='+', choices=['env_step', 'select_action', 'episode', 'memory'],
+                            help="Executa apenas os grupos indicados")
+    run_parser.add_argument('-o', '--output', help="Arquivo JSON de saída")
+    run_parser.add_argument('--compare', metavar='BASELINE', help="Compara com a linha de base ao final")
+
+    compare_parser = sub.add_parser('compare', help="Compara um resultado com a linha de base")
+    compare_parser.add_argument('results', help="Arquivo JSON gerado por 'run'")
+    compare_parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Arquivo JSON da linha de base")
+
+    for p in (run_parser, compare_parser):
+        p.add_argument('--threshold', type=float, default=0.25,
+                       help="Piora relativa tolerada em tempo e vazão (0.25 = 25%%)")
+        p.add_argument('--memory-threshold', type=float, default=0.10,
+                       help="Piora relativa tolerada no pico de memória")
+        p.add_argument('--no-normalize', action='store_true',
+                       help="Compara valores brutos, sem ajustar pela calibração")
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        data = run_suite(quick=args.quick, seed=args.seed, only=args.only)
+        print_results(data)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+        baseline_path = args.compare
+    else:
+        data = load(args.results)
+        baseline_path = args.baseline
+    if baseline_path:
+        print()
+        rows = compare(data, load(baseline_path), args.threshold, args.memory_threshold,
+                       normalize=not args.no_normalize)
+        if print_comparison(rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
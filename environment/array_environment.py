@@ -0,0 +1,292 @@
+import copy
+import random
+import numpy as np
+from environment.dirt_index import DirtIndex
+from environment.grid_environment import EnvironmentSnapshot, GridEnvironment, check_snapshot
+from environment.percept import MOVE_BITS, MOVE_DELTAS, MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT
+
+
+class ArrayDirtIndex(DirtIndex):
+    """
+    DirtIndex para grades NumPy: contagens por bloco e listagem das células
+    de um bloco são calculadas de forma vetorizada.
+    """
+
+    def rebuild(self, grid):
+        """Recalcula todas as contagens a partir da grade."""
+
+        self.grid = grid
+        b = self.block
+        shape = (self.blocks_y * b, self.blocks_x * b)
+        padded = grid
+        if grid.shape != shape:
+            # Completa até um múltiplo do bloco com um byte por célula
+            padded = np.zeros(shape, dtype=bool)
+            padded[:self.height, :self.width] = grid
+        self.counts = padded.reshape(self.blocks_y, b, self.blocks_x, b).sum(axis=(1, 3), dtype=np.int64)
+        self.total = int(self.counts.sum())
+
+    def block_cells(self, by, bx):
+        """Lista as células sujas de um bloco."""
+
+        b = self.block
+        ys, xs = np.nonzero(self.grid[by*b:(by+1)*b, bx*b:(bx+1)*b])
+        return list(zip((ys + by*b).tolist(), (xs + bx*b).tolist()))
+
+    def copy(self, grid):
+        """Cria uma cópia do índice associada a outra grade com o mesmo conteúdo."""
+
+        clone = super().copy(grid)
+        clone.counts = self.counts.copy()
+        return clone
+
+
+class ArrayGridEnvironment(GridEnvironment):
+    """
+    Ambiente em grade com sujeira e obstáculos guardados em arrays NumPy
+    contíguos (um byte por célula). Mantém a mesma API de GridEnvironment,
+    mas consultas sobre a grade inteira e cópias de estado são vetorizadas:
+    uma grade 1000x1000 ocupa cerca de 2 MB.
+    """
+
+    dirt_index_class = ArrayDirtIndex
+
+    def __init__(self, width, height, dirt_prob=0.3, obstacle_prob=0.1, rng=None):
+        """
+        Inicializa o ambiente com dimensões e probabilidades especificadas.
+
+        Args:
+            width: Largura do ambiente
+            height: Altura do ambiente
+            dirt_prob: Probabilidade de cada célula estar suja
+            obstacle_prob: Probabilidade de cada célula ter obstáculo
+            rng: numpy.random.Generator, semente inteira ou random.Random
+                (usado para derivar a semente); aleatório se None
+        """
+
+        if isinstance(rng, random.Random):
+            rng = rng.getrandbits(64)
+        self.rng = np.random.default_rng(rng)
+        self.width = width
+        self.height = height
+        self.grid = self.rng.random((height, width)) < dirt_prob
+        self.obstacles = self.rng.random((height, width)) < obstacle_prob
+        self.agent_pos = (0, 0)
+        # Garante que a posição inicial não é obstáculo
+        self.obstacles[0, 0] = False
+        # Garante que pelo menos uma saída da posição inicial está livre
+        self._ensure_initial_not_blocked()
+        self.dirt_index = self.dirt_index_class(self.grid, width, height)
+        self._rebuild_move_masks()
+
+    @classmethod
+    def from_lists(cls, grid, obstacles, agent_pos=(0, 0)):
+        """
+        Cria um ambiente a partir de listas de listas de booleanos.
+
+        Args:
+            grid: Matriz de sujeira
+            obstacles: Matriz de obstáculos
+            agent_pos: Posição inicial do agente
+
+        Retorna:
+            Novo ArrayGridEnvironment com o mesmo conteúdo
+        """
+
+        return cls.from_arrays(np.array(grid, dtype=bool), np.array(obstacles, dtype=bool), agent_pos)
+
+    @classmethod
+    def from_arrays(cls, grid, obstacles, agent_pos=(0, 0)):
+        """
+        Cria um ambiente que passa a usar os próprios arrays, sem cópia.
+
+        Args:
+            grid: Array booleano (altura, largura) de sujeira
+            obstacles: Array booleano (altura, largura) de obstáculos
+            agent_pos: Posição inicial do agente
+
+        Retorna:
+            Novo ArrayGridEnvironment
+        """
+
+        env = cls.__new__(cls)
+        env.rng = np.random.default_rng()
+        env.grid = grid
+        env.obstacles = obstacles
+        env.height, env.width = env.grid.shape
+        env.agent_pos = agent_pos
+        env.dirt_index = env.dirt_index_class(env.grid, env.width, env.height)
+        env._rebuild_move_masks()
+        return env
+
+    def _rebuild_move_masks(self):
+        """Recalcula a máscara de movimentos de todas as células (vetorizado)."""
+
+        # Células livres como 0/1 em uint8: cada direção vira uma multiplicação
+        # pelo bit, sem arrays temporários de inteiros de 64 bits
+        free = (~self.obstacles).view(np.uint8)
+        masks = np.zeros((self.height, self.width), dtype=np.uint8)
+        masks[1:, :] |= free[:-1, :] * np.uint8(MOVE_UP)
+        masks[:-1, :] |= free[1:, :] * np.uint8(MOVE_DOWN)
+        masks[:, 1:] |= free[:, :-1] * np.uint8(MOVE_LEFT)
+        masks[:, :-1] |= free[:, 1:] * np.uint8(MOVE_RIGHT)
+        self.move_masks = masks
+
+    def get_local_percept(self):
+        """
+        Retorna:
+            Dict contendo sujeira atual e movimentos possíveis
+        """
+
+        y, x = self.agent_pos
+        return {
+            'current_dirty': bool(self.grid[y, x]),
+            'possible_moves': self._get_possible_moves()
+        }
+
+    def get_compact_percept(self):
+        """
+        Retorna:
+            Tupla (mask, dirty) com tipos Python nativos
+        """
+
+        y, x = self.agent_pos
+        return int(self.move_masks[y, x]), bool(self.grid[y, x])
+
+    def execute_action(self, action):
+        """
+        Executa a ação do agente no ambiente.
+
+        Args:
+            action: Ação a ser executada (CLEAN, UP, DOWN, LEFT, RIGHT)
+        """
+
+        y, x = self.agent_pos
+        if action == 'CLEAN':
+            if self.grid[y, x]:
+                self.grid[y, x] = False
+                self.dirt_index.remove(y, x)
+        elif self.move_masks[y, x] & MOVE_BITS.get(action, 0):
+            dy, dx = MOVE_DELTAS[action]
+            self.agent_pos = (y+dy, x+dx)
+
+    def is_dirty(self, y, x):
+        """Verifica se há sujeira na posição especificada."""
+
+        return bool(self.grid[y, x])
+
+    def load_grid(self, grid):
+        """
+        Substitui toda a camada de sujeira por uma cópia de `grid` e
+        reconstrói o índice de sujeira.
+
+        Args:
+            grid: Matriz de sujeira (array ou listas de listas)
+        """
+
+        self.grid = np.array(grid, dtype=bool)
+        self.dirt_index.rebuild(self.grid)
+
+    def copy(self):
+        """
+        Cria uma cópia independente do ambiente (sujeira, obstáculos e posição).
+
+        Retorna:
+            Novo ambiente com o mesmo estado
+        """
+
+        clone = copy.copy(self)
+        clone.grid = self.grid.copy()
+        clone.obstacles = self.obstacles.copy()
+        clone.dirt_index = self.dirt_index.copy(clone.grid)
+        clone.move_masks = self.move_masks.copy()
+        clone._obstacles_shared = False
+        return clone
+
+    def snapshot(self):
+        """
+        Salva o estado atual: a sujeira é copiada em bloco (um memcpy de um
+        byte por célula) e os obstáculos passam a ser compartilhados.
+
+        Retorna:
+            EnvironmentSnapshot para `restore` ou `from_snapshot`
+        """
+
+        self._obstacles_shared = True
+        return EnvironmentSnapshot(self.width, self.height, self.grid.copy(), self.obstacles,
+                                   self.move_masks, self.agent_pos, self.dirt_index.copy(None),
+                                   self.rng, ArrayGridEnvironment)
+
+    def restore(self, snapshot):
+        """
+        Volta ao estado salvo em `snapshot`, copiando a sujeira em bloco
+        para o array atual quando as dimensões coincidem.
+
+        Args:
+            snapshot: EnvironmentSnapshot de um ArrayGridEnvironment
+
+        Raises:
+            ValueError: Se o snapshot é de outro armazenamento
+        """
+
+        check_snapshot(snapshot, ArrayGridEnvironment)
+        if self.grid is not None and self.grid.shape == snapshot.grid.shape:
+            np.copyto(self.grid, snapshot.grid)
+        else:
+            self.grid = snapshot.grid.copy()
+        self.width = snapshot.width
+        self.height = snapshot.height
+        self.obstacles = snapshot.obstacles
+        self.move_masks = snapshot.move_masks
+        self._obstacles_shared = True
+        self.agent_pos = snapshot.agent_pos
+        self.dirt_index = snapshot.dirt_index.copy(self.grid)
+
+    def to_lists(self):
+        """
+        Converte as camadas para listas de listas, no formato de GridEnvironment.
+
+        Retorna:
+            Tupla (grid, obstacles)
+        """
+
+        return self.grid.tolist(), self.obstacles.tolist()
+
+    def to_arrays(self):
+        """
+        Retorna:
+            Tupla (grid, obstacles) com cópias dos arrays
+        """
+
+        return self.grid.copy(), self.obstacles.copy()
+
+    def is_obstacle(self, y, x):
+        """Verifica se há obstáculo na posição especificada."""
+
+        return bool(self.obstacles[y, x])
+
+    def set_obstacle(self, y, x, value=True):
+        self._own_obstacles()
+        self.obstacles[y, x] = value
+        self._update_move_masks(y, x)
+
+    def _own_obstacles(self):
+        """Copia obstáculos e máscaras antes de alterá-los, se compartilhados."""
+
+        if self._obstacles_shared:
+            self.obstacles = self.obstacles.copy()
+            self.move_masks = self.move_masks.copy()
+            self._obstacles_shared = False
+
+    def load_obstacles(self, obstacles):
+        """
+        Substitui toda a camada de obstáculos por uma cópia de `obstacles` e
+        recalcula as máscaras de movimento.
+
+        Args:
+            obstacles: Matriz de obstáculos (array ou listas de listas)
+        """
+
+        self.obstacles = np.array(obstacles, dtype=bool)
+        self._obstacles_shared = False
+        self._rebuild_move_masks()
@@ -0,0 +1,417 @@
+import random
+from collections import OrderedDict
+import numpy as np
+from environment.percept import (
+    MOVE_BITS, MOVE_DELTAS, MOVES_BY_MASK, MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT,
+)
+
+
+class Chunk:
+    """Bloco residente: linhas de sujeira e de obstáculos (listas de bool)."""
+
+    def __init__(self, grid, obstacles, modified=False):
+        self.grid = grid
+        self.obstacles = obstacles
+        self.modified = modified  # difere do conteúdo gerado pela semente
+
+
+class ChunkSnapshot:
+    """
+    Estado salvo por `ChunkedGridEnvironment.snapshot()`: configuração,
+    blocos alterados (empacotados) e contagens de sujeira conhecidas.
+    """
+
+    def __init__(self, config, saved, chunk_dirt, agent_pos):
+        self.config = config
+        self.saved = saved
+        self.chunk_dirt = chunk_dirt
+        self.agent_pos = agent_pos
+
+
+class ChunkedGridEnvironment:
+    """
+    Ambiente em grade dividido em blocos de `chunk_size` x `chunk_size`
+    células, gerados sob demanda.
+
+    A sujeira e os obstáculos de cada bloco vêm de um gerador NumPy semeado
+    com (semente, linha do bloco, coluna do bloco): o mesmo bloco é sempre
+    gerado igual, em qualquer ordem de acesso. Só os blocos tocados ficam
+    residentes, até `max_chunks`; o menos usado recentemente é descartado e,
+    se foi alterado (limpeza, set_dirt, set_obstacle), guardado empacotado
+    com 1 bit por célula. Assim a memória acompanha a área visitada, não a
+    área do mapa.
+
+    Mantém a API de GridEnvironment usada pelos agentes e pelo laço de
+    simulação. Não há `grid`/`obstacles` completos: consultas globais
+    (`dirt_count`, `dirty_cells`) geram de forma transitória os blocos
+    ainda não vistos.
+    """
+
+    def __init__(self, width, height, dirt_prob=0.3, obstacle_prob=0.1, rng=None,
+                 chunk_size=64, max_chunks=256):
+        """
+        Args:
+            width: Largura do ambiente
+            height: Altura do ambiente
+            dirt_prob: Probabilidade de cada célula estar suja
+            obstacle_prob: Probabilidade de cada célula ter obstáculo
+            rng: Semente inteira ou random.Random (usado para derivar a
+                semente); aleatório se None
+            chunk_size: Lado de cada bloco, em células (mínimo 2)
+            max_chunks: Número máximo de blocos residentes (mínimo 9, para
+                que a vizinhança do agente caiba na memória)
+        """
+
+        if isinstance(rng, random.Random):
+            rng = rng.getrandbits(64)
+        elif rng is None:
+            rng = random.getrandbits(64)
+        self.seed = int(rng)
+        self.width = width
+        self.height = height
+        self.dirt_prob = dirt_prob
+        self.obstacle_prob = obstacle_prob
+        self.chunk_size = max(chunk_size, 2)
+        self.max_chunks = max(max_chunks, 9)
+        self.chunks_y = (height + self.chunk_size - 1) // self.chunk_size
+        self.chunks_x = (width + self.chunk_size - 1) // self.chunk_size
+        self.agent_pos = (0, 0)
+        self.resident = OrderedDict()  # {(cy, cx): Chunk}, do menos ao mais recente
+        self.saved = {}  # {(cy, cx): (bits de sujeira, bits de obstáculos)} dos descartados alterados
+        self.chunk_dirt = {}  # {(cy, cx): sujeira} de todo bloco já gerado
+        self.loaded = 0
+        self.evicted = 0
+        # Bloco do último acesso, para não consultar o LRU a cada passo
+        self._last_key = None
+        self._last_chunk = None
+
+    def _config(self):
+        return (self.width, self.height, self.dirt_prob, self.obstacle_prob, self.seed,
+                self.chunk_size, self.max_chunks)
+
+    def _generate(self, key, obstacles=True):
+        """
+        Gera as camadas de um bloco a partir da semente.
+
+        Retorna:
+            (sujeira, obstáculos) como arrays booleanos; obstáculos é None
+            com obstacles=False (basta para contar a sujeira)
+        """
+
+        cy, cx = key
+        cs = self.chunk_size
+        shape = (min(cs, self.height - cy * cs), min(cs, self.width - cx * cs))
+        rng = np.random.default_rng([self.seed, cy, cx])
+        dirt = rng.random(shape) < self.dirt_prob
+        if not obstacles:
+            return dirt, None
+        blocked = rng.random(shape) < self.obstacle_prob
+        if key == (0, 0):
+            # Mesmas garantias de GridEnvironment para a posição inicial
+            blocked[0, 0] = False
+            exits = [pos for pos in ((1, 0), (0, 1)) if pos[0] < shape[0] and pos[1] < shape[1]]
+            if exits and all(blocked[pos] for pos in exits):
+                blocked[exits[int(rng.integers(len(exits)))]] = False
+        return dirt, blocked
+
+    def _load(self, key):
+        """Cria o bloco `key`: gerado pela semente ou recuperado de `saved`."""
+
+        packed = self.saved.get(key)
+        if packed is None:
+            dirt, blocked = self._generate(key)
+        else:
+            cs = self.chunk_size
+            shape = (min(cs, self.height - key[0] * cs), min(cs, self.width - key[1] * cs))
+            count = shape[0] * shape[1]
+            dirt = np.unpackbits(np.frombuffer(packed[0], dtype=np.uint8), count=count).reshape(shape).view(bool)
+            blocked = np.unpackbits(np.frombuffer(packed[1], dtype=np.uint8), count=count).reshape(shape).view(bool)
+        self.loaded += 1
+        if key not in self.chunk_dirt:
+            self.chunk_dirt[key] = int(dirt.sum())
+        return Chunk(dirt.tolist(), blocked.tolist(), modified=packed is not None)
+
+    def _chunk(self, key):
+        """Retorna o bloco `key` residente, carregando-o e atualizando o LRU."""
+
+        chunk = self.resident.get(key)
+        if chunk is None:
+            chunk = self.resident[key] = self._load(key)
+            if len(self.resident) > self.max_chunks:
+                self._evict()
+        else:
+            self.resident.move_to_end(key)
+        self._last_key = key
+        self._last_chunk = chunk
+        return chunk
+
+    def _peek(self, key):
+        """Retorna o bloco `key` sem torná-lo residente (consultas globais)."""
+
+        chunk = self.resident.get(key)
+        return chunk if chunk is not None else self._load(key)
+
+    def _evict(self):
+        """Descarta o bloco menos usado, guardando-o empacotado se foi alterado."""
+
+        key, chunk = self.resident.popitem(last=False)
+        if chunk.modified:
+            self.saved[key] = (np.packbits(chunk.grid).tobytes(), np.packbits(chunk.obstacles).tobytes())
+        if key == self._last_key:
+            self._last_key = None
+            self._last_chunk = None
+        self.evicted += 1
+
+    def _cell(self, y, x):
+        """
+        Retorna:
+            (bloco, linha local, coluna local) da célula (y, x)
+        """
+
+        cs = self.chunk_size
+        key = (y // cs, x // cs)
+        chunk = self._last_chunk if key == self._last_key else self._chunk(key)
+        return chunk, y - key[0] * cs, x - key[1] * cs
+
+    def _count(self, key):
+        """Sujeira do bloco `key`, gerando só a camada de sujeira se ainda não visto."""
+
+        count = self.chunk_dirt.get(key)
+        if count is None:
+            count = self.chunk_dirt[key] = int(self._generate(key, obstacles=False)[0].sum())
+        return count
+
+    def _move_mask(self, y, x):
+        """Calcula a máscara de movimentos possíveis a partir de (y, x)."""
+
+        chunk, ly, lx = self._cell(y, x)
+        rows = chunk.obstacles
+        if 0 < ly < len(rows) - 1 and 0 < lx < len(rows[0]) - 1:
+            # Vizinhança inteira dentro do bloco: sem novas consultas
+            return ((0 if rows[ly-1][lx] else MOVE_UP) | (0 if rows[ly+1][lx] else MOVE_DOWN)
+                    | (0 if rows[ly][lx-1] else MOVE_LEFT) | (0 if rows[ly][lx+1] else MOVE_RIGHT))
+        mask = 0
+        if y > 0 and not self.is_obstacle(y-1, x): mask |= MOVE_UP
+        if y < self.height - 1 and not self.is_obstacle(y+1, x): mask |= MOVE_DOWN
+        if x > 0 and not self.is_obstacle(y, x-1): mask |= MOVE_LEFT
+        if x < self.width - 1 and not self.is_obstacle(y, x+1): mask |= MOVE_RIGHT
+        # As consultas nas bordas podem trocar o bloco em cache
+        self._cell(y, x)
+        return mask
+
+    def get_local_percept(self):
+        """
+        Retorna:
+            Dict contendo sujeira atual e movimentos possíveis
+        """
+
+        mask, dirty = self.get_compact_percept()
+        return {'current_dirty': dirty, 'possible_moves': list(MOVES_BY_MASK[mask])}
+
+    def get_compact_percept(self):
+        """
+        Retorna:
+            Tupla (mask, dirty), como em GridEnvironment
+        """
+
+        y, x = self.agent_pos
+        mask = self._move_mask(y, x)
+        chunk, ly, lx = self._cell(y, x)
+        return mask, chunk.grid[ly][lx]
+
+    def execute_action(self, action):
+        """
+        Executa a ação do agente no ambiente.
+
+        Args:
+            action: Ação a ser executada (CLEAN, UP, DOWN, LEFT, RIGHT)
+        """
+
+        y, x = self.agent_pos
+        if action == 'CLEAN':
+            self.set_dirt(y, x, False)
+        elif self._move_mask(y, x) & MOVE_BITS.get(action, 0):
+            dy, dx = MOVE_DELTAS[action]
+            self.agent_pos = (y+dy, x+dx)
+
+    def is_dirty(self, y, x):
+        """Verifica se há sujeira na posição especificada."""
+
+        chunk, ly, lx = self._cell(y, x)
+        return chunk.grid[ly][lx]
+
+    def set_dirt(self, y, x, value=True):
+        """
+        Define a sujeira de uma célula mantendo a contagem do bloco.
+
+        Args:
+            y: Linha da célula
+            x: Coluna da célula
+            value: True para sujar, False para limpar
+        """
+
+        chunk, ly, lx = self._cell(y, x)
+        if chunk.grid[ly][lx] == bool(value):
+            return
+        chunk.grid[ly][lx] = bool(value)
+        chunk.modified = True
+        self.chunk_dirt[self._last_key] += 1 if value else -1
+
+    def is_obstacle(self, y, x):
+        """Verifica se há obstáculo na posição especificada."""
+
+        chunk, ly, lx = self._cell(y, x)
+        return chunk.obstacles[ly][lx]
+
+    def set_obstacle(self, y, x, value=True):
+        chunk, ly, lx = self._cell(y, x)
+        chunk.obstacles[ly][lx] = bool(value)
+        chunk.modified = True
+
+    def _chunk_keys(self):
+        return ((cy, cx) for cy in range(self.chunks_y) for cx in range(self.chunks_x))
+
+    def dirt_count(self):
+        """
+        Retorna o número de células sujas. Blocos nunca vistos têm a
+        sujeira gerada (sem ficarem residentes) na primeira chamada.
+        """
+
+        return sum(self._count(key) for key in self._chunk_keys())
+
+    def is_clean(self):
+        """
+        Verifica se todo o ambiente está limpo, parando no primeiro bloco
+        com sujeira (normalmente um bloco já conhecido).
+        """
+
+        if any(self.chunk_dirt.values()):
+            return False
+        return not any(self._count(key) for key in self._chunk_keys())
+
+    def _chunk_cells(self, key):
+        chunk = self._peek(key)
+        oy, ox = key[0] * self.chunk_size, key[1] * self.chunk_size
+        return [(oy + ly, ox + lx) for ly, row in enumerate(chunk.grid) for lx, dirty in enumerate(row) if dirty]
+
+    def dirty_cells(self):
+        """Itera sobre as posições (y, x) sujas, visitando só blocos com sujeira."""
+
+        for key in self._chunk_keys():
+            if self._count(key):
+                yield from self._chunk_cells(key)
+
+    def nearest_dirt(self, y, x):
+        """
+        Retorna a célula suja mais próxima de (y, x) em distância Manhattan,
+        ignorando obstáculos, ou None se o ambiente está limpo.
+
+        Percorre anéis de blocos em torno do bloco de (y, x), como o
+        DirtIndex, e para quando nenhum anel mais distante pode ter uma
+        célula mais próxima.
+        """
+
+        cs = self.chunk_size
+        oy, ox = y // cs, x // cs
+        best, best_dist = None, None
+        max_ring = max(oy, self.chunks_y - 1 - oy, ox, self.chunks_x - 1 - ox)
+        for ring in range(max_ring + 1):
+            for cy in range(max(oy - ring, 0), min(oy + ring, self.chunks_y - 1) + 1):
+                edge = cy in (oy - ring, oy + ring)
+                for cx in (range(max(ox - ring, 0), min(ox + ring, self.chunks_x - 1) + 1)
+                           if edge else (ox - ring, ox + ring)):
+                    if not 0 <= cx < self.chunks_x or not self._count((cy, cx)):
+                        continue
+                    for cell in self._chunk_cells((cy, cx)):
+                        dist = abs(cell[0] - y) + abs(cell[1] - x)
+                        if best_dist is None or dist < best_dist:
+                            best, best_dist = cell, dist
+            if best_dist is not None and best_dist <= ring * cs:
+                break
+        return best
+
+    def copy(self):
+        """
+        Cria uma cópia independente do ambiente (blocos residentes, blocos
+        guardados, contagens e posição).
+
+        Retorna:
+            Novo ambiente com o mesmo estado
+        """
+
+        clone = ChunkedGridEnvironment.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.resident = OrderedDict(
+            (key, Chunk([row[:] for row in chunk.grid], [row[:] for row in chunk.obstacles], chunk.modified))
+            for key, chunk in self.resident.items()
+        )
+        clone.saved = dict(self.saved)
+        clone.chunk_dirt = dict(self.chunk_dirt)
+        clone._last_key = None
+        clone._last_chunk = None
+        return clone
+
+    def snapshot(self):
+        """
+        Salva o estado atual. Só os blocos alterados são guardados
+        (empacotados); os demais voltam a ser gerados pela semente.
+
+        Retorna:
+            ChunkSnapshot para `restore` ou `from_snapshot`
+        """
+
+        saved = dict(self.saved)
+        for key, chunk in self.resident.items():
+            if chunk.modified:
+                saved[key] = (np.packbits(chunk.grid).tobytes(), np.packbits(chunk.obstacles).tobytes())
+        return ChunkSnapshot(self._config(), saved, dict(self.chunk_dirt), self.agent_pos)
+
+    def restore(self, snapshot):
+        """
+        Volta ao estado salvo em `snapshot`, descartando os blocos
+        residentes (custo proporcional aos blocos alterados).
+
+        Args:
+            snapshot: ChunkSnapshot de um ambiente com a mesma configuração
+
+        Raises:
+            ValueError: Se o snapshot é de outra classe ou configuração
+        """
+
+        if not isinstance(snapshot, ChunkSnapshot) or snapshot.config != self._config():
+            raise ValueError("Snapshot não pode ser restaurado neste ChunkedGridEnvironment")
+        self.resident.clear()
+        self.saved = dict(snapshot.saved)
+        self.chunk_dirt = dict(snapshot.chunk_dirt)
+        self.agent_pos = snapshot.agent_pos
+        self._last_key = None
+        self._last_chunk = None
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Cria um ambiente novo no estado salvo em `snapshot`."""
+
+        width, height, dirt_prob, obstacle_prob, seed, chunk_size, max_chunks = snapshot.config
+        env = cls(width, height, dirt_prob, obstacle_prob, rng=seed, chunk_size=chunk_size,
+                  max_chunks=max_chunks)
+        env.restore(snapshot)
+        return env
+
+    def stats(self):
+        """
+        Retorna:
+            Dict com blocos residentes, guardados, conhecidos, carregados e descartados,
+            e a memória aproximada das camadas residentes e guardadas (bytes)
+        """
+
+        cells = sum(len(chunk.grid) * len(chunk.grid[0]) for chunk in self.resident.values())
+        return {
+            'resident': len(self.resident),
+            'saved': len(self.saved),
+            'known': len(self.chunk_dirt),
+            'loaded': self.loaded,
+            'evicted': self.evicted,
+            # Listas de bool: um ponteiro de 8 bytes por célula em cada camada
+            'resident_bytes': 2 * 8 * cells,
+            'saved_bytes': sum(len(a) + len(b) for a, b in self.saved.values()),
+        }
@@ -0,0 +1,158 @@
+class DirtIndex:
+    """
+    Índice espacial das células sujas de uma grade.
+
+    A grade é dividida em blocos de `block` x `block` células e o índice
+    guarda quantas células sujas há em cada bloco, além do total. Assim a
+    verificação "está tudo limpo?" é O(1) e a busca da sujeira mais próxima
+    só examina células de blocos que ainda têm sujeira.
+
+    O índice não guarda as células em si: lê a própria grade (`grid[y][x]`)
+    quando precisa delas. Quem altera a grade deve avisar o índice com
+    `add`/`remove`, ou chamar `rebuild` após trocar a grade inteira.
+    """
+
+    def __init__(self, grid, width, height, block=8):
+        """
+        Constrói o índice a partir de uma grade existente.
+
+        Args:
+            grid: Matriz de sujeira indexável como grid[y][x]
+            width: Largura da grade
+            height: Altura da grade
+            block: Lado de cada bloco, em células
+        """
+
+        self.width = width
+        self.height = height
+        self.block = block
+        self.blocks_y = (height + block - 1) // block
+        self.blocks_x = (width + block - 1) // block
+        self.rebuild(grid)
+
+    def rebuild(self, grid):
+        """Recalcula todas as contagens a partir da grade (O(células))."""
+
+        self.grid = grid
+        b = self.block
+        self.counts = [[0] * self.blocks_x for _ in range(self.blocks_y)]
+        self.total = 0
+        for y in range(self.height):
+            row = grid[y]
+            counts = self.counts[y // b]
+            for x in range(self.width):
+                if row[x]:
+                    counts[x // b] += 1
+                    self.total += 1
+
+    def add(self, y, x):
+        """Registra que a célula (y, x) passou de limpa para suja."""
+
+        self.counts[y // self.block][x // self.block] += 1
+        self.total += 1
+
+    def remove(self, y, x):
+        """Registra que a célula (y, x) passou de suja para limpa."""
+
+        self.counts[y // self.block][x // self.block] -= 1
+        self.total -= 1
+
+    def __len__(self):
+        return self.total
+
+    def block_cells(self, by, bx):
+        """
+        Lista as células sujas de um bloco.
+
+        Args:
+            by: Linha do bloco
+            bx: Coluna do bloco
+
+        Retorna:
+            Lista de posições (y, x) sujas dentro do bloco
+        """
+
+        b = self.block
+        grid = self.grid
+        cells = []
+        for y in range(by * b, min((by + 1) * b, self.height)):
+            row = grid[y]
+            for x in range(bx * b, min((bx + 1) * b, self.width)):
+                if row[x]:
+                    cells.append((y, x))
+        return cells
+
+    def cells(self):
+        """Itera sobre todas as células sujas, visitando só blocos com sujeira."""
+
+        for by, counts in enumerate(self.counts):
+            for bx, count in enumerate(counts):
+                if count:
+                    yield from self.block_cells(by, bx)
+
+    def nearest(self, y, x):
+        """
+        Encontra a célula suja mais próxima de (y, x) em distância Manhattan
+        (obstáculos não são considerados).
+
+        Percorre anéis de blocos em torno do bloco de (y, x) e para assim que
+        nenhum bloco mais distante puder conter uma célula mais próxima.
+
+        Args:
+            y: Linha de origem
+            x: Coluna de origem
+
+        Retorna:
+            Posição (y, x) da sujeira mais próxima ou None se está tudo limpo
+        """
+
+        if self.total == 0:
+            return None
+        b = self.block
+        oy, ox = y // b, x // b
+        best = None
+        best_dist = None
+        max_ring = max(oy, self.blocks_y - 1 - oy, ox, self.blocks_x - 1 - ox)
+        for ring in range(max_ring + 1):
+            for by, bx in self._ring(oy, ox, ring):
+                if not self.counts[by][bx]:
+                    continue
+                for cy, cx in self.block_cells(by, bx):
+                    dist = abs(cy - y) + abs(cx - x)
+                    if best_dist is None or dist < best_dist:
+                        best, best_dist = (cy, cx), dist
+            # Células em anéis mais externos estão a pelo menos ring*b+1 de distância
+            if best_dist is not None and best_dist <= ring * b:
+                break
+        return best
+
+    def _ring(self, oy, ox, ring):
+        """Gera os blocos válidos à distância de Chebyshev `ring` do bloco (oy, ox)."""
+
+        if ring == 0:
+            yield oy, ox
+            return
+        for by in range(oy - ring, oy + ring + 1):
+            if not 0 <= by < self.blocks_y:
+                continue
+            if by in (oy - ring, oy + ring):
+                for bx in range(max(ox - ring, 0), min(ox + ring, self.blocks_x - 1) + 1):
+                    yield by, bx
+            else:
+                for bx in (ox - ring, ox + ring):
+                    if 0 <= bx < self.blocks_x:
+                        yield by, bx
+
+    def copy(self, grid):
+        """
+        Cria uma cópia do índice associada a outra grade com o mesmo conteúdo.
+
+        Args:
+            grid: Grade já copiada que o novo índice deve ler
+        """
+
+        clone = DirtIndex.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.grid = grid
+        clone.counts = [row[:] for row in self.counts]
+        return clone
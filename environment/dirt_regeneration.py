@@ -0,0 +1,140 @@
+import heapq
+import random
+
+# Sujeira dinâmica: as células voltam a sujar ao longo do tempo, com taxas
+# diferentes por zona do mapa.
+#
+# Cada célula de uma zona recebe sujeira como um processo de Poisson com
+# `rate` eventos por passo. Um processo de Poisson por célula equivale a um
+# único processo por zona, com taxa rate * área, em que cada evento escolhe
+# uma célula uniformemente (sujar uma célula já suja não muda nada). O
+# agendador guarda só o próximo instante de cada zona em um heap: um passo
+# sem evento custa uma comparação, e um evento custa O(log zonas).
+# Zonas sobrepostas somam as taxas.
+
+
+class SoilZone:
+    """
+    Retângulo do mapa com uma taxa de re-sujeira por célula.
+
+    Atributos:
+        y0, x0, y1, x1: Limites do retângulo (y1 e x1 exclusivos)
+        rate: Sujeiras esperadas por célula por passo (ex.: 0.001 suja cada
+            célula, em média, uma vez a cada 1000 passos)
+    """
+
+    def __init__(self, y0, x0, y1, x1, rate):
+        if y1 <= y0 or x1 <= x0:
+            raise ValueError(f"Zona vazia: ({y0}, {x0})-({y1}, {x1})")
+        if rate < 0:
+            raise ValueError(f"Taxa negativa: {rate}")
+        self.y0 = y0
+        self.x0 = x0
+        self.y1 = y1
+        self.x1 = x1
+        self.rate = rate
+
+    @property
+    def area(self):
+        return (self.y1 - self.y0) * (self.x1 - self.x0)
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Lê uma zona no formato 'y0,x0,y1,x1,taxa' (linha de comando).
+
+        Raises:
+            ValueError: Se o texto não está no formato esperado
+        """
+
+        parts = text.split(',')
+        if len(parts) != 5:
+            raise ValueError(f"Zona inválida (esperado y0,x0,y1,x1,taxa): {text}")
+        y0, x0, y1, x1 = (int(part) for part in parts[:4])
+        return cls(y0, x0, y1, x1, float(parts[4]))
+
+    def __repr__(self):
+        return f"SoilZone({self.y0}, {self.x0}, {self.y1}, {self.x1}, {self.rate})"
+
+
+class DirtScheduler:
+    """
+    Agendador de eventos de re-sujeira por fila de prioridade.
+
+    Guarda no heap o próximo instante de evento de cada zona. `advance(now)`
+    dispara, em ordem de tempo, só os eventos com instante <= now; o custo
+    de uma simulação longa é proporcional ao número de eventos, não ao
+    número de células vezes o número de passos.
+
+    Funciona com qualquer ambiente que tenha is_obstacle, is_dirty e set_dirt
+    (o índice de sujeira continua correto).
+    """
+
+    def __init__(self, env, zones, rng=None, start=0):
+        """
+        Args:
+            env: Ambiente cujas células voltam a sujar
+            zones: Sequência de SoilZone (recortadas às dimensões do ambiente)
+            rng: Gerador aleatório (random.Random); usa o módulo random se None
+            start: Instante inicial (em passos)
+        """
+
+        self.env = env
+        self.rng = rng if rng is not None else random
+        self.zones = []
+        self.heap = []
+        for zone in zones:
+            y0, x0 = max(zone.y0, 0), max(zone.x0, 0)
+            y1, x1 = min(zone.y1, env.height), min(zone.x1, env.width)
+            if y1 <= y0 or x1 <= x0 or zone.rate == 0:
+                continue
+            zone = SoilZone(y0, x0, y1, x1, zone.rate)
+            index = len(self.zones)
+            self.zones.append(zone)
+            self.heap.append((start + self.rng.expovariate(zone.rate * zone.area), index))
+        heapq.heapify(self.heap)
+        self.fired = 0  # eventos disparados
+        self.soiled = 0  # eventos que sujaram uma célula limpa
+
+    @classmethod
+    def uniform(cls, env, rate, rng=None, zones=()):
+        """
+        Cria um agendador com a taxa `rate` no mapa inteiro, mais `zones`.
+        """
+
+        base = [SoilZone(0, 0, env.height, env.width, rate)] if rate > 0 else []
+        return cls(env, base + list(zones), rng)
+
+    @property
+    def next_time(self):
+        """Instante do próximo evento (inf se não há zonas)."""
+
+        return self.heap[0][0] if self.heap else float('inf')
+
+    def advance(self, now):
+        """
+        Dispara todos os eventos com instante <= now.
+
+        Args:
+            now: Instante atual (em passos)
+
+        Retorna:
+            Número de células que passaram de limpas para sujas
+        """
+
+        heap = self.heap
+        env = self.env
+        rng = self.rng
+        soiled = 0
+        while heap and heap[0][0] <= now:
+            time, index = heap[0]
+            zone = self.zones[index]
+            y = zone.y0 + int(rng.random() * (zone.y1 - zone.y0))
+            x = zone.x0 + int(rng.random() * (zone.x1 - zone.x0))
+            if not env.is_obstacle(y, x) and not env.is_dirty(y, x):
+                env.set_dirt(y, x, True)
+                soiled += 1
+            self.fired += 1
+            heapq.heapreplace(heap, (time + rng.expovariate(zone.rate * zone.area), index))
+        self.soiled += soiled
+        return soiled
@@ -1,12 +1,74 @@
+import copy
 import random
+from environment.dirt_index import DirtIndex
+from environment.percept import (
+    MOVE_BITS, MOVE_DELTAS, MOVES_BY_MASK, MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT,
+)
+
+class EnvironmentSnapshot:
+    """
+    Estado salvo por `snapshot()`: sujeira, obstáculos, máscaras de
+    movimento, posição do agente e índice de sujeira.
+
+    As camadas são compartilhadas com os ambientes que a criaram ou
+    restauraram (cópia na escrita): nunca devem ser alteradas diretamente.
+    O formato das camadas depende do armazenamento, registrado em
+    `env_class`; só um ambiente desse armazenamento pode restaurá-lo.
+    """
+
+    def __init__(self, width, height, grid, obstacles, move_masks, agent_pos, dirt_index, rng,
+                 env_class=None):
+        self.env_class = env_class
+        self.width = width
+        self.height = height
+        self.grid = grid
+        self.obstacles = obstacles
+        self.move_masks = move_masks
+        self.agent_pos = agent_pos
+        self.dirt_index = dirt_index
+        self.rng = rng
+
+
+def check_snapshot(snapshot, env_class):
+    """
+    Verifica se `snapshot` pode ser restaurado em um ambiente de `env_class`.
+
+    Raises:
+        ValueError: Se o snapshot foi salvo por outro armazenamento
+    """
+
+    saved = getattr(snapshot, 'env_class', None)
+    if saved is not env_class:
+        name = f"Snapshot de {saved.__name__}" if saved is not None else type(snapshot).__name__
+        raise ValueError(f"{name} não pode ser restaurado em {env_class.__name__}")
+
 
 class GridEnvironment:
     """
     Ambiente em grade para simulação de agentes aspiradores.
     Representa um mundo 2D com sujeira e obstáculos.
+
+    Mantém um índice das células sujas (`dirt_index`), atualizado a cada
+    limpeza. Alterações de sujeira feitas fora do ambiente devem usar
+    `set_dirt` ou `load_grid` para que o índice continue correto.
+
+    Também pré-calcula, para cada célula, a máscara de 4 bits dos movimentos
+    possíveis (`move_masks`), atualizada por `set_obstacle`/`load_obstacles`.
+
+    `snapshot`/`restore` salvam e recuperam o estado sem copiar a grade:
+    as linhas de sujeira e as camadas de obstáculos passam a ser
+    compartilhadas, e uma linha só é copiada na primeira escrita depois
+    disso (`_shared_rows`). Por isso a sujeira deve ser alterada apenas por
+    `execute_action`, `set_dirt` ou `load_grid`.
     """
 
-    def __init__(self, width, height, dirt_prob=0.3, obstacle_prob=0.1):
+    dirt_index_class = DirtIndex
+    # Cópia na escrita: linhas da grade e camada de obstáculos compartilhadas
+    # com snapshots (None / False quando nada é compartilhado)
+    _shared_rows = None
+    _obstacles_shared = False
+
+    def __init__(self, width, height, dirt_prob=0.3, obstacle_prob=0.1, rng=None):
         """
         Inicializa o ambiente com dimensões e probabilidades especificadas.
         
@@ -15,17 +77,57 @@ class GridEnvironment:
             height: Altura do ambiente
             dirt_prob: Probabilidade de cada célula estar suja
             obstacle_prob: Probabilidade de cada célula ter obstáculo
+            rng: Gerador aleatório (random.Random); usa o módulo random se None
         """
 
+        self.rng = rng if rng is not None else random
         self.width = width
         self.height = height
-        self.grid = [[random.random() < dirt_prob for _ in range(width)] for _ in range(height)]
-        self.obstacles = [[random.random() < obstacle_prob for _ in range(width)] for _ in range(height)]
+        self.grid = [[self.rng.random() < dirt_prob for _ in range(width)] for _ in range(height)]
+        self.obstacles = [[self.rng.random() < obstacle_prob for _ in range(width)] for _ in range(height)]
         self.agent_pos = (0, 0)
         # Garante que a posição inicial não é obstáculo
         self.obstacles[0][0] = False
         # Garante que pelo menos uma saída da posição inicial está livre
         self._ensure_initial_not_blocked()
+        self.dirt_index = self.dirt_index_class(self.grid, width, height)
+        self._rebuild_move_masks()
+
+    @classmethod
+    def from_lists(cls, grid, obstacles, agent_pos=(0, 0)):
+        """
+        Cria um ambiente a partir de listas de listas de booleanos.
+
+        Args:
+            grid: Matriz de sujeira
+            obstacles: Matriz de obstáculos
+            agent_pos: Posição inicial do agente
+
+        Retorna:
+            Novo ambiente com uma cópia das camadas
+        """
+
+        env = cls.__new__(cls)
+        env.rng = random
+        env.grid = [list(row) for row in grid]
+        env.obstacles = [list(row) for row in obstacles]
+        env.height = len(env.grid)
+        env.width = len(env.grid[0]) if env.grid else 0
+        env.agent_pos = agent_pos
+        env.dirt_index = env.dirt_index_class(env.grid, env.width, env.height)
+        env._rebuild_move_masks()
+        return env
+
+    @classmethod
+    def from_arrays(cls, grid, obstacles, agent_pos=(0, 0)):
+        """
+        Cria um ambiente a partir de arrays NumPy booleanos (altura, largura).
+
+        Retorna:
+            Novo ambiente; aqui as camadas são convertidas para listas
+        """
+
+        return cls.from_lists(grid.tolist(), obstacles.tolist(), agent_pos)
 
     def _ensure_initial_not_blocked(self):
         """Garante que a posição inicial (0,0) não está bloqueada por obstáculos."""
@@ -39,10 +141,34 @@ class GridEnvironment:
         # Se todos os vizinhos são obstáculos, libera um aleatório
         blocked = [self.obstacles[ny][nx] for ny, nx in neighbors]
         if all(blocked):
-            idx = random.choice(range(len(neighbors)))
+            idx = self.rng.choice(range(len(neighbors)))
             ny, nx = neighbors[idx]
             self.obstacles[ny][nx] = False
 
+    def _cell_move_mask(self, y, x):
+        """Calcula a máscara de movimentos possíveis a partir de (y, x)."""
+
+        mask = 0
+        # Verifica se o destino não é obstáculo antes de permitir o movimento
+        if y > 0 and not self.obstacles[y-1][x]: mask |= MOVE_UP
+        if y < self.height - 1 and not self.obstacles[y+1][x]: mask |= MOVE_DOWN
+        if x > 0 and not self.obstacles[y][x-1]: mask |= MOVE_LEFT
+        if x < self.width - 1 and not self.obstacles[y][x+1]: mask |= MOVE_RIGHT
+        return mask
+
+    def _rebuild_move_masks(self):
+        """Recalcula a máscara de movimentos de todas as células."""
+
+        self.move_masks = [[self._cell_move_mask(y, x) for x in range(self.width)]
+                           for y in range(self.height)]
+
+    def _update_move_masks(self, y, x):
+        """Atualiza as máscaras afetadas por uma mudança de obstáculo em (y, x)."""
+
+        for ny, nx in ((y, x), (y-1, x), (y+1, x), (y, x-1), (y, x+1)):
+            if 0 <= ny < self.height and 0 <= nx < self.width:
+                self.move_masks[ny][nx] = self._cell_move_mask(ny, nx)
+
     def get_local_percept(self):
         """
         Retorna:
@@ -56,6 +182,18 @@ class GridEnvironment:
         }
         return percept
 
+    def get_compact_percept(self):
+        """
+        Percepção sem alocação de listas ou dicts, para laços de alto desempenho.
+
+        Retorna:
+            Tupla (mask, dirty): máscara de 4 bits dos movimentos possíveis
+            (ver environment.percept) e se a célula atual está suja
+        """
+
+        y, x = self.agent_pos
+        return self.move_masks[y][x], self.grid[y][x]
+
     def _get_possible_moves(self):
         """
         Calcula os movimentos possíveis a partir da posição atual.
@@ -65,13 +203,7 @@ class GridEnvironment:
         """
 
         y, x = self.agent_pos
-        moves = []
-        # Verifica se o destino não é obstáculo antes de permitir o movimento
-        if y > 0 and not self.obstacles[y-1][x]: moves.append('UP')
-        if y < self.height - 1 and not self.obstacles[y+1][x]: moves.append('DOWN')
-        if x > 0 and not self.obstacles[y][x-1]: moves.append('LEFT')
-        if x < self.width - 1 and not self.obstacles[y][x+1]: moves.append('RIGHT')
-        return moves
+        return list(MOVES_BY_MASK[self.move_masks[y][x]])
 
     def execute_action(self, action):
         """
@@ -83,15 +215,12 @@ class GridEnvironment:
 
         y, x = self.agent_pos
         if action == 'CLEAN':
-            self.grid[y][x] = False
-        elif action == 'UP' and y > 0 and not self.obstacles[y-1][x]:
-            self.agent_pos = (y-1, x)
-        elif action == 'DOWN' and y < self.height - 1 and not self.obstacles[y+1][x]:
-            self.agent_pos = (y+1, x)
-        elif action == 'LEFT' and x > 0 and not self.obstacles[y][x-1]:
-            self.agent_pos = (y, x-1)
-        elif action == 'RIGHT' and x < self.width - 1 and not self.obstacles[y][x+1]:
-            self.agent_pos = (y, x+1)
+            if self.grid[y][x]:
+                self._own_row(y)[x] = False
+                self.dirt_index.remove(y, x)
+        elif self.move_masks[y][x] & MOVE_BITS.get(action, 0):
+            dy, dx = MOVE_DELTAS[action]
+            self.agent_pos = (y+dy, x+dx)
 
     def is_clean(self):
         """
@@ -101,7 +230,158 @@ class GridEnvironment:
             Boolean indicando se todas as células estão limpas
         """
 
-        return all(not cell for row in self.grid for cell in row)
+        return len(self.dirt_index) == 0
+
+    def is_dirty(self, y, x):
+        """Verifica se há sujeira na posição especificada."""
+
+        return self.grid[y][x]
+
+    def set_dirt(self, y, x, value=True):
+        """
+        Define a sujeira de uma célula mantendo o índice de sujeira atualizado.
+
+        Args:
+            y: Linha da célula
+            x: Coluna da célula
+            value: True para sujar, False para limpar
+        """
+
+        if bool(self.grid[y][x]) == bool(value):
+            return
+        self._own_row(y)[x] = bool(value)
+        if value:
+            self.dirt_index.add(y, x)
+        else:
+            self.dirt_index.remove(y, x)
+
+    def load_grid(self, grid):
+        """
+        Substitui toda a camada de sujeira por uma cópia de `grid` e
+        reconstrói o índice de sujeira.
+
+        Args:
+            grid: Matriz de sujeira indexável como grid[y][x]
+        """
+
+        self.grid = [list(row) for row in grid]
+        self._shared_rows = None
+        self.dirt_index.rebuild(self.grid)
+
+    def _own_row(self, y):
+        """Retorna a linha `y` da sujeira, copiando-a antes se for compartilhada."""
+
+        shared = self._shared_rows
+        if shared is not None and shared[y]:
+            self.grid[y] = self.grid[y][:]
+            shared[y] = 0
+        return self.grid[y]
+
+    def _own_obstacles(self):
+        """Copia obstáculos e máscaras antes de alterá-los, se compartilhados."""
+
+        if self._obstacles_shared:
+            self.obstacles = [row[:] for row in self.obstacles]
+            self.move_masks = [row[:] for row in self.move_masks]
+            self._obstacles_shared = False
+
+    def dirt_count(self):
+        """Retorna o número de células ainda sujas (O(1))."""
+
+        return len(self.dirt_index)
+
+    def dirty_cells(self):
+        """Itera sobre as posições (y, x) ainda sujas."""
+
+        return self.dirt_index.cells()
+
+    def nearest_dirt(self, y, x):
+        """
+        Retorna a célula suja mais próxima de (y, x) em distância Manhattan,
+        ignorando obstáculos, ou None se o ambiente está limpo.
+        """
+
+        return self.dirt_index.nearest(y, x)
+
+    def copy(self):
+        """
+        Cria uma cópia independente do ambiente (sujeira, obstáculos e posição).
+
+        Retorna:
+            Novo ambiente com o mesmo estado
+        """
+
+        clone = copy.copy(self)
+        clone.grid = [row[:] for row in self.grid]
+        clone.obstacles = [row[:] for row in self.obstacles]
+        clone.dirt_index = self.dirt_index.copy(clone.grid)
+        clone.move_masks = [row[:] for row in self.move_masks]
+        clone._shared_rows = None
+        clone._obstacles_shared = False
+        return clone
+
+    def snapshot(self):
+        """
+        Salva o estado atual em O(altura): as linhas de sujeira e os
+        obstáculos passam a ser compartilhados com o snapshot e só são
+        copiados quando o ambiente os alterar.
+
+        Retorna:
+            EnvironmentSnapshot para `restore` ou `from_snapshot`
+        """
+
+        self._shared_rows = bytearray(b'\x01') * self.height
+        self._obstacles_shared = True
+        return EnvironmentSnapshot(self.width, self.height, tuple(self.grid), self.obstacles,
+                                   self.move_masks, self.agent_pos, self.dirt_index.copy(None),
+                                   self.rng, GridEnvironment)
+
+    def restore(self, snapshot):
+        """
+        Volta ao estado salvo em `snapshot` sem copiar a grade (O(altura) mais
+        as contagens do índice de sujeira).
+
+        Args:
+            snapshot: EnvironmentSnapshot de um GridEnvironment
+
+        Raises:
+            ValueError: Se o snapshot é de outro armazenamento
+        """
+
+        check_snapshot(snapshot, GridEnvironment)
+        self.width = snapshot.width
+        self.height = snapshot.height
+        self.grid = list(snapshot.grid)
+        self._shared_rows = bytearray(b'\x01') * self.height
+        self.obstacles = snapshot.obstacles
+        self.move_masks = snapshot.move_masks
+        self._obstacles_shared = True
+        self.agent_pos = snapshot.agent_pos
+        self.dirt_index = snapshot.dirt_index.copy(self.grid)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+        Cria um ambiente novo no estado salvo em `snapshot`.
+
+        Retorna:
+            Ambiente que compartilha as camadas com o snapshot até alterá-las
+        """
+
+        env = cls.__new__(cls)
+        env.rng = snapshot.rng
+        env.grid = None
+        env.restore(snapshot)
+        return env
+
+    def to_arrays(self):
+        """
+        Retorna:
+            Tupla (grid, obstacles) de arrays NumPy booleanos (altura, largura)
+        """
+
+        import numpy as np
+        return np.array(self.grid, dtype=bool), np.array(self.obstacles, dtype=bool)
 
     def is_obstacle(self, y, x):
         """Verifica se há obstáculo na posição especificada."""
@@ -110,4 +390,19 @@ class GridEnvironment:
 
     # Opcional: método para customizar obstáculos externamente
     def set_obstacle(self, y, x, value=True):
+        self._own_obstacles()
         self.obstacles[y][x] = value
+        self._update_move_masks(y, x)
+
+    def load_obstacles(self, obstacles):
+        """
+        Substitui toda a camada de obstáculos por uma cópia de `obstacles` e
+        recalcula as máscaras de movimento.
+
+        Args:
+            obstacles: Matriz de obstáculos indexável como obstacles[y][x]
+        """
+
+        self.obstacles = [list(row) for row in obstacles]
+        self._obstacles_shared = False
+        self._rebuild_move_masks()
@@ -0,0 +1,272 @@
+from environment.grid_environment import GridEnvironment, check_snapshot
+from environment.percept import (
+    MOVE_BITS, MOVE_DELTAS, MOVES_BY_MASK, MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT,
+)
+
+# Tentativas de sorteio de uma célula livre antes de listar as livres
+_PLACEMENT_TRIES = 64
+
+
+class MultiAgentGridEnvironment(GridEnvironment):
+    """
+    GridEnvironment com vários agentes no mesmo mapa.
+
+    As posições ficam em `agent_positions` (lista indexada pelo número do
+    agente) e `occupancy` mapeia cada célula ocupada para o agente que está
+    nela, então verificar colisões é O(1) e nada custa O(grade) por agente.
+
+    `step(actions)` executa uma ação de cada agente ao mesmo tempo, com
+    regras de conflito determinísticas:
+
+    1. CLEAN e movimentos contra paredes ou obstáculos mantêm o agente parado.
+    2. Se vários agentes querem a mesma célula, vence o de menor índice.
+    3. Dois agentes que trocariam de lugar ficam parados.
+    4. Um agente só entra em uma célula ocupada se o ocupante sair dela no
+       mesmo passo (filas andam juntas; ciclos de 3 ou mais giram).
+
+    `agent_pos`, `get_compact_percept`, `get_local_percept` e
+    `execute_action` continuam funcionando para o agente 0, então o código
+    de um único agente roda sem mudanças. As máscaras das percepções
+    consideram só paredes e obstáculos; `occupied_mask` diz quais vizinhos
+    estão ocupados por outros agentes.
+    """
+
+    # Criado pelo primeiro `agent_pos = ...` (GridEnvironment.__init__ e construtores)
+    agent_positions = None
+
+    def __init__(self, width, height, dirt_prob=0.3, obstacle_prob=0.1, rng=None,
+                 n_agents=1, positions=None):
+        """
+        Args:
+            width, height, dirt_prob, obstacle_prob, rng: Como em GridEnvironment
+            n_agents: Número de agentes; o agente 0 começa em (0, 0) e os
+                demais em células livres sorteadas com `rng`
+            positions: Posições iniciais explícitas (substitui `n_agents`)
+        """
+
+        super().__init__(width, height, dirt_prob, obstacle_prob, rng)
+        if positions is None:
+            positions = self.random_positions(n_agents)
+        self.place_agents(positions)
+
+    @property
+    def agent_pos(self):
+        return self.agent_positions[0]
+
+    @agent_pos.setter
+    def agent_pos(self, pos):
+        if self.agent_positions is None:
+            self.agent_positions = [pos]
+            self.occupancy = {pos: 0}
+        else:
+            self.move_agent(0, pos)
+
+    @property
+    def n_agents(self):
+        return len(self.agent_positions)
+
+    def random_positions(self, n, first=(0, 0)):
+        """
+        Sorteia posições livres e distintas para `n` agentes.
+
+        Args:
+            n: Número de agentes
+            first: Posição do agente 0
+
+        Retorna:
+            Lista de posições (y, x)
+        """
+
+        positions = [first][:n]
+        taken = set(positions)
+        rng = self.rng
+        while len(positions) < n:
+            for _ in range(_PLACEMENT_TRIES):
+                pos = (rng.randrange(self.height), rng.randrange(self.width))
+                if pos not in taken and not self.obstacles[pos[0]][pos[1]]:
+                    break
+            else:
+                # Mapa quase cheio: sorteia entre as células livres restantes
+                free = [(y, x) for y in range(self.height) for x in range(self.width)
+                        if not self.obstacles[y][x] and (y, x) not in taken]
+                if len(free) < n - len(positions):
+                    raise ValueError(f"Não há células livres para {n} agentes")
+                pos = rng.choice(free)
+            positions.append(pos)
+            taken.add(pos)
+        return positions
+
+    def place_agents(self, positions):
+        """
+        Substitui todos os agentes pelos das posições dadas.
+
+        Args:
+            positions: Sequência de posições (y, x) livres e distintas
+        """
+
+        occupancy = {}
+        for i, (y, x) in enumerate(positions):
+            if not (0 <= y < self.height and 0 <= x < self.width) or self.obstacles[y][x]:
+                raise ValueError(f"Posição inválida para o agente {i}: {(y, x)}")
+            if (y, x) in occupancy:
+                raise ValueError(f"Agentes {occupancy[(y, x)]} e {i} na mesma célula {(y, x)}")
+            occupancy[(y, x)] = i
+        if not occupancy:
+            raise ValueError("O ambiente precisa de pelo menos um agente")
+        self.agent_positions = list(occupancy)
+        self.occupancy = occupancy
+
+    def move_agent(self, agent, pos):
+        """
+        Coloca um agente em `pos` diretamente, sem regras de movimento.
+
+        Raises:
+            ValueError: Se a célula já está ocupada por outro agente
+        """
+
+        owner = self.occupancy.get(pos)
+        if owner is not None and owner != agent:
+            raise ValueError(f"Célula {pos} ocupada pelo agente {owner}")
+        del self.occupancy[self.agent_positions[agent]]
+        self.occupancy[pos] = agent
+        self.agent_positions[agent] = pos
+
+    def agent_at(self, y, x):
+        """Retorna o índice do agente em (y, x), ou None se a célula está vazia."""
+
+        return self.occupancy.get((y, x))
+
+    def occupied_mask(self, agent=0):
+        """
+        Retorna:
+            Máscara de 4 bits (ver environment.percept) dos vizinhos do
+            agente ocupados por outros agentes
+        """
+
+        y, x = self.agent_positions[agent]
+        occupancy = self.occupancy
+        mask = 0
+        if (y-1, x) in occupancy: mask |= MOVE_UP
+        if (y+1, x) in occupancy: mask |= MOVE_DOWN
+        if (y, x-1) in occupancy: mask |= MOVE_LEFT
+        if (y, x+1) in occupancy: mask |= MOVE_RIGHT
+        return mask
+
+    def get_compact_percept(self, agent=0):
+        """
+        Retorna:
+            Tupla (mask, dirty) da posição do agente, como em GridEnvironment
+        """
+
+        y, x = self.agent_positions[agent]
+        return self.move_masks[y][x], self.grid[y][x]
+
+    def get_local_percept(self, agent=0):
+        y, x = self.agent_positions[agent]
+        return {
+            'current_dirty': self.grid[y][x],
+            'possible_moves': self._get_possible_moves(agent),
+        }
+
+    def _get_possible_moves(self, agent=0):
+        y, x = self.agent_positions[agent]
+        return list(MOVES_BY_MASK[self.move_masks[y][x]])
+
+    def execute_action(self, action, agent=0):
+        """
+        Executa a ação de um único agente; os demais ficam parados.
+
+        Retorna:
+            True se um movimento foi bloqueado por outro agente
+        """
+
+        actions = [None] * len(self.agent_positions)
+        actions[agent] = action
+        return bool(self.step(actions))
+
+    def step(self, actions):
+        """
+        Executa simultaneamente uma ação por agente (regras na docstring da classe).
+
+        Custa O(agentes): cada agente é examinado um número constante de vezes.
+
+        Args:
+            actions: Sequência com uma ação por agente (None mantém o agente parado)
+
+        Retorna:
+            Lista, em ordem crescente, dos agentes cujo movimento foi
+            bloqueado por outro agente
+        """
+
+        positions = self.agent_positions
+        occupancy = self.occupancy
+        n = len(positions)
+        if len(actions) != n:
+            raise ValueError(f"Esperava {n} ações, recebeu {len(actions)}")
+        grid = self.grid
+        move_masks = self.move_masks
+        targets = list(positions)
+        claims = {}  # célula de destino -> agente que a reservou
+        blocked = []
+        for i, action in enumerate(actions):
+            y, x = positions[i]
+            if action == 'CLEAN':
+                if grid[y][x]:
+                    self._own_row(y)[x] = False
+                    self.dirt_index.remove(y, x)
+            elif action is not None and move_masks[y][x] & MOVE_BITS.get(action, 0):
+                dy, dx = MOVE_DELTAS[action]
+                target = (y+dy, x+dx)
+                if target in claims:
+                    blocked.append(i)  # regra 2: a célula já foi reservada por um índice menor
+                else:
+                    claims[target] = i
+                    targets[i] = target
+        if not claims:
+            return blocked
+
+        # Regra 3: trocas de lugar
+        for target, i in list(claims.items()):
+            j = occupancy.get(target)
+            if j is not None and j > i and targets[j] == positions[i]:
+                for k in (i, j):
+                    del claims[targets[k]]
+                    targets[k] = positions[k]
+                    blocked.append(k)
+
+        # Regra 4: quem fica parado bloqueia quem queria entrar na sua célula,
+        # em cadeia (cada agente entra na pilha no máximo uma vez)
+        stack = [i for i in range(n) if targets[i] == positions[i]]
+        while stack:
+            i = claims.pop(positions[stack.pop()], None)
+            if i is not None:
+                targets[i] = positions[i]
+                blocked.append(i)
+                stack.append(i)
+
+        for i in claims.values():
+            del occupancy[positions[i]]
+        for target, i in claims.items():
+            occupancy[target] = i
+            positions[i] = target
+        blocked.sort()
+        return blocked
+
+    def copy(self):
+        clone = super().copy()
+        clone.agent_positions = list(self.agent_positions)
+        clone.occupancy = dict(self.occupancy)
+        return clone
+
+    def snapshot(self):
+        """Como GridEnvironment.snapshot, guardando também a posição de todos os agentes."""
+
+        snapshot = super().snapshot()
+        snapshot.agent_positions = tuple(self.agent_positions)
+        return snapshot
+
+    def restore(self, snapshot):
+        check_snapshot(snapshot, GridEnvironment)  # antes de alterar qualquer estado
+        self.agent_positions = None  # o setter de agent_pos não deve mover o agente 0
+        super().restore(snapshot)
+        self.place_agents(getattr(snapshot, 'agent_positions', (snapshot.agent_pos,)))
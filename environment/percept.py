@@ -0,0 +1,47 @@
+# Representação compacta das percepções.
+#
+# Além do dict {'current_dirty', 'possible_moves'}, o ambiente oferece a
+# percepção compacta (mask, dirty): `mask` é um inteiro de 4 bits com os
+# movimentos possíveis e `dirty` indica se a célula atual está suja.
+
+MOVES = ('UP', 'DOWN', 'LEFT', 'RIGHT')
+
+MOVE_UP = 1
+MOVE_DOWN = 2
+MOVE_LEFT = 4
+MOVE_RIGHT = 8
+
+MOVE_BITS = {'UP': MOVE_UP, 'DOWN': MOVE_DOWN, 'LEFT': MOVE_LEFT, 'RIGHT': MOVE_RIGHT}
+
+# Deslocamento (dy, dx) de cada movimento
+MOVE_DELTAS = {'UP': (-1, 0), 'DOWN': (1, 0), 'LEFT': (0, -1), 'RIGHT': (0, 1)}
+
+# Tupla de movimentos possíveis para cada máscara, na ordem UP, DOWN, LEFT, RIGHT
+MOVES_BY_MASK = tuple(
+    tuple(move for move in MOVES if mask & MOVE_BITS[move]) for mask in range(16)
+)
+
+
+def mask_from_moves(moves):
+    """Converte uma lista de movimentos na máscara de 4 bits correspondente."""
+
+    mask = 0
+    for move in moves:
+        mask |= MOVE_BITS[move]
+    return mask
+
+
+def percept_parts(percept):
+    """
+    Extrai (mask, dirty) de uma percepção em qualquer um dos dois formatos.
+
+    Args:
+        percept: Tupla compacta (mask, dirty) ou dict de get_local_percept
+
+    Retorna:
+        Tupla (mask, dirty)
+    """
+
+    if type(percept) is tuple:
+        return percept
+    return mask_from_moves(percept['possible_moves']), percept['current_dirty']
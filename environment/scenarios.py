@@ -0,0 +1,193 @@
+import os
+import struct
+import warnings
+import numpy as np
+from environment.array_environment import ArrayGridEnvironment
+
+# Formato de cenário em disco (.vscn), inteiros little-endian:
+#
+#   cabeçalho   'VSCN', versão (u16), reservado (u16), largura, altura,
+#               y0, x0 do agente, tamanho do nome, deslocamento dos planos (u32)
+#   nome        UTF-8, seguido de zeros até o deslocamento dos planos
+#   obstáculos  plano de bits, uma linha por vez (np.packbits(axis=1)):
+#               ceil(largura / 8) bytes por linha, bit mais significativo primeiro
+#   sujeira     plano de bits no mesmo formato
+#
+# Os planos começam em um deslocamento múltiplo de 64 e cada linha ocupa um
+# número inteiro de bytes, então qualquer faixa de linhas pode ser lida
+# direto do arquivo mapeado em memória, sem ler o resto.
+
+MAGIC = b'VSCN'
+VERSION = 1
+HEADER = struct.Struct('<4sHH6I')
+PLANE_ALIGN = 64
+EXTENSION = '.vscn'
+# Biblioteca de plantas compartilhada pela interface e pelo modo em lote
+SCENARIO_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scenarios')
+
+
+def write_scenario(path, obstacles, dirt, agent_pos=(0, 0), name=''):
+    """
+    Grava um cenário no formato .vscn.
+
+    Args:
+        path: Arquivo de destino
+        obstacles: Matriz de obstáculos (array ou listas de listas)
+        dirt: Matriz de sujeira com as mesmas dimensões
+        agent_pos: Posição inicial do agente (y, x)
+        name: Nome exibido na lista de cenários
+    """
+
+    obstacles = np.asarray(obstacles, dtype=bool)
+    dirt = np.asarray(dirt, dtype=bool)
+    if obstacles.shape != dirt.shape or obstacles.ndim != 2:
+        raise ValueError("Obstáculos e sujeira devem ser matrizes com as mesmas dimensões")
+    height, width = obstacles.shape
+    encoded = name.encode('utf-8')
+    offset = -(-(HEADER.size + len(encoded)) // PLANE_ALIGN) * PLANE_ALIGN
+    header = HEADER.pack(MAGIC, VERSION, 0, width, height, agent_pos[0], agent_pos[1],
+                         len(encoded), offset)
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(encoded)
+        f.write(b'\0' * (offset - len(header) - len(encoded)))
+        f.write(np.packbits(obstacles, axis=1).tobytes())
+        f.write(np.packbits(dirt, axis=1).tobytes())
+
+
+def save_scenario(path, env, name=''):
+    """Grava o estado atual de um ambiente (sujeira, obstáculos e posição) como cenário."""
+
+    dirt, obstacles = env.to_arrays()
+    write_scenario(path, obstacles, dirt, env.agent_pos, name)
+
+
+class ScenarioFile:
+    """
+    Cenário .vscn aberto com mapeamento em memória.
+
+    Só o cabeçalho é lido na abertura; os planos de bits são desempacotados
+    de forma vetorizada quando pedidos, inteiros ou por faixa de linhas.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Arquivo .vscn
+        """
+
+        self.path = path
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+        if data.size < HEADER.size:
+            raise ValueError(f"Arquivo de cenário truncado: {path}")
+        magic, version, _, width, height, y0, x0, name_len, offset = HEADER.unpack_from(
+            data[:HEADER.size].tobytes())
+        if magic != MAGIC:
+            raise ValueError(f"Arquivo não é um cenário: {path}")
+        if version != VERSION:
+            raise ValueError(f"Versão de cenário não suportada: {version}")
+        self.width = width
+        self.height = height
+        self.agent_pos = (y0, x0)
+        self.name = data[HEADER.size:HEADER.size + name_len].tobytes().decode('utf-8')
+        self.row_bytes = (width + 7) // 8
+        plane = self.row_bytes * height
+        if data.size < offset + 2 * plane:
+            raise ValueError(f"Arquivo de cenário truncado: {path}")
+        # Visão (plano, linha, bytes da linha) sobre o arquivo mapeado
+        self.planes = data[offset:offset + 2 * plane].reshape(2, height, self.row_bytes)
+
+    def _plane(self, index, y0, y1):
+        bits = np.unpackbits(self.planes[index, y0:y1], axis=1, count=self.width)
+        return bits.view(bool)
+
+    def obstacles(self, y0=0, y1=None):
+        """
+        Retorna:
+            Array booleano (linhas, largura) dos obstáculos nas linhas y0..y1-1
+        """
+
+        return self._plane(0, y0, self.height if y1 is None else y1)
+
+    def dirt(self, y0=0, y1=None):
+        """
+        Retorna:
+            Array booleano (linhas, largura) da sujeira nas linhas y0..y1-1
+        """
+
+        return self._plane(1, y0, self.height if y1 is None else y1)
+
+    def to_env(self, env_class=ArrayGridEnvironment):
+        """
+        Cria um ambiente com o conteúdo do cenário.
+
+        Args:
+            env_class: ArrayGridEnvironment (padrão, adequado a mapas grandes),
+                GridEnvironment, SparseGridEnvironment ou
+                AdaptiveGridEnvironment (escolhe pela densidade de sujeira)
+
+        Retorna:
+            Ambiente novo, com o agente na posição inicial do cenário
+        """
+
+        return env_class.from_arrays(self.dirt(), self.obstacles(), self.agent_pos)
+
+
+def load_scenario(path, env_class=ArrayGridEnvironment):
+    """
+    Abre um cenário .vscn e cria o ambiente correspondente.
+
+    Args:
+        path: Arquivo .vscn
+        env_class: Classe do ambiente criado
+
+    Retorna:
+        Ambiente novo
+    """
+
+    return ScenarioFile(path).to_env(env_class)
+
+
+def list_scenarios(directory=SCENARIO_DIR):
+    """
+    Lista os cenários de uma biblioteca, em ordem de nome de arquivo.
+
+    Arquivos ilegíveis ou inválidos são ignorados com um aviso
+    (warnings.warn), para que um arquivo ruim não esconda os demais.
+
+    Retorna:
+        Dict {nome do cenário: caminho}
+    """
+
+    if not os.path.isdir(directory):
+        return {}
+    scenarios = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(EXTENSION):
+            path = os.path.join(directory, filename)
+            try:
+                name = ScenarioFile(path).name
+            except (OSError, ValueError) as exc:
+                warnings.warn(f"Cenário {filename} ignorado: {exc}", stacklevel=2)
+                continue
+            scenarios[name or filename[:-len(EXTENSION)]] = path
+    return scenarios
+
+
+def resolve_scenario(name, directory=SCENARIO_DIR):
+    """
+    Encontra um cenário por caminho, nome ou nome de arquivo na biblioteca.
+
+    Retorna:
+        Caminho do arquivo .vscn
+    """
+
+    if os.path.isfile(name):
+        return name
+    library = list_scenarios(directory)
+    if name in library:
+        return library[name]
+    path = os.path.join(directory, name if name.endswith(EXTENSION) else name + EXTENSION)
+    if os.path.isfile(path):
+        return path
+    raise ValueError(f"Cenário não encontrado: {name}")
@@ -0,0 +1,374 @@
+import copy
+import random
+from array import array
+from bisect import bisect_right
+import numpy as np
+from environment.grid_environment import EnvironmentSnapshot, GridEnvironment, check_snapshot
+from environment.percept import (
+    MOVE_BITS, MOVE_DELTAS, MOVES_BY_MASK, MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT,
+)
+
+# Densidade de sujeira até a qual o armazenamento esparso compensa: cada
+# célula suja custa uma tupla no conjunto (~100 bytes) contra 8 bytes por
+# célula, suja ou não, em cada camada densa de GridEnvironment.
+SPARSE_DIRT_DENSITY = 0.1
+
+
+def encode_row(row):
+    """
+    Codifica uma linha de obstáculos em trechos (run-length).
+
+    Args:
+        row: Sequência de booleanos (lista ou array)
+
+    Retorna:
+        array('i') com os limites [início0, fim0, início1, fim1, ...] de cada
+        trecho de obstáculos (fim exclusivo)
+    """
+
+    bits = np.asarray(row, dtype=bool).view(np.uint8)
+    edges = np.diff(np.concatenate(([0], bits, [0])).astype(np.int8))
+    bounds = np.empty(2 * int(np.count_nonzero(edges == 1)), dtype=np.int32)
+    bounds[0::2] = np.flatnonzero(edges == 1)
+    bounds[1::2] = np.flatnonzero(edges == -1)
+    return array('i', bounds.tobytes())
+
+
+def decode_row(bounds, width):
+    """Converte uma linha codificada por `encode_row` em lista de booleanos."""
+
+    row = [False] * width
+    for i in range(0, len(bounds), 2):
+        row[bounds[i]:bounds[i+1]] = [True] * (bounds[i+1] - bounds[i])
+    return row
+
+
+class SparseGridEnvironment:
+    """
+    Ambiente em grade para pouca sujeira: as células sujas ficam em um
+    conjunto de coordenadas e os obstáculos em linhas codificadas por trechos
+    (`encode_row`), consultadas com busca binária.
+
+    A memória depende do número de células sujas e de trechos de obstáculo,
+    não da área. As máscaras de movimento são calculadas na primeira visita
+    a cada célula e guardadas. Mantém a API de GridEnvironment, e o mesmo
+    gerador aleatório produz o mesmo mapa nas duas representações.
+    """
+
+    def __init__(self, width, height, dirt_prob=0.3, obstacle_prob=0.1, rng=None):
+        """
+        Inicializa o ambiente com dimensões e probabilidades especificadas.
+
+        Args:
+            width: Largura do ambiente
+            height: Altura do ambiente
+            dirt_prob: Probabilidade de cada célula estar suja
+            obstacle_prob: Probabilidade de cada célula ter obstáculo
+            rng: Gerador aleatório (random.Random); usa o módulo random se None
+        """
+
+        self.rng = rng if rng is not None else random
+        self.width = width
+        self.height = height
+        # Mesma sequência de sorteios de GridEnvironment, sem guardar a grade
+        rand = self.rng.random
+        self.dirt = {(y, x) for y in range(height) for x in range(width) if rand() < dirt_prob}
+        self.obstacle_rows = []
+        for y in range(height):
+            row = [rand() < obstacle_prob for _ in range(width)]
+            if y == 0 and width:
+                # Garante que a posição inicial não é obstáculo
+                row[0] = False
+            self.obstacle_rows.append(encode_row(row))
+        self.agent_pos = (0, 0)
+        self._obstacles_shared = False
+        self._masks = {}
+        self._ensure_initial_not_blocked()
+
+    def _ensure_initial_not_blocked(self):
+        """Garante que a posição inicial (0,0) tem uma saída livre."""
+
+        neighbors = []
+        if self.height > 1:
+            neighbors.append((1, 0))
+        if self.width > 1:
+            neighbors.append((0, 1))
+        if neighbors and all(self.is_obstacle(ny, nx) for ny, nx in neighbors):
+            idx = self.rng.choice(range(len(neighbors)))
+            self.set_obstacle(*neighbors[idx], value=False)
+
+    @classmethod
+    def from_lists(cls, grid, obstacles, agent_pos=(0, 0)):
+        """
+        Cria um ambiente a partir de listas de listas de booleanos.
+
+        Args:
+            grid: Matriz de sujeira
+            obstacles: Matriz de obstáculos
+            agent_pos: Posição inicial do agente
+
+        Retorna:
+            Novo SparseGridEnvironment
+        """
+
+        return cls.from_arrays(np.array(grid, dtype=bool), np.array(obstacles, dtype=bool), agent_pos)
+
+    @classmethod
+    def from_arrays(cls, grid, obstacles, agent_pos=(0, 0)):
+        """
+        Cria um ambiente a partir de arrays booleanos (altura, largura), sem
+        percorrer as células em Python.
+
+        Retorna:
+            Novo SparseGridEnvironment
+        """
+
+        env = cls.__new__(cls)
+        env.rng = random
+        env.height, env.width = grid.shape
+        ys, xs = np.nonzero(grid)
+        env.dirt = set(zip(ys.tolist(), xs.tolist()))
+        env.obstacle_rows = [encode_row(row) for row in obstacles]
+        env.agent_pos = agent_pos
+        env._obstacles_shared = False
+        env._masks = {}
+        return env
+
+    def _cell_move_mask(self, y, x):
+        """Calcula a máscara de movimentos possíveis a partir de (y, x)."""
+
+        mask = 0
+        if y > 0 and not self.is_obstacle(y-1, x): mask |= MOVE_UP
+        if y < self.height - 1 and not self.is_obstacle(y+1, x): mask |= MOVE_DOWN
+        if x > 0 and not self.is_obstacle(y, x-1): mask |= MOVE_LEFT
+        if x < self.width - 1 and not self.is_obstacle(y, x+1): mask |= MOVE_RIGHT
+        return mask
+
+    def _move_mask(self, pos):
+        mask = self._masks.get(pos)
+        if mask is None:
+            mask = self._masks[pos] = self._cell_move_mask(*pos)
+        return mask
+
+    def get_local_percept(self):
+        """
+        Retorna:
+            Dict contendo sujeira atual e movimentos possíveis
+        """
+
+        return {
+            'current_dirty': self.agent_pos in self.dirt,
+            'possible_moves': list(MOVES_BY_MASK[self._move_mask(self.agent_pos)]),
+        }
+
+    def get_compact_percept(self):
+        """
+        Retorna:
+            Tupla (mask, dirty), como em GridEnvironment
+        """
+
+        pos = self.agent_pos
+        return self._move_mask(pos), pos in self.dirt
+
+    def execute_action(self, action):
+        """
+        Executa a ação do agente no ambiente.
+
+        Args:
+            action: Ação a ser executada (CLEAN, UP, DOWN, LEFT, RIGHT)
+        """
+
+        if action == 'CLEAN':
+            self.dirt.discard(self.agent_pos)
+        elif self._move_mask(self.agent_pos) & MOVE_BITS.get(action, 0):
+            y, x = self.agent_pos
+            dy, dx = MOVE_DELTAS[action]
+            self.agent_pos = (y+dy, x+dx)
+
+    def is_clean(self):
+        """Verifica se todo o ambiente está limpo (O(1))."""
+
+        return not self.dirt
+
+    def is_dirty(self, y, x):
+        """Verifica se há sujeira na posição especificada."""
+
+        return (y, x) in self.dirt
+
+    def set_dirt(self, y, x, value=True):
+        """
+        Define a sujeira de uma célula.
+
+        Args:
+            y: Linha da célula
+            x: Coluna da célula
+            value: True para sujar, False para limpar
+        """
+
+        if value:
+            self.dirt.add((y, x))
+        else:
+            self.dirt.discard((y, x))
+
+    def load_grid(self, grid):
+        """
+        Substitui toda a camada de sujeira pelas células verdadeiras de `grid`.
+
+        Args:
+            grid: Matriz de sujeira indexável como grid[y][x]
+        """
+
+        self.dirt = {(y, x) for y, row in enumerate(grid) for x, dirty in enumerate(row) if dirty}
+
+    def dirt_count(self):
+        """Retorna o número de células ainda sujas (O(1))."""
+
+        return len(self.dirt)
+
+    def dirty_cells(self):
+        """Itera sobre as posições (y, x) ainda sujas, em ordem de linha."""
+
+        return iter(sorted(self.dirt))
+
+    def nearest_dirt(self, y, x):
+        """
+        Retorna a célula suja mais próxima de (y, x) em distância Manhattan,
+        ignorando obstáculos, ou None se o ambiente está limpo (O(sujeira)).
+        """
+
+        return min(self.dirt, key=lambda cell: (abs(cell[0] - y) + abs(cell[1] - x), cell), default=None)
+
+    def is_obstacle(self, y, x):
+        """Verifica se há obstáculo na posição especificada."""
+
+        # Índice ímpar: x está entre o início e o fim de um trecho
+        return bisect_right(self.obstacle_rows[y], x) & 1 == 1
+
+    def set_obstacle(self, y, x, value=True):
+        if self.is_obstacle(y, x) == bool(value):
+            return
+        if self._obstacles_shared:
+            self.obstacle_rows = list(self.obstacle_rows)
+            self._obstacles_shared = False
+        row = decode_row(self.obstacle_rows[y], self.width)
+        row[x] = bool(value)
+        # Cada linha codificada é imutável: a alteração cria uma nova
+        self.obstacle_rows[y] = encode_row(row)
+        for pos in ((y, x), (y-1, x), (y+1, x), (y, x-1), (y, x+1)):
+            self._masks.pop(pos, None)
+
+    def load_obstacles(self, obstacles):
+        """
+        Substitui toda a camada de obstáculos, codificando cada linha.
+
+        Args:
+            obstacles: Matriz de obstáculos indexável como obstacles[y][x]
+        """
+
+        self.obstacle_rows = [encode_row(row) for row in obstacles]
+        self._obstacles_shared = False
+        self._masks = {}
+
+    def to_arrays(self):
+        """
+        Retorna:
+            Tupla (grid, obstacles) de arrays booleanos (altura, largura)
+        """
+
+        grid = np.zeros((self.height, self.width), dtype=bool)
+        if self.dirt:
+            ys, xs = zip(*self.dirt)
+            grid[list(ys), list(xs)] = True
+        obstacles = np.zeros((self.height, self.width), dtype=bool)
+        for y, bounds in enumerate(self.obstacle_rows):
+            for i in range(0, len(bounds), 2):
+                obstacles[y, bounds[i]:bounds[i+1]] = True
+        return grid, obstacles
+
+    def copy(self):
+        """
+        Cria uma cópia independente do ambiente. As linhas de obstáculos
+        codificadas são imutáveis e podem ser compartilhadas.
+
+        Retorna:
+            Novo ambiente com o mesmo estado
+        """
+
+        clone = copy.copy(self)
+        clone.dirt = set(self.dirt)
+        clone.obstacle_rows = list(self.obstacle_rows)
+        clone._obstacles_shared = False
+        clone._masks = dict(self._masks)
+        return clone
+
+    def snapshot(self):
+        """
+        Salva o estado atual em O(sujeira): os obstáculos passam a ser
+        compartilhados com o snapshot até a próxima alteração.
+
+        Retorna:
+            EnvironmentSnapshot para `restore` ou `from_snapshot`
+        """
+
+        self._obstacles_shared = True
+        return EnvironmentSnapshot(self.width, self.height, frozenset(self.dirt), self.obstacle_rows,
+                                   self._masks.copy(), self.agent_pos, None, self.rng,
+                                   SparseGridEnvironment)
+
+    def restore(self, snapshot):
+        """
+        Volta ao estado salvo em `snapshot` (O(sujeira)).
+
+        Args:
+            snapshot: EnvironmentSnapshot de um SparseGridEnvironment
+
+        Raises:
+            ValueError: Se o snapshot é de outro armazenamento
+        """
+
+        check_snapshot(snapshot, SparseGridEnvironment)
+        self.width = snapshot.width
+        self.height = snapshot.height
+        self.dirt = set(snapshot.grid)
+        if getattr(self, 'obstacle_rows', None) is not snapshot.obstacles:
+            self.obstacle_rows = snapshot.obstacles
+            self._masks = snapshot.move_masks.copy()
+        self._obstacles_shared = True
+        self.agent_pos = snapshot.agent_pos
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Cria um ambiente novo no estado salvo em `snapshot`."""
+
+        env = cls.__new__(cls)
+        env.rng = snapshot.rng
+        env.restore(snapshot)
+        return env
+
+
+class AdaptiveGridEnvironment:
+    """
+    Escolhe o armazenamento na construção: SparseGridEnvironment quando a
+    densidade de sujeira é baixa (até `SPARSE_DIRT_DENSITY`) e
+    GridEnvironment caso contrário. Instanciar a classe devolve diretamente
+    o ambiente escolhido.
+    """
+
+    def __new__(cls, width, height, dirt_prob=0.3, obstacle_prob=0.1, rng=None):
+        env_class = SparseGridEnvironment if dirt_prob <= SPARSE_DIRT_DENSITY else GridEnvironment
+        return env_class(width, height, dirt_prob, obstacle_prob, rng)
+
+    @staticmethod
+    def from_arrays(grid, obstacles, agent_pos=(0, 0)):
+        """Cria o ambiente pela densidade de sujeira medida em `grid`."""
+
+        density = np.count_nonzero(grid) / grid.size if grid.size else 0.0
+        env_class = SparseGridEnvironment if density <= SPARSE_DIRT_DENSITY else GridEnvironment
+        return env_class.from_arrays(grid, obstacles, agent_pos)
+
+    @staticmethod
+    def from_lists(grid, obstacles, agent_pos=(0, 0)):
+        """Cria o ambiente pela densidade de sujeira medida em `grid`."""
+
+        return AdaptiveGridEnvironment.from_arrays(np.array(grid, dtype=bool),
+                                                   np.array(obstacles, dtype=bool), agent_pos)
@@ -0,0 +1,131 @@
+import numpy as np
+
+# Códigos inteiros das ações usados no modo vetorizado
+ACTIONS = ('CLEAN', 'UP', 'DOWN', 'LEFT', 'RIGHT')
+CLEAN, UP, DOWN, LEFT, RIGHT = range(5)
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+# Deslocamento (dy, dx) de cada ação, indexado pelo código
+ACTION_DY = np.array([0, -1, 1, 0, 0])
+ACTION_DX = np.array([0, 0, 0, -1, 1])
+
+
+class VecGridEnvironment:
+    """
+    K ambientes em grade de mesmo tamanho avançando em sincronia.
+    Sujeira e obstáculos ficam em arrays empilhados (K, altura, largura) e
+    cada chamada de `step` aplica K ações de uma vez, com as mesmas regras
+    de limites e obstáculos de GridEnvironment.execute_action.
+    """
+
+    def __init__(self, num_envs, width, height, dirt_prob=0.3, obstacle_prob=0.1, rng=None):
+        """
+        Inicializa K ambientes aleatórios independentes.
+
+        Args:
+            num_envs: Número de ambientes (K)
+            width: Largura de cada ambiente
+            height: Altura de cada ambiente
+            dirt_prob: Probabilidade de cada célula estar suja
+            obstacle_prob: Probabilidade de cada célula ter obstáculo
+            rng: numpy.random.Generator ou semente inteira; aleatório se None
+        """
+
+        self.rng = np.random.default_rng(rng)
+        self.num_envs = num_envs
+        self.width = width
+        self.height = height
+        shape = (num_envs, height, width)
+        self.grid = self.rng.random(shape) < dirt_prob
+        self.obstacles = self.rng.random(shape) < obstacle_prob
+        self.agent_y = np.zeros(num_envs, dtype=np.int64)
+        self.agent_x = np.zeros(num_envs, dtype=np.int64)
+        self._index = np.arange(num_envs)
+        # Garante que a posição inicial não é obstáculo
+        self.obstacles[:, 0, 0] = False
+        self._ensure_initial_not_blocked()
+
+    def _ensure_initial_not_blocked(self):
+        """Garante que a posição inicial (0,0) não está bloqueada em nenhum ambiente."""
+
+        neighbors = []
+        if self.height > 1:
+            neighbors.append((1, 0))
+        if self.width > 1:
+            neighbors.append((0, 1))
+        if not neighbors:
+            return
+        blocked = np.ones(self.num_envs, dtype=bool)
+        for ny, nx in neighbors:
+            blocked &= self.obstacles[:, ny, nx]
+        # Nos ambientes com todos os vizinhos bloqueados, libera um aleatório
+        envs = np.flatnonzero(blocked)
+        choice = self.rng.integers(len(neighbors), size=len(envs))
+        for i, (ny, nx) in enumerate(neighbors):
+            self.obstacles[envs[choice == i], ny, nx] = False
+
+    def get_local_percepts(self):
+        """
+        Retorna:
+            Tupla (dirty, moves): dirty tem forma (K,) e indica se a célula
+            atual está suja; moves tem forma (K, 4) e indica, na ordem
+            UP, DOWN, LEFT, RIGHT, se cada movimento é possível
+        """
+
+        y, x, k = self.agent_y, self.agent_x, self._index
+        dirty = self.grid[k, y, x]
+        moves = np.zeros((self.num_envs, 4), dtype=bool)
+        for col, action in enumerate((UP, DOWN, LEFT, RIGHT)):
+            moves[:, col] = self._can_move(ACTION_DY[action], ACTION_DX[action])
+        return dirty, moves
+
+    def _can_move(self, dy, dx):
+        """Verifica, para todos os ambientes, se o deslocamento (dy, dx) é possível."""
+
+        ty = self.agent_y + dy
+        tx = self.agent_x + dx
+        inside = (ty >= 0) & (ty < self.height) & (tx >= 0) & (tx < self.width)
+        free = np.zeros(self.num_envs, dtype=bool)
+        free[inside] = ~self.obstacles[self._index[inside], ty[inside], tx[inside]]
+        return free
+
+    def step(self, actions, active=None):
+        """
+        Executa uma ação em cada ambiente.
+
+        Args:
+            actions: Array (K,) de códigos de ação (ver ACTIONS)
+            active: Máscara (K,) opcional; ambientes inativos não mudam
+
+        Retorna:
+            Percepções após as ações, como em `get_local_percepts`
+        """
+
+        actions = np.asarray(actions)
+        if active is None:
+            active = np.ones(self.num_envs, dtype=bool)
+        k = self._index
+        clean = active & (actions == CLEAN)
+        self.grid[k[clean], self.agent_y[clean], self.agent_x[clean]] = False
+
+        ty = self.agent_y + ACTION_DY[actions]
+        tx = self.agent_x + ACTION_DX[actions]
+        move = active & (actions != CLEAN)
+        move &= (ty >= 0) & (ty < self.height) & (tx >= 0) & (tx < self.width)
+        move[move] = ~self.obstacles[k[move], ty[move], tx[move]]
+        self.agent_y[move] = ty[move]
+        self.agent_x[move] = tx[move]
+        return self.get_local_percepts()
+
+    def at_home(self):
+        """Retorna máscara (K,) dos ambientes com o agente em (0, 0)."""
+
+        return (self.agent_y == 0) & (self.agent_x == 0)
+
+    def is_clean(self):
+        """
+        Retorna:
+            Máscara (K,) dos ambientes sem nenhuma célula suja
+        """
+
+        return ~self.grid.any(axis=(1, 2))
@@ -0,0 +1,377 @@
+import numpy as np
+from environment.vec_environment import ACTIONS, ACTION_CODES, ACTION_DX, ACTION_DY, CLEAN
+
+# Métricas calculadas depois do episódio, sobre as ações gravadas.
+#
+# O laço de simulação só registra o código de cada ação (ACTION_CODES). As
+# medidas saem de arrays com todos os passos de um ou vários episódios, em
+# operações vetorizadas do NumPy, e podem ser recalculadas sobre traces
+# antigos sem simular de novo. Uma métrica nova é uma função que recebe um
+# EpisodeBatch, registrada com `register_metric`.
+
+
+class EpisodeBatch:
+    """
+    Pilha de episódios empacotada em arrays.
+
+    As ações de todos os episódios ficam concatenadas em um único array, e
+    as do episódio i estão em `actions[offsets[i]:offsets[i+1]]`. Posições e
+    mapas iniciais são opcionais; as métricas que precisam deles só são
+    calculadas quando estão presentes. Com posições iniciais e obstáculos,
+    as posições de cada passo são reconstruídas por `replay_positions`.
+
+    Atributos:
+        actions: Array uint8 (passos,) com o código de cada ação
+        lengths: Array (n,) com o número de passos de cada episódio
+        offsets: Array (n+1,) com o início de cada episódio em `actions`
+        episode: Array (passos,) com o episódio de cada passo
+        starts: Array (n, 2) com a posição inicial (y, x), ou None
+        positions: Array (passos, 2) com a posição depois de cada ação, ou None
+        dirt, obstacles: Arrays booleanos (n, altura, largura) do estado
+            inicial, ou None
+    """
+
+    def __init__(self, actions, lengths, starts=None, positions=None, dirt=None, obstacles=None):
+        """
+        Args:
+            actions: Códigos das ações de todos os episódios, concatenados
+            lengths: Número de passos de cada episódio
+            starts: Posição inicial de cada episódio
+            positions: Posição depois de cada ação (reconstruída se None e
+                houver `starts` e `obstacles`)
+            dirt: Sujeira inicial de cada episódio
+            obstacles: Obstáculos de cada episódio
+        """
+
+        self.actions = np.asarray(actions, dtype=np.uint8)
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        if self.lengths.sum() != len(self.actions):
+            raise ValueError("A soma dos tamanhos não bate com o número de ações")
+        if len(self.actions) and self.actions.max() >= len(ACTIONS):
+            raise ValueError("Código de ação inválido")
+        self.offsets = np.zeros(len(self.lengths) + 1, dtype=np.int64)
+        np.cumsum(self.lengths, out=self.offsets[1:])
+        self.episode = np.repeat(np.arange(len(self.lengths)), self.lengths)
+        self.starts = None if starts is None else np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+        if positions is not None and self.starts is None:
+            raise ValueError("Posições requerem as posições iniciais (starts)")
+        self.dirt = None if dirt is None else np.asarray(dirt, dtype=bool)
+        self.obstacles = None if obstacles is None else np.asarray(obstacles, dtype=bool)
+        if positions is None and self.starts is not None and self.obstacles is not None:
+            positions = replay_positions(self.actions, self.lengths, self.starts, self.obstacles)
+        self.positions = None if positions is None else np.asarray(positions, dtype=np.int64)
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.lengths)
+
+    @classmethod
+    def from_actions(cls, episodes, **kwargs):
+        """
+        Empilha episódios dados como sequências de códigos de ação.
+
+        Args:
+            episodes: Sequência de bytes, bytearray ou arrays de códigos
+            **kwargs: starts, positions, dirt e obstacles, como no construtor
+
+        Retorna:
+            EpisodeBatch com os episódios na ordem dada
+        """
+
+        codes = [np.frombuffer(bytes(episode), dtype=np.uint8)
+                 if isinstance(episode, (bytes, bytearray, memoryview))
+                 else np.asarray(episode, dtype=np.uint8) for episode in episodes]
+        actions = np.concatenate(codes) if codes else np.zeros(0, dtype=np.uint8)
+        return cls(actions, [len(c) for c in codes], **kwargs)
+
+    @classmethod
+    def from_traces(cls, traces):
+        """
+        Empilha traces gravados (simulation.traces.Trace), reconstruindo as
+        posições a partir do mapa inicial. Mapas menores que o maior são
+        completados com obstáculos.
+        """
+
+        height = max((trace.height for trace in traces), default=0)
+        width = max((trace.width for trace in traces), default=0)
+        dirt = np.zeros((len(traces), height, width), dtype=bool)
+        obstacles = np.ones((len(traces), height, width), dtype=bool)
+        for i, trace in enumerate(traces):
+            dirt[i, :trace.height, :trace.width] = trace.dirt
+            obstacles[i, :trace.height, :trace.width] = trace.obstacles
+        return cls.from_actions([trace.actions for trace in traces],
+                                starts=[trace.start for trace in traces],
+                                dirt=dirt, obstacles=obstacles)
+
+    def has(self, field):
+        """Verifica se o dado opcional `field` ('positions', 'dirt') está presente."""
+
+        return getattr(self, field) is not None
+
+    def previous_positions(self):
+        """
+        Retorna:
+            Array (passos, 2) com a posição antes de cada ação
+        """
+
+        previous = np.empty_like(self.positions)
+        previous[1:] = self.positions[:-1]
+        first = self.lengths > 0
+        previous[self.offsets[:-1][first]] = self.starts[first]
+        return previous
+
+    def action_counts(self):
+        """
+        Retorna:
+            Array (n, len(ACTIONS)) com quantas vezes cada ação foi executada
+        """
+
+        if 'counts' not in self._cache:
+            n = len(self)
+            counts = np.bincount(self.episode * len(ACTIONS) + self.actions, minlength=n * len(ACTIONS))
+            self._cache['counts'] = counts.reshape(n, len(ACTIONS))
+        return self._cache['counts']
+
+    def removals(self):
+        """
+        Passos em que uma limpeza de fato removeu sujeira: a primeira limpeza
+        de cada célula suja no estado inicial.
+
+        Retorna:
+            Array crescente de índices em `actions`
+        """
+
+        if 'removals' not in self._cache:
+            steps = np.flatnonzero(self.actions == CLEAN)
+            episode = self.episode[steps]
+            y, x = self.positions[steps].T
+            dirty = self.dirt[episode, y, x]
+            steps, episode, y, x = steps[dirty], episode[dirty], y[dirty], x[dirty]
+            _, height, width = self.dirt.shape
+            # np.unique devolve a primeira ocorrência de cada (episódio, célula)
+            _, first = np.unique((episode * height + y) * width + x, return_index=True)
+            self._cache['removals'] = np.sort(steps[first])
+        return self._cache['removals']
+
+    def per_episode(self, mask):
+        """Conta, por episódio, os passos em que `mask` é verdadeiro."""
+
+        return np.bincount(self.episode[mask], minlength=len(self))
+
+    def split(self, values):
+        """Divide um array por passo em uma lista com um array por episódio."""
+
+        return np.split(values, self.offsets[1:-1])
+
+
+def replay_positions(actions, lengths, starts, obstacles):
+    """
+    Reconstrói a posição do agente depois de cada ação, aplicando as regras
+    de movimento de GridEnvironment.execute_action (limites e obstáculos).
+
+    Os episódios avançam juntos, um passo por vez: o custo é uma operação
+    vetorizada por passo do episódio mais longo.
+
+    Args:
+        actions: Códigos das ações de todos os episódios, concatenados
+        lengths: Número de passos de cada episódio
+        starts: Array (n, 2) com a posição inicial de cada episódio
+        obstacles: Array booleano (n, altura, largura)
+
+    Retorna:
+        Array (passos, 2) com as posições (y, x)
+    """
+
+    actions = np.asarray(actions)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+    # Uma borda de obstáculos dispensa o teste de limites
+    blocked = np.pad(np.asarray(obstacles, dtype=bool), ((0, 0), (1, 1), (1, 1)), constant_values=True)
+    y = np.asarray(starts, dtype=np.int64)[:, 0] + 1
+    x = np.asarray(starts, dtype=np.int64)[:, 1] + 1
+    positions = np.empty((len(actions), 2), dtype=np.int64)
+    # Em ordem decrescente de tamanho, os episódios ativos são um prefixo
+    order = np.argsort(-lengths, kind='stable')
+    sorted_lengths = lengths[order]
+    for t in range(int(sorted_lengths[0]) if len(lengths) else 0):
+        active = order[:np.count_nonzero(sorted_lengths > t)]
+        steps = offsets[active] + t
+        codes = actions[steps]
+        ty = y[active] + ACTION_DY[codes]
+        tx = x[active] + ACTION_DX[codes]
+        free = ~blocked[active, ty, tx]
+        y[active] = np.where(free, ty, y[active])
+        x[active] = np.where(free, tx, x[active])
+        positions[steps, 0] = y[active] - 1
+        positions[steps, 1] = x[active] - 1
+    return positions
+
+
+class Metric:
+    """
+    Métrica registrada.
+
+    Atributos:
+        func: Função que recebe um EpisodeBatch e devolve um array
+        requires: Dados opcionais do EpisodeBatch de que a métrica precisa
+        per_step: Se True, o array tem um valor por passo (curva); senão,
+            um valor por episódio
+        description: Texto curto para relatórios
+    """
+
+    def __init__(self, func, requires=(), per_step=False, description=""):
+        self.func = func
+        self.requires = tuple(requires)
+        self.per_step = per_step
+        self.description = description
+
+    def available(self, batch):
+        return all(batch.has(field) for field in self.requires)
+
+
+METRICS = {}
+
+
+def register_metric(name, func, requires=(), per_step=False, description=""):
+    """
+    Registra uma métrica calculada por `compute_metrics`.
+
+    Args:
+        name: Nome da métrica (substitui uma registrada com o mesmo nome)
+        func: Função (EpisodeBatch) -> array
+        requires: Dados opcionais necessários ('positions', 'dirt')
+        per_step: Se a métrica tem um valor por passo
+        description: Texto curto para relatórios
+
+    Retorna:
+        func, para uso como decorador
+    """
+
+    METRICS[name] = Metric(func, requires, per_step, description)
+    return func
+
+
+def compute_metrics(batch, names=None):
+    """
+    Calcula métricas registradas sobre uma pilha de episódios.
+
+    Args:
+        batch: EpisodeBatch
+        names: Métricas a calcular; se None, todas as que os dados do
+            batch permitem
+
+    Retorna:
+        Dict nome -> array (n,) por episódio, ou (passos,) para as curvas
+
+    Raises:
+        ValueError: Se uma métrica pedida não existe ou faltam dados para ela
+    """
+
+    if names is None:
+        names = [name for name, metric in METRICS.items() if metric.available(batch)]
+    results = {}
+    for name in names:
+        metric = METRICS.get(name)
+        if metric is None:
+            raise ValueError(f"Métrica desconhecida: {name}")
+        if not metric.available(batch):
+            raise ValueError(f"A métrica {name} requer {', '.join(metric.requires)}")
+        results[name] = metric.func(batch)
+    return results
+
+
+def episode_metrics(codes, names=('cleaned', 'penalty')):
+    """
+    Calcula métricas de um único episódio a partir dos códigos das ações.
+
+    Args:
+        codes: bytearray (ou array) com o código de cada ação executada
+        names: Métricas a calcular (só as que dependem apenas das ações)
+
+    Retorna:
+        Dict nome -> inteiro
+    """
+
+    results = compute_metrics(EpisodeBatch.from_actions([codes]), names)
+    return {name: values[0].item() for name, values in results.items()}
+
+
+def cleaned(batch):
+    # Ações de limpeza executadas (limpar uma célula já limpa também conta)
+    return batch.action_counts()[:, ACTION_CODES['CLEAN']]
+
+
+def moves(batch):
+    return batch.action_counts().sum(axis=1) - cleaned(batch)
+
+
+def penalty(batch):
+    # +1 por movimento, -1 por limpar
+    return moves(batch) - cleaned(batch)
+
+
+def clean_and_move(batch):
+    # Limpezas menos movimentos, com mínimo 0
+    return np.maximum(cleaned(batch) - moves(batch), 0)
+
+
+def bumps(batch):
+    """Movimentos que não saíram do lugar (parede ou obstáculo)."""
+
+    stayed = (batch.positions == batch.previous_positions()).all(axis=1)
+    return batch.per_episode(stayed & (batch.actions != CLEAN))
+
+
+def revisits(batch):
+    """Movimentos que chegaram a uma célula já visitada no episódio."""
+
+    n = len(batch)
+    cells = np.concatenate((batch.starts, batch.positions))
+    episode = np.concatenate((np.arange(n), batch.episode))
+    width = int(cells[:, 1].max()) + 1 if len(cells) else 1
+    height = int(cells[:, 0].max()) + 1 if len(cells) else 1
+    distinct = np.unique((episode * height + cells[:, 0]) * width + cells[:, 1]) // (height * width)
+    visited = np.bincount(distinct, minlength=n)
+    # Cada movimento bem-sucedido chega a uma célula nova ou revisita uma
+    return moves(batch) - bumps(batch) - (visited - 1)
+
+
+def dirt_removed(batch):
+    """Sujeiras de fato removidas (limpar uma célula limpa não conta)."""
+
+    return np.bincount(batch.episode[batch.removals()], minlength=len(batch))
+
+
+def clean_curve(batch):
+    """Sujeiras removidas até cada passo, acumuladas dentro de cada episódio."""
+
+    removed = np.zeros(len(batch.actions), dtype=np.int64)
+    removed[batch.removals()] = 1
+    total = np.cumsum(removed)
+    before = np.concatenate(([0], total))[batch.offsets[:-1]]
+    return total - before[batch.episode]
+
+
+def time_to_clean(batch):
+    """Passos até remover toda a sujeira inicial (0 sem sujeira, -1 se não removeu)."""
+
+    removals = batch.removals()
+    last = np.full(len(batch), -1, dtype=np.int64)
+    np.maximum.at(last, batch.episode[removals], removals - batch.offsets[batch.episode[removals]] + 1)
+    initial = batch.dirt.sum(axis=(1, 2))
+    last[initial == 0] = 0
+    last[dirt_removed(batch) < initial] = -1
+    return last
+
+
+register_metric('cleaned', cleaned, description="Ações de limpeza")
+register_metric('moves', moves, description="Movimentos")
+register_metric('penalty', penalty, description="Penalidade (movimentos - limpezas)")
+register_metric('clean_and_move', clean_and_move, description="Limpezas - movimentos (mínimo 0)")
+register_metric('bumps', bumps, ('positions',), description="Movimentos bloqueados")
+register_metric('revisits', revisits, ('positions',), description="Revisitas")
+register_metric('dirt_removed', dirt_removed, ('positions', 'dirt'), description="Sujeiras removidas")
+register_metric('time_to_clean', time_to_clean, ('positions', 'dirt'),
+                description="Passos até limpar tudo (-1: não limpou)")
+register_metric('clean_curve', clean_curve, ('positions', 'dirt'), per_step=True,
+                description="Sujeiras removidas até cada passo")
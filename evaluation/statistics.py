@@ -0,0 +1,341 @@
+import math
+from statistics import NormalDist
+
+# Estatísticas em fluxo para lotes de simulações: memória constante no
+# número de simulações e resultados parciais combináveis (processos, lotes
+# vetorizados ou a interface gráfica).
+
+BATCH_KEYS = ('penalty', 'steps', 'cleaned', 'final', 'all_cleaned')
+# Medidas com quantis; final e all_cleaned são 0/1 e só precisam da média
+QUANTILE_KEYS = ('penalty', 'steps', 'cleaned')
+DEFAULT_RELATIVE_ACCURACY = 0.005
+
+
+class RunningStats:
+    """
+    Média e variância pelo algoritmo de Welford, mais soma, mínimo e máximo.
+
+    `merge` combina duas instâncias com a fórmula de Chan et al., então o
+    resultado de partes calculadas separadamente é o mesmo (a menos de
+    arredondamento) que o de todos os valores em uma única instância.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # soma dos quadrados dos desvios em relação à média
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """Acrescenta um valor."""
+
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @classmethod
+    def of_array(cls, values):
+        """
+        Calcula as estatísticas de um array NumPy de uma vez (vetorizado).
+
+        Retorna:
+            RunningStats com os valores de `values`
+        """
+
+        import numpy as np
+        values = np.asarray(values)
+        stats = cls()
+        if values.size:
+            stats.count = int(values.size)
+            stats.mean = float(values.mean())
+            stats.m2 = float(((values - stats.mean) ** 2).sum())
+            stats.total = values.sum().item()
+            stats.min = values.min().item()
+            stats.max = values.max().item()
+        return stats
+
+    def merge(self, other):
+        """
+        Incorpora as estatísticas de `other`.
+
+        Retorna:
+            self, para encadear
+        """
+
+        if not other.count:
+            return self
+        if not self.count:
+            self.__dict__.update(other.__dict__)
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """Variância amostral (0 com menos de dois valores)."""
+
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self):
+        return math.sqrt(self.variance)
+
+    def confidence_interval(self, level=0.95):
+        """
+        Intervalo de confiança da média pela aproximação normal.
+
+        Retorna:
+            Tupla (inferior, superior)
+        """
+
+        if self.count < 2:
+            return self.mean, self.mean
+        half = NormalDist().inv_cdf(0.5 + level / 2) * self.stdev / math.sqrt(self.count)
+        return self.mean - half, self.mean + half
+
+
+class QuantileSketch:
+    """
+    Sketch de quantis com erro relativo garantido (no estilo do DDSketch).
+
+    Cada valor cai em um balde logarítmico de razão gamma = (1+a)/(1-a),
+    com `a` a precisão relativa, e o sketch guarda só a contagem de cada
+    balde. O número de baldes depende da faixa dos valores, não de quantos
+    foram vistos. Dois sketches com a mesma precisão se combinam somando as
+    contagens. Quando todos os valores são inteiros, os quantis são
+    arredondados (valores até cerca de 1/(2a) ficam exatos).
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        """
+        Args:
+            relative_accuracy: Erro relativo máximo dos quantis (0 < a < 1)
+        """
+
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"Precisão relativa fora de (0, 1): {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}  # índice do balde -> contagem
+        self.negative = {}  # baldes de -valor
+        self.zeros = 0
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.integers = True
+
+    def add(self, value, n=1):
+        """Acrescenta `n` ocorrências de `value`."""
+
+        if value > 0:
+            index = math.ceil(math.log(value) / self.log_gamma)
+            self.positive[index] = self.positive.get(index, 0) + n
+        elif value < 0:
+            index = math.ceil(math.log(-value) / self.log_gamma)
+            self.negative[index] = self.negative.get(index, 0) + n
+        else:
+            self.zeros += n
+        self.count += n
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        if self.integers and value != int(value):
+            self.integers = False
+
+    @classmethod
+    def of_array(cls, values, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        """
+        Constrói o sketch de um array NumPy de uma vez (vetorizado).
+
+        Retorna:
+            QuantileSketch com os valores de `values`
+        """
+
+        import numpy as np
+        sketch = cls(relative_accuracy)
+        values = np.asarray(values)
+        if not values.size:
+            return sketch
+        for sign, buckets in ((1, sketch.positive), (-1, sketch.negative)):
+            part = values[values * sign > 0] * sign
+            if part.size:
+                indices = np.ceil(np.log(part) / sketch.log_gamma).astype(np.int64)
+                keys, counts = np.unique(indices, return_counts=True)
+                buckets.update(zip(keys.tolist(), counts.tolist()))
+        sketch.zeros = int((values == 0).sum())
+        sketch.count = int(values.size)
+        sketch.min = values.min().item()
+        sketch.max = values.max().item()
+        sketch.integers = bool(np.issubdtype(values.dtype, np.integer) or (values == np.round(values)).all())
+        return sketch
+
+    def merge(self, other):
+        """
+        Incorpora as contagens de `other` (mesma precisão relativa).
+
+        Retorna:
+            self, para encadear
+        """
+
+        if other.gamma != self.gamma:
+            raise ValueError("Sketches com precisões diferentes não podem ser combinados")
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, n in theirs.items():
+                mine[index] = mine.get(index, 0) + n
+        self.zeros += other.zeros
+        self.count += other.count
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        self.integers = self.integers and other.integers
+        return self
+
+    def _value(self, index):
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantile(self, q):
+        """
+        Estima o quantil `q` (0 a 1) dos valores vistos.
+
+        Retorna:
+            Valor estimado, ou None se o sketch está vazio
+        """
+
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        value = None
+        # Ordem crescente: negativos do maior módulo ao menor, zeros, positivos
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                value = -self._value(index)
+                break
+        else:
+            seen += self.zeros
+            if seen > rank:
+                value = 0
+            else:
+                for index in sorted(self.positive):
+                    seen += self.positive[index]
+                    if seen > rank:
+                        value = self._value(index)
+                        break
+        if value is None:
+            value = self.max
+        value = min(max(value, self.min), self.max)
+        return round(value) if self.integers else value
+
+    def nbuckets(self):
+        """Número de baldes em uso (memória do sketch)."""
+
+        return len(self.positive) + len(self.negative) + (1 if self.zeros else 0)
+
+
+class StatsAggregator:
+    """
+    Agregador em fluxo dos resultados de um lote de simulações.
+
+    Cada medida de BATCH_KEYS tem um RunningStats, e as de QUANTILE_KEYS
+    também um QuantileSketch. A memória não cresce com o número de
+    simulações, exceto com `keep_runs=True`, que guarda também os valores de
+    cada simulação em `runs` (na ordem de chegada).
+    """
+
+    def __init__(self, keep_runs=False, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        """
+        Args:
+            keep_runs: Se True, guarda a lista de valores de cada medida
+            relative_accuracy: Precisão relativa dos quantis
+        """
+
+        self.stats = {key: RunningStats() for key in BATCH_KEYS}
+        self.sketches = {key: QuantileSketch(relative_accuracy) for key in QUANTILE_KEYS}
+        self.runs = {key: [] for key in BATCH_KEYS} if keep_runs else None
+        self.elapsed = 0.0
+
+    @property
+    def count(self):
+        """Número de simulações agregadas."""
+
+        return self.stats['steps'].count
+
+    @property
+    def total_steps(self):
+        return self.stats['steps'].total
+
+    def add(self, result):
+        """
+        Acrescenta o resultado de uma simulação.
+
+        Args:
+            result: Dict com uma entrada por medida de BATCH_KEYS
+        """
+
+        for key, stats in self.stats.items():
+            stats.add(result[key])
+        for key, sketch in self.sketches.items():
+            sketch.add(result[key])
+        if self.runs is not None:
+            for key, values in self.runs.items():
+                values.append(result[key])
+
+    def add_arrays(self, results):
+        """
+        Acrescenta várias simulações de uma vez a partir de arrays NumPy
+        (um por medida, como em `vectorized.run_vec_episodes`).
+        """
+
+        for key, stats in self.stats.items():
+            stats.merge(RunningStats.of_array(results[key]))
+        for key, sketch in self.sketches.items():
+            sketch.merge(QuantileSketch.of_array(results[key], sketch.relative_accuracy))
+        if self.runs is not None:
+            for key, values in self.runs.items():
+                values.extend(results[key].tolist())
+
+    def merge(self, other):
+        """
+        Incorpora um agregador parcial (ex.: de outro processo).
+
+        Retorna:
+            self, para encadear
+        """
+
+        for key, stats in self.stats.items():
+            stats.merge(other.stats[key])
+        for key, sketch in self.sketches.items():
+            sketch.merge(other.sketches[key])
+        if self.runs is not None:
+            if other.runs is None:
+                raise ValueError("O agregador parcial não guardou as simulações (keep_runs)")
+            for key, values in self.runs.items():
+                values.extend(other.runs[key])
+        return self
+
+    def mean(self, key):
+        return self.stats[key].mean
+
+    def quantile(self, key, q):
+        return self.sketches[key].quantile(q)
+
+    def confidence_interval(self, key, level=0.95):
+        return self.stats[key].confidence_interval(level)
@@ -1,5 +1,52 @@
-from simulation.run_simulation import main
+import argparse
 
-if __name__ == "__main__":
-    main()
 
+def parse_args(argv=None):
+    """Interpreta a linha de comando. Sem subcomando, abre a interface gráfica."""
+
+    from simulation import continuous, fleet, headless, trace_metrics, traces
+
+    parser = argparse.ArgumentParser(description="Vacuum Agent Simulator")
+    subparsers = parser.add_subparsers(dest="command")
+    gui_parser = subparsers.add_parser("gui", help="Abre a interface gráfica (padrão)")
+    headless.add_profile_arguments(gui_parser)
+    batch_parser = subparsers.add_parser("batch", help="Executa simulações em lote sem interface gráfica")
+    headless.add_arguments(batch_parser)
+    replay_parser = subparsers.add_parser("replay", help="Reproduz um trace gravado com 'batch --record'")
+    traces.add_arguments(replay_parser)
+    metrics_parser = subparsers.add_parser("metrics", help="Calcula métricas sobre traces gravados")
+    trace_metrics.add_arguments(metrics_parser)
+    fleet_parser = subparsers.add_parser("fleet", help="Executa vários agentes no mesmo mapa")
+    fleet.add_arguments(fleet_parser)
+    continuous_parser = subparsers.add_parser("continuous", help="Operação contínua com sujeira que volta")
+    continuous.add_arguments(continuous_parser)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "batch":
+        from simulation import headless
+        headless.main(args)
+    elif args.command == "fleet":
+        from simulation import fleet
+        fleet.main(args)
+    elif args.command == "continuous":
+        from simulation import continuous
+        continuous.main(args)
+    elif args.command == "metrics":
+        from simulation import trace_metrics
+        trace_metrics.main(args)
+    elif args.command == "replay" and not args.gui:
+        from simulation import traces
+        traces.main(args)
+    elif args.command == "replay":
+        from simulation.run_simulation import main
+        main(trace_path=args.file)
+    else:
+        # tkinter só é importado quando a interface gráfica é usada
+        from simulation import headless
+        from simulation.run_simulation import main
+        profiler = headless.make_profiler(args) if args.command == "gui" else None
+        main(profiler)
+        headless.report_profile(profiler, args)
@@ -0,0 +1,83 @@
+import queue
+import threading
+import time
+from simulation.headless import make_agent, run_episode
+
+# Este módulo não importa tkinter: a interface só consome a fila de mensagens.
+
+
+class BatchWorker:
+    """
+    Executa um lote de simulações do mesmo mapa inicial em uma thread de
+    fundo e publica cada resultado em uma fila, para que a interface gráfica
+    acompanhe o progresso sem bloquear o loop de eventos do Tk.
+
+    Mensagens publicadas em `messages`:
+        ('result', índice, dict de run_episode)
+        ('done', cancelado, segundos decorridos)
+    """
+
+    def __init__(self, env, agent_type, n, max_steps=100):
+        """
+        Args:
+            env: Ambiente no estado inicial (salvo em um snapshot; o original
+                pode mudar depois sem afetar o lote)
+            agent_type: 'reactive' ou 'model'
+            n: Número de simulações
+            max_steps: Número máximo de passos por simulação
+        """
+
+        self.env_class = type(env)
+        self.initial = env.snapshot()
+        self.agent_type = agent_type
+        self.n = n
+        self.max_steps = max_steps
+        self.messages = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="batch-worker", daemon=True)
+
+    def start(self):
+        """Inicia a thread de fundo."""
+
+        self.thread.start()
+
+    def cancel(self):
+        """Pede o cancelamento; a simulação em curso termina antes de parar."""
+
+        self.cancelled.set()
+
+    def is_alive(self):
+        return self.thread.is_alive()
+
+    def _run(self):
+        start = time.perf_counter()
+        env = None
+        for i in range(self.n):
+            if self.cancelled.is_set():
+                break
+            if env is None:
+                env = self.env_class.from_snapshot(self.initial)
+            else:
+                env.restore(self.initial)
+            result = run_episode(env, make_agent(self.agent_type, env), self.max_steps)
+            self.messages.put(('result', i, result))
+        self.messages.put(('done', self.cancelled.is_set(), time.perf_counter() - start))
+
+    def drain(self, limit=1000):
+        """
+        Retira da fila as mensagens disponíveis, sem bloquear.
+
+        Args:
+            limit: Máximo de mensagens retiradas por chamada
+
+        Retorna:
+            Lista de mensagens
+        """
+
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self.messages.get_nowait())
+            except queue.Empty:
+                break
+        return items
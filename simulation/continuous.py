@@ -0,0 +1,124 @@
+import argparse
+import random
+import time
+from environment.dirt_regeneration import DirtScheduler, SoilZone
+from environment.percept import MOVES
+from simulation.headless import AGENT_TYPES, ENV_TYPES, make_agent, run_seed
+
+# Operação contínua com sujeira dinâmica: o episódio não termina quando o
+# agente volta para casa, e as células voltam a sujar pelo DirtScheduler.
+
+
+def run_continuous(env, agent, steps, scheduler):
+    """
+    Executa `steps` passos seguidos, disparando os eventos de re-sujeira.
+
+    Um passo sem evento custa só a comparação com o próximo instante do
+    agendador. Um agente com `restart_exploration` (baseado em modelo)
+    recomeça a exploração sempre que volta para casa.
+
+    Args:
+        env: Ambiente já inicializado
+        agent: Agente que escolhe as ações
+        steps: Número de passos
+        scheduler: DirtScheduler associado a `env`
+
+    Retorna:
+        Dict com steps, penalty, cleaned (limpezas que removeram sujeira),
+        soiled (células sujas pelo agendador), events, mean_dirt (sujeira
+        média por passo), max_dirt e final_dirt
+    """
+
+    percept = env.get_compact_percept
+    execute = env.execute_action
+    dirt_count = env.dirt_count
+    sync_pos = hasattr(agent, 'pos')
+    restart = getattr(agent, 'restart_exploration', None)
+    next_event = scheduler.next_time
+    penalty_score = 0
+    cleaned = 0
+    dirt_sum = 0
+    max_dirt = dirt_count()
+    for step in range(1, steps + 1):
+        action = agent.select_action(percept())
+        if action == 'CLEAN':
+            before = dirt_count()
+            execute(action)
+            cleaned += before - dirt_count()
+            penalty_score -= 1
+        else:
+            execute(action)
+            if action in MOVES:
+                penalty_score += 1
+        if sync_pos:
+            agent.pos = env.agent_pos
+            if restart is not None and agent.returning_home and agent.pos == (0, 0):
+                restart()
+        if step >= next_event:
+            scheduler.advance(step)
+            next_event = scheduler.next_time
+        dirt = dirt_count()
+        dirt_sum += dirt
+        if dirt > max_dirt:
+            max_dirt = dirt
+    return {
+        'steps': steps,
+        'penalty': penalty_score,
+        'cleaned': cleaned,
+        'soiled': scheduler.soiled,
+        'events': scheduler.fired,
+        'mean_dirt': dirt_sum / steps if steps else 0.0,
+        'max_dirt': max_dirt,
+        'final_dirt': dirt_count(),
+    }
+
+
+def format_summary(result, elapsed):
+    """Formata o resultado de `run_continuous` como texto."""
+
+    steps_per_sec = result['steps'] / elapsed if elapsed > 0 else 0.0
+    msg = f"Operação contínua: {result['steps']:,} passos\n"
+    msg += f"  Penalidade: {result['penalty']}\n"
+    msg += f"  Sujeiras limpas: {result['cleaned']}\n"
+    msg += f"  Re-sujeiras: {result['soiled']} ({result['events']} eventos)\n"
+    msg += f"  Sujeira média: {result['mean_dirt']:.1f} | máxima: {result['max_dirt']} | final: {result['final_dirt']}\n"
+    msg += f"  Tempo: {elapsed:.3f}s | Passos/s: {steps_per_sec:,.0f}\n"
+    return msg
+
+
+def parse_zone(text):
+    try:
+        return SoilZone.parse(text)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc))
+
+
+def add_arguments(parser):
+    """Registra as opções de linha de comando da operação contínua."""
+
+    parser.add_argument('-a', '--agent', choices=sorted(AGENT_TYPES), default='reactive', help="Tipo de agente")
+    parser.add_argument('--width', type=int, default=100, help="Largura do ambiente")
+    parser.add_argument('--height', type=int, default=100, help="Altura do ambiente")
+    parser.add_argument('--dirt-prob', type=float, default=0.3, help="Probabilidade de sujeira inicial")
+    parser.add_argument('--obstacle-prob', type=float, default=0.15, help="Probabilidade de obstáculo")
+    parser.add_argument('--steps', type=int, default=1000000, help="Número de passos")
+    parser.add_argument('--env', choices=sorted(ENV_TYPES), default='list', help="Armazenamento da grade")
+    parser.add_argument('--regen-rate', type=float, default=0.0001,
+                        help="Re-sujeiras esperadas por célula por passo em todo o mapa")
+    parser.add_argument('--zone', type=parse_zone, action='append', default=[], metavar='Y0,X0,Y1,X1,TAXA',
+                        help="Zona com taxa própria, somada à taxa geral (pode repetir)")
+    parser.add_argument('--seed', type=int, default=None, help="Semente (torna a execução reproduzível)")
+
+
+def main(args):
+    """Executa a operação contínua a partir dos argumentos já interpretados."""
+
+    rng = random.Random(run_seed(args.seed, 'continuous')) if args.seed is not None else None
+    dirt_rng = random.Random(run_seed(args.seed, 'dirt')) if args.seed is not None else None
+    env = ENV_TYPES[args.env](args.width, args.height, args.dirt_prob,
+                              obstacle_prob=args.obstacle_prob, rng=rng)
+    scheduler = DirtScheduler.uniform(env, args.regen_rate, dirt_rng, args.zone)
+    agent = make_agent(args.agent, env, rng)
+    start = time.perf_counter()
+    result = run_continuous(env, agent, args.steps, scheduler)
+    print(format_summary(result, time.perf_counter() - start), end="")
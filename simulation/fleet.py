@@ -0,0 +1,192 @@
+import random
+import time
+from collections import deque
+from agents.fleet_coordinator import FleetCoordinator
+from environment.multi_agent_environment import MultiAgentGridEnvironment
+from environment.percept import MOVES, MOVE_DELTAS, MOVES_BY_MASK
+from simulation.headless import make_agent, run_seed
+
+# Vários aspiradores no mesmo mapa (MultiAgentGridEnvironment), sem interface gráfica.
+
+
+FLEET_TYPES = ('coordinated', 'model', 'reactive')
+
+
+class IndependentFleet:
+    """
+    Frota sem coordenação: cada agente decide só com a própria percepção
+    e o próprio modelo, como se estivesse sozinho no mapa.
+    """
+
+    def __init__(self, agents):
+        """
+        Args:
+            agents: Um agente por posição do ambiente
+        """
+
+        self.agents = agents
+        self.sync = [i for i, agent in enumerate(agents) if hasattr(agent, 'pos')]
+
+    def select_actions(self, percepts, positions):
+        agents = self.agents
+        for i in self.sync:
+            agents[i].pos = positions[i]
+        return [agent.select_action(percepts[i]) for i, agent in enumerate(agents)]
+
+
+def make_fleet(fleet_type, env, seed=None):
+    """
+    Cria o controlador da frota de `env`.
+
+    Args:
+        fleet_type: 'coordinated' (FleetCoordinator com mapa compartilhado),
+            'model' ou 'reactive' (um agente independente por posição)
+        env: MultiAgentGridEnvironment com os agentes já posicionados
+        seed: Semente mestre (None usa o módulo random global)
+
+    Retorna:
+        Objeto com select_actions(percepts, positions)
+    """
+
+    if fleet_type == 'coordinated':
+        rng = random.Random(run_seed(seed, 'coordinator')) if seed is not None else None
+        return FleetCoordinator(env.n_agents, rng=rng)
+    agents = []
+    for i in range(env.n_agents):
+        rng = random.Random(run_seed(seed, f'agent{i}')) if seed is not None else None
+        agents.append(make_agent(fleet_type, env, rng))
+    return IndependentFleet(agents)
+
+
+def unreachable_dirt(env):
+    """
+    Conta as células sujas que nenhum agente consegue alcançar (BFS única a
+    partir de todas as posições, O(células)).
+    """
+
+    seen = set(env.agent_positions)
+    queue = deque(seen)
+    reachable = 0
+    while queue:
+        y, x = queue.popleft()
+        reachable += bool(env.grid[y][x])
+        for move in MOVES_BY_MASK[env.move_masks[y][x]]:
+            dy, dx = MOVE_DELTAS[move]
+            cell = (y+dy, x+dx)
+            if cell not in seen:
+                seen.add(cell)
+                queue.append(cell)
+    return env.dirt_count() - reachable
+
+
+def run_fleet_episode(env, fleet, max_steps=1000):
+    """
+    Executa um episódio em que todos os agentes agem a cada passo.
+
+    Termina quando toda a sujeira alcançável está limpa ou ao atingir
+    `max_steps`. As regras de penalidade são as de `headless.run_episode`,
+    somadas sobre a frota.
+
+    Args:
+        env: MultiAgentGridEnvironment
+        fleet: Controlador da frota (ver `make_fleet`)
+        max_steps: Número máximo de passos da frota
+
+    Retorna:
+        Dict com penalty, steps, cleaned, collisions (movimentos bloqueados
+        por outro agente), all_cleaned e unreachable (sujeiras inalcançáveis)
+    """
+
+    percept = env.get_compact_percept
+    agents = range(env.n_agents)
+    penalty_score = 0
+    cleaned = 0
+    collisions = 0
+    current_step = 0
+    unreachable = unreachable_dirt(env)
+    while current_step < max_steps and env.dirt_count() > unreachable:
+        actions = fleet.select_actions([percept(i) for i in agents], env.agent_positions)
+        collisions += len(env.step(actions))
+        for action in actions:
+            # Penalidade: +1 por movimento, -1 por limpar
+            if action == 'CLEAN':
+                cleaned += 1
+                penalty_score -= 1
+            elif action in MOVES:
+                penalty_score += 1
+        current_step += 1
+    return {
+        'penalty': penalty_score,
+        'steps': current_step,
+        'cleaned': cleaned,
+        'collisions': collisions,
+        'all_cleaned': 1 if env.dirt_count() <= unreachable else 0,
+        'unreachable': unreachable,
+    }
+
+
+def run_fleet(n_agents, fleet_type='coordinated', width=20, height=20, dirt_prob=0.3,
+              obstacle_prob=0.15, max_steps=1000, seed=None):
+    """
+    Sorteia um mapa, posiciona a frota e executa um episódio.
+
+    Retorna:
+        Dict de `run_fleet_episode` mais 'elapsed' (segundos)
+    """
+
+    rng = random.Random(run_seed(seed, 'fleet')) if seed is not None else None
+    env = MultiAgentGridEnvironment(width, height, dirt_prob, obstacle_prob, rng=rng,
+                                    n_agents=n_agents)
+    fleet = make_fleet(fleet_type, env, seed)
+    start = time.perf_counter()
+    result = run_fleet_episode(env, fleet, max_steps)
+    result['elapsed'] = time.perf_counter() - start
+    return result
+
+
+FLEET_NAMES = {'coordinated': 'Coordenada', 'model': 'Modelo', 'reactive': 'Reativo'}
+
+
+def format_summary(result, n_agents, fleet_type):
+    """Formata o resultado de `run_fleet` como texto."""
+
+    elapsed = result['elapsed']
+    steps_per_sec = result['steps'] / elapsed if elapsed > 0 else 0.0
+    msg = f"Frota de {n_agents} agentes ({FLEET_NAMES[fleet_type]}):\n"
+    msg += f"  Passos: {result['steps']}\n"
+    msg += f"  Penalidade: {result['penalty']}\n"
+    msg += f"  Sujeiras limpas: {result['cleaned']}\n"
+    msg += f"  Colisões evitadas: {result['collisions']}\n"
+    msg += f"  Limpou tudo: {'sim' if result['all_cleaned'] else 'não'}"
+    msg += f" ({result['unreachable']} sujeiras inalcançáveis)\n"
+    msg += f"  Tempo: {elapsed:.3f}s | Passos da frota/s: {steps_per_sec:,.0f}\n"
+    return msg
+
+
+def add_arguments(parser):
+    """Registra as opções de linha de comando do modo frota."""
+
+    parser.add_argument('-k', '--agents', type=int, default=4, help="Número de agentes no mapa")
+    parser.add_argument('-a', '--agent', choices=FLEET_TYPES, default='coordinated',
+                        help="coordinated (mapa compartilhado e fronteira dividida) ou "
+                             "agentes independentes do tipo model/reactive")
+    parser.add_argument('--width', type=int, default=20, help="Largura do ambiente")
+    parser.add_argument('--height', type=int, default=20, help="Altura do ambiente")
+    parser.add_argument('--dirt-prob', type=float, default=0.3, help="Probabilidade de sujeira")
+    parser.add_argument('--obstacle-prob', type=float, default=0.15, help="Probabilidade de obstáculo")
+    parser.add_argument('--steps', type=int, default=1000, help="Máximo de passos da frota")
+    parser.add_argument('--seed', type=int, default=None, help="Semente (torna o episódio reproduzível)")
+
+
+def main(args):
+    """Executa o modo frota a partir dos argumentos já interpretados."""
+
+    if args.agents < 1:
+        raise SystemExit("--agents deve ser pelo menos 1")
+    try:
+        result = run_fleet(args.agents, fleet_type=args.agent, width=args.width, height=args.height,
+                           dirt_prob=args.dirt_prob, obstacle_prob=args.obstacle_prob,
+                           max_steps=args.steps, seed=args.seed)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    print(format_summary(result, args.agents, args.agent), end="")
@@ -0,0 +1,457 @@
+import os
+import random
+import time
+import numpy as np
+from environment.grid_environment import GridEnvironment
+from environment.array_environment import ArrayGridEnvironment
+from environment.chunked_environment import ChunkedGridEnvironment
+from environment.sparse_environment import AdaptiveGridEnvironment, SparseGridEnvironment
+from agents.reactive_agent import ReactiveAgent
+from agents.model_based_agent import ModelBasedAgent
+from environment.vec_environment import ACTION_CODES
+from evaluation.metrics import EpisodeBatch, compute_metrics, episode_metrics
+from evaluation.statistics import StatsAggregator
+
+# Este módulo não importa tkinter: pode ser usado em servidores sem display.
+
+AGENT_TYPES = {
+    'reactive': ReactiveAgent,
+    'model': ModelBasedAgent,
+}
+
+ENV_TYPES = {
+    'list': GridEnvironment,
+    'array': ArrayGridEnvironment,
+    'chunked': ChunkedGridEnvironment,
+    'sparse': SparseGridEnvironment,
+    'auto': AdaptiveGridEnvironment,
+}
+
+# Episódios por pilha no cálculo vetorizado das métricas de um lote
+METRICS_CHUNK = 256
+
+def make_agent(agent_type, env, rng=None):
+    """
+    Cria um agente do tipo informado posicionado no ambiente.
+
+    Args:
+        agent_type: 'reactive' ou 'model'
+        env: Ambiente onde o agente será executado
+        rng: Gerador aleatório do agente (opcional)
+
+    Retorna:
+        Instância do agente
+    """
+
+    if agent_type not in AGENT_TYPES:
+        raise ValueError(f"Tipo de agente desconhecido: {agent_type}")
+    agent = AGENT_TYPES[agent_type](rng=rng)
+    if hasattr(agent, 'pos'):
+        agent.pos = env.agent_pos
+    return agent
+
+
+def run_episode(env, agent, max_steps=100, profiler=None, recorder=None):
+    """
+    Executa uma simulação completa sem interface gráfica.
+
+    Args:
+        env: Ambiente já inicializado
+        agent: Agente que escolhe as ações
+        max_steps: Número máximo de passos
+        profiler: simulation.instrumentation.Profiler opcional
+        recorder: simulation.traces.TraceRecorder opcional
+
+    Retorna:
+        Dict com penalty, steps, cleaned, final e all_cleaned
+    """
+
+    return episode_result(env, play_episode(env, agent, max_steps, profiler, recorder))
+
+
+def play_episode(env, agent, max_steps=100, profiler=None, recorder=None):
+    """
+    Executa o laço de uma simulação e devolve as ações executadas.
+
+    Segue as mesmas regras da simulação animada da interface gráfica (que
+    também a usa no modo "Simular N"): termina ao atingir `max_steps` ou
+    quando o agente retorna a (0, 0) depois de ter saído de lá. O laço só
+    registra o código de cada ação; as medidas são calculadas depois por
+    `evaluation.metrics`.
+
+    Args:
+        env: Ambiente já inicializado
+        agent: Agente que escolhe as ações
+        max_steps: Número máximo de passos
+        profiler: simulation.instrumentation.Profiler opcional; sem ele o
+            laço não tem nenhuma instrumentação
+        recorder: simulation.traces.TraceRecorder opcional que grava cada
+            ação executada
+
+    Retorna:
+        bytearray com o código (ACTION_CODES) de cada ação executada
+    """
+
+    if profiler is not None:
+        return _play_episode_profiled(env, agent, max_steps, profiler, recorder)
+    codes = bytearray()
+    current_step = 0
+    started = False
+    sync_pos = hasattr(agent, 'pos')
+    while current_step < max_steps:
+        action = agent.select_action(env.get_compact_percept())
+        env.execute_action(action)
+        if sync_pos:
+            agent.pos = env.agent_pos
+        if recorder is not None:
+            recorder.record(action)
+        codes.append(ACTION_CODES[action])
+        current_step += 1
+        if env.agent_pos != (0, 0):
+            started = True
+        if started and env.agent_pos == (0, 0):
+            break
+    return codes
+
+
+def episode_result(env, codes):
+    """
+    Monta o resultado de um episódio a partir das ações registradas.
+
+    Args:
+        env: Ambiente no estado final
+        codes: bytearray com o código de cada ação executada
+
+    Retorna:
+        Dict com penalty, steps, cleaned, final e all_cleaned
+    """
+
+    scores = episode_metrics(codes, ('penalty', 'cleaned'))
+    return {
+        'penalty': scores['penalty'],
+        'steps': len(codes),
+        'cleaned': scores['cleaned'],
+        'final': 1 if env.agent_pos == (0, 0) else 0,
+        'all_cleaned': 1 if env.is_clean() else 0,
+    }
+
+
+def _play_episode_profiled(env, agent, max_steps, profiler, recorder=None):
+    """
+    Mesmo laço de `play_episode`, cronometrando cada fase do passo
+    (percept, select_action, execute_action, measures) e o episódio. A fase
+    measures é só o registro da ação; as métricas saem no fim do episódio.
+    """
+
+    clock = time.perf_counter_ns
+    record = profiler.record
+    if hasattr(agent, 'profiler'):
+        agent.profiler = profiler
+    episode_start = clock()
+    codes = bytearray()
+    current_step = 0
+    started = False
+    sync_pos = hasattr(agent, 'pos')
+    while current_step < max_steps:
+        t0 = clock()
+        percept = env.get_compact_percept()
+        t1 = clock()
+        action = agent.select_action(percept)
+        t2 = clock()
+        env.execute_action(action)
+        if sync_pos:
+            agent.pos = env.agent_pos
+        if recorder is not None:
+            recorder.record(action)
+        t3 = clock()
+        codes.append(ACTION_CODES[action])
+        t4 = clock()
+        record('percept', t0, t1)
+        record('select_action', t1, t2)
+        record('execute_action', t2, t3)
+        record('measures', t3, t4)
+        current_step += 1
+        if env.agent_pos != (0, 0):
+            started = True
+        if started and env.agent_pos == (0, 0):
+            break
+    record('episode', episode_start, clock())
+    profiler.count('episodes')
+    profiler.count('steps', current_step)
+    profiler.snapshot_memory(f"episódio {profiler.counters['episodes']}")
+    return codes
+
+
+def add_episodes(stats, episodes):
+    """
+    Calcula as métricas de uma pilha de episódios de uma vez e as acrescenta
+    ao agregador.
+
+    Args:
+        stats: StatsAggregator
+        episodes: Lista de (ações, final, all_cleaned), na ordem do lote
+    """
+
+    if not episodes:
+        return
+    batch = EpisodeBatch.from_actions([codes for codes, _, _ in episodes])
+    scores = compute_metrics(batch, ('penalty', 'cleaned'))
+    stats.add_arrays({
+        'penalty': scores['penalty'],
+        'steps': batch.lengths,
+        'cleaned': scores['cleaned'],
+        'final': np.array([final for _, final, _ in episodes], dtype=np.int64),
+        'all_cleaned': np.array([clean for _, _, clean in episodes], dtype=np.int64),
+    })
+
+
+def run_seed(master_seed, index):
+    """
+    Deriva a semente de uma simulação a partir da semente mestre.
+
+    A semente depende apenas de (master_seed, index), de modo que o resultado
+    de cada simulação não depende de como o lote foi dividido entre processos.
+    """
+
+    return f"{master_seed}:{index}"
+
+
+def trace_path(record_dir, index):
+    """Caminho do trace da simulação `index` gravado com `record_dir`."""
+
+    return os.path.join(record_dir, f"run_{index:06d}.vtrace")
+
+
+def run_range(start, stop, agent_type='reactive', width=4, height=4, dirt_prob=0.3,
+              obstacle_prob=0.15, max_steps=100, fixed_map=False, seed=None, env_type='list',
+              profiler=None, record_dir=None, scenario=None, keep_runs=False):
+    """
+    Executa as simulações de índice start..stop-1 de um lote.
+
+    Com `seed` definido, cada simulação usa seu próprio random.Random, tanto
+    no ambiente quanto no agente; sem `seed`, usa o módulo random global.
+    Com `record_dir`, cada simulação é gravada em `trace_path(record_dir, i)`.
+    Com `scenario` (arquivo .vscn), todas partem desse mapa, como em `fixed_map`.
+
+    Retorna:
+        StatsAggregator com penalty, steps, cleaned, final e all_cleaned
+        (e a lista de cada simulação em `runs` se `keep_runs`)
+    """
+
+    env_class = ENV_TYPES[env_type]
+    stats = StatsAggregator(keep_runs=keep_runs)
+    pending = []  # episódios cujas métricas ainda não foram calculadas
+    initial = None
+    if scenario is not None:
+        from environment.scenarios import load_scenario
+        env = load_scenario(scenario, env_class)
+        initial = env.snapshot()
+    elif fixed_map:
+        # Um único ambiente, restaurado do snapshot a cada simulação
+        map_rng = random.Random(run_seed(seed, 'map')) if seed is not None else None
+        env = env_class(width, height, dirt_prob, obstacle_prob=obstacle_prob, rng=map_rng)
+        initial = env.snapshot()
+    for i in range(start, stop):
+        rng = random.Random(run_seed(seed, i)) if seed is not None else None
+        if initial is not None:
+            env.restore(initial)
+        else:
+            env = env_class(width, height, dirt_prob, obstacle_prob=obstacle_prob, rng=rng)
+        recorder = None
+        if record_dir is not None:
+            from simulation.traces import TraceRecorder
+            recorder = TraceRecorder(env, seed=run_seed(seed, i) if seed is not None else None,
+                                     agent=agent_type)
+        codes = play_episode(env, make_agent(agent_type, env, rng), max_steps, profiler, recorder)
+        if recorder is not None:
+            recorder.save(trace_path(record_dir, i))
+        pending.append((codes, int(env.agent_pos == (0, 0)), int(env.is_clean())))
+        if len(pending) == METRICS_CHUNK:
+            add_episodes(stats, pending)
+            pending = []
+    add_episodes(stats, pending)
+    return stats
+
+
+def run_batch(n, agent_type='reactive', width=4, height=4, dirt_prob=0.3,
+              obstacle_prob=0.15, max_steps=100, fixed_map=False, seed=None, env_type='list',
+              profiler=None, record_dir=None, scenario=None, keep_runs=False):
+    """
+    Executa N simulações em sequência, sem desenhar nada.
+
+    Args:
+        n: Número de simulações
+        agent_type: 'reactive' ou 'model'
+        width: Largura do ambiente
+        height: Altura do ambiente
+        dirt_prob: Probabilidade de sujeira por célula
+        obstacle_prob: Probabilidade de obstáculo por célula
+        max_steps: Número máximo de passos por simulação
+        fixed_map: Se True, todas as simulações partem do mesmo mapa inicial
+        seed: Semente mestre; torna o lote reproduzível
+        env_type: Chave de ENV_TYPES ('list', 'array', 'chunked', 'sparse' ou 'auto')
+        profiler: Profiler opcional que recebe os tempos de cada fase
+        record_dir: Diretório onde gravar o trace binário de cada simulação
+        scenario: Arquivo .vscn usado como mapa inicial de todas as simulações
+        keep_runs: Guarda também o resultado de cada simulação (memória O(n))
+
+    Retorna:
+        StatsAggregator com as estatísticas do lote e `elapsed` (segundos)
+    """
+
+    start = time.perf_counter()
+    stats = run_range(
+        0, n, agent_type=agent_type, width=width, height=height, dirt_prob=dirt_prob,
+        obstacle_prob=obstacle_prob, max_steps=max_steps, fixed_map=fixed_map, seed=seed,
+        env_type=env_type, profiler=profiler, record_dir=record_dir, scenario=scenario,
+        keep_runs=keep_runs,
+    )
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def format_summary(stats, agent_type):
+    """
+    Formata o resumo das estatísticas no mesmo padrão da interface gráfica,
+    acrescentando intervalos de confiança de 95%, quantis e a vazão em
+    passos por segundo.
+
+    Args:
+        stats: StatsAggregator retornado por `run_batch`
+        agent_type: 'reactive' ou 'model'
+
+    Retorna:
+        Texto com o resumo
+    """
+
+    def line(label, key):
+        low, high = stats.confidence_interval(key)
+        text = f"  {label}: {stats.mean(key):.2f} (IC 95%: {low:.2f} a {high:.2f})"
+        if stats.count:
+            text += " | p50 {} p95 {} p99 {}".format(*(stats.quantile(key, q) for q in (0.5, 0.95, 0.99)))
+        return text + "\n"
+
+    n = stats.count
+    elapsed = stats.elapsed
+    steps_per_sec = stats.total_steps / elapsed if elapsed > 0 else 0.0
+    msg = f"Resultados após {n} simulações ({'Reativo' if agent_type=='reactive' else 'Modelo'}):\n"
+    msg += line("Média penalidade", 'penalty')
+    msg += line("Média passos", 'steps')
+    msg += line("Média sujeiras limpas", 'cleaned')
+    msg += f"  % chegou ao final: {100 * stats.mean('final'):.1f}%\n"
+    msg += f"  % limpou tudo: {100 * stats.mean('all_cleaned'):.1f}%\n"
+    msg += f"  Tempo: {elapsed:.3f}s | Passos/s: {steps_per_sec:,.0f}\n"
+    return msg
+
+
+def add_arguments(parser):
+    """Registra as opções de linha de comando do modo em lote."""
+
+    parser.add_argument('-n', '--runs', type=int, default=1000, help="Número de simulações")
+    parser.add_argument('-a', '--agent', choices=sorted(AGENT_TYPES), default='reactive', help="Tipo de agente")
+    parser.add_argument('--width', type=int, default=4, help="Largura do ambiente")
+    parser.add_argument('--height', type=int, default=4, help="Altura do ambiente")
+    parser.add_argument('--dirt-prob', type=float, default=0.3, help="Probabilidade de sujeira")
+    parser.add_argument('--obstacle-prob', type=float, default=0.15, help="Probabilidade de obstáculo")
+    parser.add_argument('--steps', type=int, default=100, help="Máximo de passos por simulação")
+    parser.add_argument('--fixed-map', action='store_true', help="Reutiliza o mesmo mapa em todas as simulações")
+    parser.add_argument('--scenario', metavar='NOME',
+                        help="Usa uma planta da biblioteca (nome ou arquivo .vscn) em todas as simulações")
+    parser.add_argument('--env', choices=sorted(ENV_TYPES), default='list',
+                        help="Armazenamento da grade: listas Python, arrays NumPy, blocos "
+                             "gerados sob demanda (mapas enormes), esparso (pouca sujeira) ou "
+                             "auto (esparso ou listas, pela densidade de sujeira)")
+    parser.add_argument('--vectorized', action='store_true',
+                        help="Simula todos os mapas em lockstep com NumPy (apenas agente reativo)")
+    parser.add_argument('--seed', type=int, default=None, help="Semente mestre (torna o lote reproduzível)")
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help="Número de processos; 0 usa todos os núcleos")
+    parser.add_argument('--record', metavar='DIRETÓRIO',
+                        help="Grava o trace binário de cada simulação (ver 'replay')")
+    add_profile_arguments(parser)
+
+
+def add_profile_arguments(parser):
+    """Registra as opções de instrumentação (comuns ao modo em lote e à interface)."""
+
+    parser.add_argument('--profile', action='store_true',
+                        help="Mede o tempo de cada fase do passo e imprime um resumo")
+    parser.add_argument('--trace', metavar='ARQUIVO',
+                        help="Grava os eventos como trace do Chrome (implica --profile)")
+    parser.add_argument('--memory', action='store_true',
+                        help="Tira snapshots do tracemalloc a cada episódio (implica --profile)")
+
+
+def make_profiler(args):
+    """Cria o Profiler pedido na linha de comando, ou None se desligado."""
+
+    if not (args.profile or args.trace or args.memory):
+        return None
+    from simulation.instrumentation import Profiler
+    return Profiler(trace=bool(args.trace), memory=args.memory)
+
+
+def report_profile(profiler, args):
+    """Imprime o resumo da instrumentação e grava o trace, se pedido."""
+
+    if profiler is None:
+        return
+    print()
+    print(profiler.summary())
+    if args.trace:
+        profiler.write_chrome_trace(args.trace)
+        print(f"Trace gravado em {args.trace}")
+    profiler.close()
+
+
+def main(args):
+    """Executa o modo em lote a partir dos argumentos já interpretados."""
+
+    scenario = None
+    if args.scenario:
+        from environment.scenarios import resolve_scenario
+        try:
+            scenario = resolve_scenario(args.scenario)
+        except ValueError as exc:
+            raise SystemExit(str(exc))
+    config = dict(
+        agent_type=args.agent, width=args.width, height=args.height,
+        dirt_prob=args.dirt_prob, obstacle_prob=args.obstacle_prob,
+        max_steps=args.steps, fixed_map=args.fixed_map, env_type=args.env,
+        record_dir=args.record, scenario=scenario,
+    )
+    profiler = make_profiler(args)
+    if args.vectorized and profiler is not None:
+        raise SystemExit("--profile não é suportado com --vectorized")
+    if args.workers != 1 and profiler is not None:
+        raise SystemExit("--profile requer execução sequencial (-j 1)")
+    if args.env == 'chunked' and (args.record or args.scenario):
+        raise SystemExit("--record e --scenario requerem --env list ou array")
+    if args.vectorized and args.record:
+        raise SystemExit("--record não é suportado com --vectorized")
+    if args.vectorized and args.env != 'list':
+        raise SystemExit("--env não se aplica a --vectorized (usa VecGridEnvironment)")
+    if args.vectorized and args.workers != 1:
+        raise SystemExit("--vectorized roda em um único processo (-j 1)")
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+    if args.vectorized:
+        if args.agent != 'reactive' or args.fixed_map or scenario:
+            raise SystemExit("--vectorized suporta apenas o agente reativo em mapas aleatórios")
+        from simulation.vectorized import run_vec_batch
+        stats = run_vec_batch(
+            args.runs, width=args.width, height=args.height, dirt_prob=args.dirt_prob,
+            obstacle_prob=args.obstacle_prob, max_steps=args.steps, seed=args.seed,
+        )
+    elif args.workers == 1:
+        stats = run_batch(args.runs, seed=args.seed, profiler=profiler, **config)
+    else:
+        from simulation.parallel import run_parallel_batch
+        seed = args.seed
+        if seed is None:
+            # Os processos precisam de uma semente mestre; sem --seed, sorteia e mostra
+            seed = random.SystemRandom().getrandbits(63)
+            print(f"Semente mestre: {seed} (repita com --seed {seed})")
+        stats = run_parallel_batch(args.runs, workers=args.workers or None, seed=seed, **config)
+    print(format_summary(stats, args.agent), end="")
+    report_profile(profiler, args)
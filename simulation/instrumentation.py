@@ -0,0 +1,192 @@
+import json
+import os
+import time
+import tracemalloc
+from collections import Counter
+
+# Instrumentação opcional do laço de simulação. Nada aqui é usado quando o
+# profiler é None: o laço sem instrumentação continua o mesmo e os agentes
+# só testam `self.profiler is not None` nas chamadas de planejamento.
+
+
+class Histogram:
+    """
+    Histograma com faixas em potências de 2 (em nanossegundos ou em
+    unidades quaisquer): memória constante, percentis aproximados pelo
+    limite superior da faixa.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.buckets = Counter()  # {bit_length(valor): ocorrências}
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        self.buckets[int(value).bit_length()] += 1
+
+    def percentile(self, p):
+        """Limite superior da faixa que contém o percentil `p` (0-100)."""
+
+        if not self.count:
+            return 0
+        target = self.count * p / 100
+        seen = 0
+        for bits in sorted(self.buckets):
+            seen += self.buckets[bits]
+            if seen >= target:
+                return min((1 << bits) - 1, self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+
+class Profiler:
+    """
+    Coleta tempos por fase do passo de simulação, contadores de eventos e
+    amostras de valores (nós expandidos, tamanho do caminho...).
+
+    Pode ainda guardar cada fase como evento de trace (formato do Chrome,
+    aberto em chrome://tracing ou Perfetto) e tirar snapshots do tracemalloc.
+    """
+
+    def __init__(self, trace=False, memory=False, max_events=1000000):
+        """
+        Args:
+            trace: Guarda os eventos para exportar como trace do Chrome
+            memory: Liga o tracemalloc e permite `snapshot_memory`
+            max_events: Limite de eventos de trace guardados
+        """
+
+        self.phases = {}  # {fase: Histogram em ns}
+        self.samples = {}  # {nome: Histogram}
+        self.counters = Counter()
+        self.trace = trace
+        self.max_events = max_events
+        self.events = []
+        self.snapshots = []  # primeiro e último (rótulo, tracemalloc.Snapshot)
+        self.memory_points = []  # [(perf_counter_ns, bytes alocados)] para o trace
+        self.memory = memory
+        self.origin = time.perf_counter_ns()
+        self._started_tracing = memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    def record(self, phase, start, end):
+        """
+        Registra uma fase que durou de `start` a `end` (perf_counter_ns).
+        """
+
+        hist = self.phases.get(phase)
+        if hist is None:
+            hist = self.phases[phase] = Histogram()
+        hist.add(end - start)
+        if self.trace and len(self.events) < self.max_events:
+            self.events.append((phase, start, end))
+
+    def count(self, name, n=1):
+        """Incrementa um contador de eventos."""
+
+        self.counters[name] += n
+
+    def sample(self, name, value):
+        """Registra um valor na distribuição `name`."""
+
+        hist = self.samples.get(name)
+        if hist is None:
+            hist = self.samples[name] = Histogram()
+        hist.add(value)
+
+    def snapshot_memory(self, label):
+        """Tira um snapshot do tracemalloc (apenas com memory=True)."""
+
+        if not self.memory:
+            return
+        # Só o primeiro e o último são guardados: bastam para a comparação
+        if len(self.snapshots) == 2:
+            self.snapshots.pop()
+        self.snapshots.append((label, tracemalloc.take_snapshot()))
+        current, peak = tracemalloc.get_traced_memory()
+        self.memory_points.append((time.perf_counter_ns(), current))
+        self.sample('memory.current_kb', current // 1024)
+        self.sample('memory.peak_kb', peak // 1024)
+
+    def summary(self, top=5):
+        """
+        Retorna:
+            Texto com a tabela de fases, os contadores, as amostras e, com
+            snapshots de memória, as linhas que mais cresceram
+        """
+
+        lines = []
+        # Fases aninhadas ('select_action/plan') entram na tabela, mas o
+        # percentual é sobre o episódio ou sobre as fases de primeiro nível
+        if 'episode' in self.phases:
+            total = self.phases['episode'].total
+        else:
+            total = sum(h.total for name, h in self.phases.items() if '/' not in name)
+        total = total or 1
+        lines.append(f"{'fase':<18} {'chamadas':>9} {'total (ms)':>11} {'%':>6} "
+                     f"{'média (µs)':>11} {'p50':>8} {'p90':>8} {'p99':>8} {'máx':>9}")
+        for name, h in sorted(self.phases.items(), key=lambda item: -item[1].total):
+            lines.append(
+                f"{name:<18} {h.count:>9} {h.total / 1e6:11.2f} {100 * h.total / total:6.1f} "
+                f"{h.mean() / 1e3:11.2f} {h.percentile(50) / 1e3:8.1f} {h.percentile(90) / 1e3:8.1f} "
+                f"{h.percentile(99) / 1e3:8.1f} {h.max / 1e3:9.1f}"
+            )
+        if self.counters:
+            lines.append("")
+            lines.append(f"{'contador':<24} {'total':>10}")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"{name:<24} {value:>10}")
+        if self.samples:
+            lines.append("")
+            lines.append(f"{'amostra':<24} {'n':>9} {'média':>10} {'p50':>8} {'p90':>8} {'p99':>8} {'máx':>8}")
+            for name, h in sorted(self.samples.items()):
+                lines.append(
+                    f"{name:<24} {h.count:>9} {h.mean():10.1f} {h.percentile(50):>8} "
+                    f"{h.percentile(90):>8} {h.percentile(99):>8} {h.max:>8}"
+                )
+        if len(self.snapshots) >= 2:
+            first_label, first = self.snapshots[0]
+            last_label, last = self.snapshots[-1]
+            lines.append("")
+            lines.append(f"Maiores crescimentos de memória ({first_label} -> {last_label}):")
+            for stat in last.compare_to(first, 'lineno')[:top]:
+                lines.append(f"  {stat}")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """
+        Retorna:
+            Dict no formato JSON de trace do Chrome (eventos completos 'X' e
+            contadores de memória 'C'), com tempos em microssegundos
+        """
+
+        events = [
+            {'name': phase, 'ph': 'X', 'pid': os.getpid(), 'tid': 0,
+             'ts': (start - self.origin) / 1e3, 'dur': (end - start) / 1e3}
+            for phase, start, end in self.events
+        ]
+        for when, size in self.memory_points:
+            events.append({'name': 'memória (KB)', 'ph': 'C', 'pid': os.getpid(), 'tid': 0,
+                           'ts': (when - self.origin) / 1e3, 'args': {'alocado': size // 1024}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path):
+        """Grava o trace do Chrome em `path`."""
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+
+    def close(self):
+        """Desliga o tracemalloc, se foi ligado por este profiler."""
+
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
@@ -0,0 +1,82 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from evaluation.statistics import StatsAggregator
+from simulation.headless import run_range
+
+# Tamanho fixo dos blocos enviados aos processos. Não depende do número de
+# processos, então o resultado de um lote é o mesmo com 1 ou 64 núcleos.
+CHUNK_SIZE = 250
+
+
+def _run_chunk(job):
+    """Executa um bloco de simulações em um processo do pool."""
+
+    start, stop, config = job
+    return start, run_range(start, stop, **config)
+
+
+def merge_stats(partials):
+    """
+    Junta os agregadores parciais na ordem dos índices das simulações.
+
+    Args:
+        partials: Lista de (índice inicial, StatsAggregator) em qualquer ordem
+
+    Retorna:
+        StatsAggregator do lote inteiro
+    """
+
+    partials = sorted(partials, key=lambda item: item[0])
+    stats = StatsAggregator(keep_runs=bool(partials) and partials[0][1].runs is not None)
+    for _, part in partials:
+        stats.merge(part)
+    return stats
+
+
+def run_parallel_batch(n, agent_type='reactive', width=4, height=4, dirt_prob=0.3,
+                       obstacle_prob=0.15, max_steps=100, fixed_map=False, seed=0,
+                       workers=None, chunk_size=CHUNK_SIZE, env_type='list', record_dir=None,
+                       scenario=None, keep_runs=False):
+    """
+    Executa N simulações distribuídas em um pool de processos.
+
+    Cada simulação usa um random.Random próprio derivado de (seed, índice),
+    então as simulações são idênticas às de `run_batch(..., seed=seed)` para
+    qualquer número de processos. Cada processo devolve só um
+    StatsAggregator, e os parciais são combinados aqui.
+
+    Args:
+        n: Número de simulações
+        agent_type: 'reactive' ou 'model'
+        width: Largura do ambiente
+        height: Altura do ambiente
+        dirt_prob: Probabilidade de sujeira por célula
+        obstacle_prob: Probabilidade de obstáculo por célula
+        max_steps: Número máximo de passos por simulação
+        fixed_map: Se True, todas as simulações partem do mesmo mapa inicial
+        seed: Semente mestre
+        workers: Número de processos (None usa os.cpu_count())
+        chunk_size: Número de simulações por tarefa enviada ao pool
+        env_type: Chave de ENV_TYPES ('list', 'array', 'chunked', 'sparse' ou 'auto')
+        record_dir: Diretório onde cada processo grava os traces das suas simulações
+        scenario: Arquivo .vscn usado como mapa inicial de todas as simulações
+        keep_runs: Guarda também o resultado de cada simulação (memória O(n))
+
+    Retorna:
+        StatsAggregator com as estatísticas do lote e `elapsed` (segundos)
+    """
+
+    config = dict(
+        agent_type=agent_type, width=width, height=height, dirt_prob=dirt_prob,
+        obstacle_prob=obstacle_prob, max_steps=max_steps, fixed_map=fixed_map, seed=seed,
+        env_type=env_type, record_dir=record_dir, scenario=scenario, keep_runs=keep_runs,
+    )
+    jobs = [(i, min(i + chunk_size, n), config) for i in range(0, n, chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(workers, max(len(jobs), 1))) as executor:
+        partials = list(executor.map(_run_chunk, jobs))
+    stats = merge_stats(partials)
+    stats.elapsed = time.perf_counter() - start
+    return stats
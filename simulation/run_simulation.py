@@ -1,9 +1,18 @@
+import os
 import random
+import time
 import tkinter as tk
-from environment.grid_environment import GridEnvironment
+from tkinter import filedialog, ttk
+from environment.sparse_environment import AdaptiveGridEnvironment
 from agents.reactive_agent import ReactiveAgent
 from agents.model_based_agent import ModelBasedAgent
-from evaluation.measures import MeasureCleanPerStep, MeasureCleanAndMovePositive
+from environment.vec_environment import ACTION_CODES, CLEAN
+from evaluation.metrics import episode_metrics
+from simulation.batch_worker import BatchWorker
+from simulation.headless import format_summary
+from evaluation.statistics import StatsAggregator
+from simulation.traces import Trace, TraceReplay
+from environment.scenarios import SCENARIO_DIR, EXTENSION, list_scenarios, load_scenario, save_scenario
 
 class VacuumSimulatorGUI:
 
@@ -14,8 +23,17 @@ class VacuumSimulatorGUI:
     """
 
     CELL_SIZE = 40
+    BATCH_POLL_MS = 100
+    REPLAY_MS = 100
 
-    def __init__(self):
+    def __init__(self, profiler=None):
+        """
+        Args:
+            profiler: simulation.instrumentation.Profiler opcional, que mede
+                as fases de cada passo animado (inclusive o desenho)
+        """
+
+        self.profiler = profiler
         self.root = tk.Tk()
         self.root.title("Vacuum Agent Simulator")
         self.width = 4
@@ -38,27 +56,25 @@ class VacuumSimulatorGUI:
                 "dirt": [],
                 "obstacles": []
             },
-            "Cenário 1": {
-                "width": 5, "height": 5,
-                "dirt": [(0,0), (1,2), (2,2), (4,4)],
-                "obstacles": [(1,1), (2,1), (3,3)]
-            },
-            "Cenário 2": {
-                "width": 6, "height": 4,
-                "dirt": [(0,3), (1,0), (2,2), (3,5)],
-                "obstacles": [(0,2), (1,4), (3,1), (3,2)]
-            },
-            "Cenário 3": {
-                "width": 4, "height": 4,
-                "dirt": [(0,1), (1,2), (2,3), (3,0)],
-                "obstacles": []
-            }
         }
+        # Plantas da biblioteca compartilhada (environment.scenarios): {nome: arquivo}
+        self.scenarios.update(list_scenarios())
         self.num_simulations = tk.IntVar(value=1)
-        self.show_simulations = tk.BooleanVar(value=False)
-        self.initial_grid = None
-        self.initial_obstacles = None
-        self.initial_agent_pos = None
+        self.show_simulations = tk.BooleanVar(value=False)  # anima uma simulação de amostra durante o lote
+        self.batch_worker = None
+        self.batch_stats = None
+        self.batch_started = None
+        self.initial_snapshot = None  # estado do cenário carregado, para "Redefinir"
+        # Itens do canvas criados uma única vez por tamanho de grade (modo retido)
+        self.canvas_shape = None
+        self.cell_items = []
+        self.cell_colors = []
+        self.agent_item = None
+        self.agent_drawn_pos = None
+        self.highlight = None
+        # Reprodução de um trace gravado (ver simulation.traces)
+        self.replay = None
+        self.replaying = False
 
         # Frame principal para layout vertical
         main_frame = tk.Frame(self.root)
@@ -138,12 +154,13 @@ class VacuumSimulatorGUI:
         tk.Label(parent, text="Agente:").grid(row=row, column=0, sticky="w")
         tk.Radiobutton(parent, text="Reativo", variable=self.agent_type, value='reactive').grid(row=row, column=1, sticky="w")
         tk.Radiobutton(parent, text="Modelo", variable=self.agent_type, value='model').grid(row=row, column=2, sticky="w")
+        tk.Checkbutton(parent, text="Ver amostra", variable=self.show_simulations).grid(row=row, column=3, sticky="w")
         row += 1
 
         # Cenário alinhado com criar ambiente e redefinir cenário ao lado
         tk.Label(parent, text="Cenário:").grid(row=row, column=0, sticky="w")
-        scenario_menu = tk.OptionMenu(parent, self.scenario_var, *self.scenarios.keys(), command=self.on_scenario_change)
-        scenario_menu.grid(row=row, column=1, sticky="w")
+        self.scenario_menu = tk.OptionMenu(parent, self.scenario_var, *self.scenarios.keys(), command=self.on_scenario_change)
+        self.scenario_menu.grid(row=row, column=1, sticky="w")
         tk.Button(parent, text="Criar", command=self.create_env).grid(row=row, column=2, sticky="ew")
         tk.Button(parent, text="Redefinir", command=self.reset_scenario).grid(row=row, column=3, sticky="ew")
         row += 1
@@ -152,11 +169,26 @@ class VacuumSimulatorGUI:
         tk.Button(parent, text="Iniciar", command=self.start_simulation).grid(row=row, column=0, sticky="ew")
         tk.Button(parent, text="Avançar 1 Passo", command=self.step_once).grid(row=row, column=1, sticky="ew")
         tk.Button(parent, text="Parar", command=self.stop_simulation).grid(row=row, column=2, sticky="ew")
-        tk.Label(parent, text="").grid(row=row, column=3)  # Espaço vazio para alinhar com redefinir cenário acima
+        tk.Button(parent, text="Salvar", command=self.save_scenario_file).grid(row=row, column=3, sticky="ew")
         row += 1
 
         self.status_label = tk.Label(parent, text="")
         self.status_label.grid(row=row, column=0, columnspan=4, sticky="w", padx=(5,2), pady=(2,2))
+        row += 1
+
+        # Progresso e estatísticas parciais do lote ("Simular N")
+        self.batch_progress = ttk.Progressbar(parent, mode="determinate")
+        self.batch_progress.grid(row=row, column=0, columnspan=4, sticky="ew", padx=(5,2))
+        row += 1
+        self.batch_label = tk.Label(parent, text="", justify="left")
+        self.batch_label.grid(row=row, column=0, columnspan=4, sticky="w", padx=(5,2), pady=(2,2))
+        row += 1
+
+        # Reprodução de traces: abrir arquivo e posicionar em um passo
+        tk.Button(parent, text="Abrir trace", command=self.open_trace).grid(row=row, column=0, sticky="ew")
+        self.trace_scale = tk.Scale(parent, from_=0, to=0, orient="horizontal", showvalue=True,
+                                    command=self.on_trace_seek)
+        self.trace_scale.grid(row=row, column=1, columnspan=3, sticky="ew")
 
     def on_scenario_change(self, value):
         """Manipula evento de mudança de cenário no menu suspenso."""
@@ -180,17 +212,17 @@ class VacuumSimulatorGUI:
             self.obstacle_prob = 0.0
             self.obstacle_entry.delete(0, tk.END)
             self.obstacle_entry.insert(0, str(self.obstacle_prob))
-            self.env = GridEnvironment(self.width, self.height, dirt_prob=0.0, obstacle_prob=0.0)
+            self.env = AdaptiveGridEnvironment(self.width, self.height, dirt_prob=0.0, obstacle_prob=0.0)
             for y in range(self.height):
                 for x in range(self.width):
-                    self.env.grid[y][x] = False
-                    self.env.obstacles[y][x] = False
+                    self.env.set_dirt(y, x, False)
+                    self.env.set_obstacle(y, x, False)
             self.custom_dirt = set()
             self.custom_obstacles = set()
+            self.initial_snapshot = self.env.snapshot()
             self.canvas.config(width=self.width*self.CELL_SIZE, height=self.height*self.CELL_SIZE)
             self.agent = None
-            self.measure1 = None
-            self.measure2 = None
+            self.episode_actions = None
             self.running = False
             self.current_step = 0
             self.started = False
@@ -199,8 +231,15 @@ class VacuumSimulatorGUI:
             self.canvas.bind("<Button-1>", self.toggle_custom)
             self.canvas.bind("<Button-3>", self.toggle_custom)
         elif scenario is not None:
-            self.width = scenario["width"]
-            self.height = scenario["height"]
+            # Planta da biblioteca: os planos de bits viram as camadas do ambiente
+            try:
+                self.env = load_scenario(scenario, AdaptiveGridEnvironment)
+            except (OSError, ValueError) as exc:
+                self.status_label.config(text=f"Cenário inválido: {exc}")
+                return
+            self.initial_snapshot = self.env.snapshot()
+            self.width = self.env.width
+            self.height = self.env.height
             self.width_entry.delete(0, tk.END)
             self.width_entry.insert(0, str(self.width))
             self.height_entry.delete(0, tk.END)
@@ -211,24 +250,9 @@ class VacuumSimulatorGUI:
             self.obstacle_prob = 0.0
             self.obstacle_entry.delete(0, tk.END)
             self.obstacle_entry.insert(0, str(self.obstacle_prob))
-            self.env = GridEnvironment(self.width, self.height, dirt_prob=0.0, obstacle_prob=0.0)
-            # Limpa grid
-            for y in range(self.height):
-                for x in range(self.width):
-                    self.env.grid[y][x] = False
-                    self.env.obstacles[y][x] = False
-            # Aplica sujeira
-            for (y, x) in scenario.get("dirt", []):
-                if 0 <= y < self.height and 0 <= x < self.width:
-                    self.env.grid[y][x] = True
-            # Aplica obstáculos
-            for (y, x) in scenario.get("obstacles", []):
-                if 0 <= y < self.height and 0 <= x < self.width:
-                    self.env.obstacles[y][x] = True
             self.canvas.config(width=self.width*self.CELL_SIZE, height=self.height*self.CELL_SIZE)
             self.agent = None
-            self.measure1 = None
-            self.measure2 = None
+            self.episode_actions = None
             self.running = False
             self.current_step = 0
             self.started = False
@@ -253,15 +277,12 @@ class VacuumSimulatorGUI:
             self.status_label.config(text="Valores inválidos!")
             return
         if self.scenario_var.get() == "Aleatório":
-            self.env = GridEnvironment(self.width, self.height, self.dirt_prob, obstacle_prob=self.obstacle_prob)
+            self.env = AdaptiveGridEnvironment(self.width, self.height, self.dirt_prob, obstacle_prob=self.obstacle_prob)
             # Salva o estado inicial do ambiente para redefinir depois
-            self.initial_grid = [row[:] for row in self.env.grid]
-            self.initial_obstacles = [row[:] for row in self.env.obstacles]
-            self.initial_agent_pos = self.env.agent_pos
+            self.initial_snapshot = self.env.snapshot()
             self.canvas.config(width=self.width*self.CELL_SIZE, height=self.height*self.CELL_SIZE)
             self.agent = None
-            self.measure1 = None
-            self.measure2 = None
+            self.episode_actions = None
             self.running = False
             self.current_step = 0
             self.started = False
@@ -275,6 +296,34 @@ class VacuumSimulatorGUI:
             self.load_scenario(self.scenario_var.get())
         self.legend_frame.grid()  # Torna visível ao criar ambiente
 
+    def save_scenario_file(self):
+        """
+        Grava o ambiente atual (por exemplo, o editado no modo Custom) como
+        cenário .vscn e o acrescenta à lista de cenários.
+        """
+
+        if not getattr(self, 'env', None):
+            self.status_label.config(text="Crie o ambiente primeiro.")
+            return
+        os.makedirs(SCENARIO_DIR, exist_ok=True)
+        path = filedialog.asksaveasfilename(
+            initialdir=SCENARIO_DIR, defaultextension=EXTENSION,
+            filetypes=[("Cenários", "*" + EXTENSION), ("Todos", "*")],
+        )
+        if not path:
+            return
+        name = os.path.splitext(os.path.basename(path))[0]
+        try:
+            save_scenario(path, self.env, name)
+        except OSError as exc:
+            self.status_label.config(text=f"Erro ao salvar: {exc}")
+            return
+        if name not in self.scenarios:
+            self.scenario_menu["menu"].add_command(
+                label=name, command=tk._setit(self.scenario_var, name, self.on_scenario_change))
+        self.scenarios[name] = path
+        self.status_label.config(text=f"Cenário '{name}' salvo em {path}.")
+
     def toggle_custom(self, event):
         """
         Manipula cliques do mouse para adicionar/remover obstáculos e sujeira.
@@ -289,8 +338,8 @@ class VacuumSimulatorGUI:
                 return
             if event.num == 1:  # Botão esquerdo: obstáculo
                 # Se há sujeira, remova a sujeira antes de adicionar obstáculo
-                if self.env.grid[y][x]:
-                    self.env.grid[y][x] = False
+                if self.env.is_dirty(y, x):
+                    self.env.set_dirt(y, x, False)
                     self.custom_dirt.discard((y, x))
                 current = self.env.is_obstacle(y, x)
                 self.env.set_obstacle(y, x, not current)
@@ -303,13 +352,15 @@ class VacuumSimulatorGUI:
                 if self.env.is_obstacle(y, x):
                     self.env.set_obstacle(y, x, False)
                     self.custom_obstacles.discard((y, x))
-                current = self.env.grid[y][x]
-                self.env.grid[y][x] = not current
+                current = self.env.is_dirty(y, x)
+                self.env.set_dirt(y, x, not current)
                 if not current:
                     self.custom_dirt.add((y, x))
                 else:
                     self.custom_dirt.discard((y, x))
-            self.draw_grid()
+            # "Redefinir" volta ao mapa editado
+            self.initial_snapshot = self.env.snapshot()
+            self.update_cells([(y, x)])
 
     def start_simulation(self):
         """Inicializa e executa uma simulação contínua."""
@@ -317,23 +368,28 @@ class VacuumSimulatorGUI:
         if not self.env:
             self.status_label.config(text="Crie o ambiente primeiro.")
             return
+        self.replaying = False
         self.running = True
         if self.agent_type.get() == 'reactive':
             self.agent = ReactiveAgent()
         else:
             self.agent = ModelBasedAgent()
             self.agent.pos = self.env.agent_pos
-        self.measure1 = MeasureCleanPerStep()
-        self.measure2 = MeasureCleanAndMovePositive()
+            self.agent.profiler = self.profiler
+        self.episode_actions = bytearray()
+        self.episode_cleaned = 0
+        self.episode_moves = 0
         self.current_step = 0
         self.started = False
-        self.penalty_score = 0  # inicializa penalidade
         self.simulation_step(self.current_step)
 
     def stop_simulation(self):
-        """Interrompe a simulação em andamento."""
+        """Interrompe a simulação em andamento e cancela o lote, se houver."""
         
         self.running = False
+        self.replaying = False
+        if self.batch_worker is not None:
+            self.batch_worker.cancel()
 
     def simulation_step(self, step):
         """
@@ -343,14 +399,38 @@ class VacuumSimulatorGUI:
         """
 
         if not self.running or step >= self.steps or (self.started and self.env.agent_pos == (0, 0)):
-            final_status = f"Fim! Passos: {step} | Limpo: {self.measure1.score} | Limpo/Penalidade: {self.penalty_score} |  Chegou à posição final: {'Sim' if self.env.agent_pos == (0, 0) else 'Não'}"
+            scores = episode_metrics(self.episode_actions)
+            final_status = f"Fim! Passos: {step} | Limpo: {scores['cleaned']} | Limpo/Penalidade: {scores['penalty']} |  Chegou à posição final: {'Sim' if self.env.agent_pos == (0, 0) else 'Não'}"
             self.status_label.config(text=final_status)
             return
-        self.status_label.config(
-            text=f"Passos: {step} | Limpo: {self.measure1.score} | Limpo/Penalidade: {self.penalty_score}"
-        )
+        self.status_label.config(text=self._live_status(step))
+        highlight = self._advance()
+        self.current_step = step + 1
+        if self.env.agent_pos != (0, 0):
+            self.started = True
+        if highlight:
+            # Remove destaque após 300ms
+            self.root.after(300, lambda: self.update_cells(()))
+            self.root.after(300, lambda: self.simulation_step(self.current_step))
+        else:
+            self.root.after(300, lambda: self.simulation_step(self.current_step))
+
+    def _advance(self):
+        """
+        Executa percepção, decisão, ação, medidas e desenho de um passo.
+        Com um profiler, cada fase é cronometrada.
+
+        Retorna:
+            Posição a destacar (movimento inválido do reativo) ou None
+        """
+
+        profiler = self.profiler
+        clock = time.perf_counter_ns
+        t0 = clock() if profiler else 0
         percept = self.env.get_local_percept()
+        t1 = clock() if profiler else 0
         action = self.agent.select_action(percept)
+        t2 = clock() if profiler else 0
         prev_pos = self.env.agent_pos
 
         # Indicação visual para tentativa de movimento inválido (reativo)
@@ -360,28 +440,35 @@ class VacuumSimulatorGUI:
             highlight = target_pos
 
         # Executa ação normalmente
+        t3 = clock() if profiler else 0
         self.env.execute_action(action)
         if hasattr(self.agent, 'pos'):
             self.agent.pos = self.env.agent_pos
-        cleaned = action == 'CLEAN'
-        moved = action in ['UP', 'DOWN', 'LEFT', 'RIGHT']
-        self.measure1.update(cleaned)
-        self.measure2.update(cleaned, moved)
-        # Penalidade: +1 por movimento, -1 por limpar
-        if cleaned:
-            self.penalty_score -= 1
-        if moved:
-            self.penalty_score += 1
-        self.draw_grid(highlight)
-        self.current_step = step + 1
-        if self.env.agent_pos != (0, 0):
-            self.started = True
-        if highlight:
-            # Remove destaque após 300ms
-            self.root.after(300, lambda: self.draw_grid())
-            self.root.after(300, lambda: self.simulation_step(self.current_step))
+        t4 = clock() if profiler else 0
+        code = ACTION_CODES[action]
+        self.episode_actions.append(code)
+        # Contadores só para o rótulo; as métricas do episódio saem de episode_metrics
+        if code == CLEAN:
+            self.episode_cleaned += 1
         else:
-            self.root.after(300, lambda: self.simulation_step(self.current_step))
+            self.episode_moves += 1
+        t5 = clock() if profiler else 0
+        self.update_cells((prev_pos, self.env.agent_pos), highlight)
+        if profiler:
+            t6 = clock()
+            profiler.record('percept', t0, t1)
+            profiler.record('select_action', t1, t2)
+            profiler.record('execute_action', t3, t4)
+            profiler.record('measures', t4, t5)
+            profiler.record('draw', t5, t6)
+            profiler.count('steps')
+        return highlight
+
+    def _live_status(self, step):
+        """Texto de status durante o episódio, com os contadores incrementais."""
+
+        penalty = self.episode_moves - self.episode_cleaned
+        return f"Passos: {step} | Limpo: {self.episode_cleaned} | Limpo/Penalidade: {penalty}"
 
     def step_once(self):
         """Executa um único passo da simulação e atualiza a interface."""
@@ -395,48 +482,36 @@ class VacuumSimulatorGUI:
             else:
                 self.agent = ModelBasedAgent()
                 self.agent.pos = self.env.agent_pos
-            self.measure1 = MeasureCleanPerStep()
-            self.measure2 = MeasureCleanAndMovePositive()
+                self.agent.profiler = self.profiler
+            self.episode_actions = bytearray()
+            self.episode_cleaned = 0
+            self.episode_moves = 0
             self.current_step = 0
             self.started = False  # reset ao iniciar
-            self.penalty_score = 0  # inicializa penalidade
         if self.started and self.env.agent_pos == (0, 0):
-            final_status = f"Fim! Limpo: {self.measure1.score}, Limpo/Penalidade: {self.penalty_score}, Passos: {self.current_step} | Sujeiras limpas: {self.measure2.cleaned} | Chegou à posição final: {'Sim' if self.env.agent_pos == (0, 0) else 'Não'}"
+            scores = episode_metrics(self.episode_actions, ('cleaned', 'penalty', 'moves'))
+            final_status = f"Fim! Limpo: {scores['cleaned']}, Limpo/Penalidade: {scores['penalty']}, Passos: {self.current_step} | Movimentos: {scores['moves']} | Chegou à posição final: {'Sim' if self.env.agent_pos == (0, 0) else 'Não'}"
             self.status_label.config(text=final_status)
             return
-        percept = self.env.get_local_percept()
-        action = self.agent.select_action(percept)
-        prev_pos = self.env.agent_pos
-
-        highlight = None
-        if self.agent_type.get() == 'reactive' and action != 'CLEAN' and action not in percept['possible_moves']:
-            target_pos = self._get_target_pos(prev_pos, action)
-            highlight = target_pos
-
-        self.env.execute_action(action)
-        if hasattr(self.agent, 'pos'):
-            self.agent.pos = self.env.agent_pos
-        cleaned = action == 'CLEAN'
-        moved = action in ['UP', 'DOWN', 'LEFT', 'RIGHT']
-        self.measure1.update(cleaned)
-        self.measure2.update(cleaned, moved)
-        # Penalidade: +1 por movimento, -1 por limpar
-        if cleaned:
-            self.penalty_score -= 1
-        if moved:
-            self.penalty_score += 1
-        self.draw_grid(highlight)
+        highlight = self._advance()
         self.current_step += 1
         if self.env.agent_pos != (0, 0):
             self.started = True
-        self.status_label.config(
-            text=f"Passos: {self.current_step} | Limpo: {self.measure1.score} | Limpo/Penalidade: {self.penalty_score}"
-        )
+        self.status_label.config(text=self._live_status(self.current_step))
         if highlight:
-            self.root.after(300, lambda: self.draw_grid())
+            self.root.after(300, lambda: self.update_cells(()))
 
     def run_multiple_simulations(self):
-        """Executa múltiplas simulações e coleta estatísticas de desempenho."""
+        """
+        Executa múltiplas simulações do mapa atual em uma thread de fundo.
+
+        Os resultados chegam por uma fila consultada com `root.after`, então
+        a janela continua responsiva e o lote não fica limitado à taxa de
+        quadros. As estatísticas parciais e a barra de progresso são
+        atualizadas a cada consulta; "Parar" cancela o lote. Com "Ver
+        amostra" marcado, uma simulação de amostra é animada no canvas
+        enquanto o lote roda.
+        """
 
         try:
             n = int(self.sim_entry.get())
@@ -446,77 +521,108 @@ class VacuumSimulatorGUI:
         if not self.env:
             self.status_label.config(text="Crie o ambiente primeiro.")
             return
+        if self.batch_worker is not None and self.batch_worker.is_alive():
+            self.status_label.config(text="Já há um lote em execução.")
+            return
 
-        initial_grid = [row[:] for row in self.env.grid]
-        initial_obstacles = [row[:] for row in self.env.obstacles]
-        initial_agent_pos = self.env.agent_pos
-
-        stats = {'penalty': [], 'steps': [], 'cleaned': [], 'final': [], 'all_cleaned': []}
-        agent_type = self.agent_type.get()
-        for i in range(n):
-            self.env.grid = [row[:] for row in initial_grid]
-            self.env.obstacles = [row[:] for row in initial_obstacles]
-            self.env.agent_pos = initial_agent_pos
-            if agent_type == 'reactive':
-                agent = ReactiveAgent()
+        self.batch_agent_type = self.agent_type.get()
+        self.batch_stats = StatsAggregator()
+        self.batch_worker = BatchWorker(self.env, self.batch_agent_type, n, self.steps)
+        self.batch_progress.config(maximum=max(n, 1), value=0)
+        self.batch_label.config(text=f"Simulação 0/{n}")
+        self.batch_started = time.perf_counter()
+        self.batch_worker.start()
+        if self.show_simulations.get():
+            self.start_simulation()
+        self.root.after(self.BATCH_POLL_MS, self._poll_batch)
+
+    def _poll_batch(self):
+        """Consome os resultados do lote e atualiza progresso e estatísticas."""
+
+        worker = self.batch_worker
+        if worker is None:
+            return
+        done = None
+        for message in worker.drain():
+            if message[0] == 'result':
+                self.batch_stats.add(message[2])
             else:
-                agent = ModelBasedAgent()
-                agent.pos = self.env.agent_pos
-            cleaned_count = 0
-            penalty_score = 0
-            current_step = 0
-            started = False
-            max_steps = self.steps
-            while current_step < max_steps:
-                percept = self.env.get_local_percept()
-                action = agent.select_action(percept)
-                prev_pos = self.env.agent_pos
-
-                # Indicação visual de colisão
-                highlight = None
-                if agent_type == 'reactive' and action != 'CLEAN' and action not in percept['possible_moves']:
-                    target_pos = self._get_target_pos(prev_pos, action)
-                    highlight = target_pos
-
-                self.env.execute_action(action)
-                if hasattr(agent, 'pos'):
-                    agent.pos = self.env.agent_pos
-                cleaned = action == 'CLEAN'
-                if cleaned:
-                    cleaned_count += 1
-                    penalty_score -= 1  # penalidade diminui ao limpar
-                if action in ['UP', 'DOWN', 'LEFT', 'RIGHT']:
-                    penalty_score += 1  # penalidade aumenta a cada movimento
-                current_step += 1
-                if self.env.agent_pos != (0, 0):
-                    started = True
-                self.draw_grid(highlight)
-                self.status_label.config(
-                    text=f"Simulação {i+1}/{n} | Passos: {current_step} | Limpo: {cleaned_count} | Penalidade: {penalty_score}"
-                )
-                self.root.update()
-                self.root.after(30)
-                if highlight:
-                    self.root.after(100, lambda: self.draw_grid())
-                if started and self.env.agent_pos == (0, 0):
-                    break
-            stats['penalty'].append(penalty_score)
-            stats['steps'].append(current_step)
-            stats['cleaned'].append(cleaned_count)
-            stats['final'].append(1 if self.env.agent_pos == (0, 0) else 0)
-            stats['all_cleaned'].append(1 if self.env.is_clean() else 0)
-
-        def avg(lst): return sum(lst)/len(lst) if lst else 0
-        def pct(lst): return 100*sum(lst)/len(lst) if lst else 0
-
-        msg = f"Resultados após {n} simulações ({'Reativo' if agent_type=='reactive' else 'Modelo'}):\n"
-        msg += f"  Média penalidade: {avg(stats['penalty']):.2f}\n"
-        msg += f"  Média passos: {avg(stats['steps']):.2f}\n"
-        msg += f"  Média sujeiras limpas: {avg(stats['cleaned']):.2f}\n"
-        msg += f"  % chegou ao final: {pct(stats['final']):.1f}%\n"
-        msg += f"  % limpou tudo: {pct(stats['all_cleaned']):.1f}%\n"
-
-        self.status_label.config(text=msg)
+                done = message
+        stats = self.batch_stats
+        count = stats.count
+        stats.elapsed = done[2] if done else time.perf_counter() - self.batch_started
+        self.batch_progress.config(value=count)
+        if done is None:
+            text = f"Simulação {count}/{worker.n}\n" + format_summary(stats, self.batch_agent_type)
+            self.batch_label.config(text=text)
+            self.root.after(self.BATCH_POLL_MS, self._poll_batch)
+            return
+        prefix = "Lote cancelado. " if done[1] else ""
+        self.batch_label.config(text=prefix + format_summary(stats, self.batch_agent_type))
+        self.batch_worker = None
+
+    def open_trace(self):
+        """Pede um arquivo de trace e inicia a reprodução."""
+
+        path = filedialog.askopenfilename(filetypes=[("Traces", "*.vtrace"), ("Todos", "*")])
+        if path:
+            self.load_trace(path)
+
+    def load_trace(self, path):
+        """
+        Carrega um trace gravado e o reproduz no canvas, sem agente.
+
+        Args:
+            path: Caminho do arquivo gravado por TraceRecorder
+        """
+
+        try:
+            trace = Trace.load(path)
+        except (OSError, ValueError) as exc:
+            self.status_label.config(text=f"Trace inválido: {exc}")
+            return
+        self.running = False
+        self.replay = TraceReplay(trace)
+        self.env = self.replay.env
+        self.initial_snapshot = self.replay.initial
+        self.width = trace.width
+        self.height = trace.height
+        self.agent = None
+        self.canvas.config(width=self.width*self.CELL_SIZE, height=self.height*self.CELL_SIZE)
+        self.trace_scale.config(to=len(trace))
+        self.trace_scale.set(0)
+        self.draw_grid()
+        self.replaying = True
+        self._replay_step()
+
+    def _replay_step(self):
+        """Aplica a próxima ação do trace e agenda a seguinte."""
+
+        replay = self.replay
+        if not self.replaying or replay is None or self.env is not replay.env:
+            return
+        total = len(replay.actions)
+        result = replay.step()
+        if result is None:
+            self.replaying = False
+            self.status_label.config(text=f"Fim do trace! Passos: {total} | Sujeiras restantes: {self.env.dirt_count()}")
+            return
+        action, cells = result
+        self.update_cells(cells)
+        self.trace_scale.set(replay.step_index)
+        self.status_label.config(text=f"Trace: passo {replay.step_index}/{total} | Ação: {action}")
+        self.root.after(self.REPLAY_MS, self._replay_step)
+
+    def on_trace_seek(self, value):
+        """Posiciona a reprodução no passo escolhido na barra."""
+
+        replay = self.replay
+        if replay is None or int(value) == replay.step_index:
+            return
+        replay.seek(int(value))
+        self.env = replay.env
+        self.draw_grid()
+        self.status_label.config(text=f"Trace: passo {replay.step_index}/{len(replay.actions)}")
 
     def _get_target_pos(self, pos, action):
         """
@@ -540,59 +646,120 @@ class VacuumSimulatorGUI:
     def draw_grid(self, highlight=None):
         """
         Renderiza a grade do ambiente na interface gráfica.
-        
+
+        Os retângulos das células e o agente são criados uma única vez por
+        tamanho de grade; depois, só as células cuja cor mudou são
+        reconfiguradas. Use após mudanças em muitas células (novo ambiente,
+        redefinição); a cada passo, `update_cells` basta.
+
         Args:
             highlight: Posição opcional (y, x) para destacar com cor diferente
         """
 
-        self.canvas.delete("all")
         if not hasattr(self, 'env') or self.env is None:
+            self.canvas.delete("all")
+            self.canvas_shape = None
+            return
+        if self.canvas_shape != (self.env.height, self.env.width):
+            self._build_canvas_items()
+        for y in range(self.env.height):
+            for x in range(self.env.width):
+                self._paint_cell(y, x, highlight)
+        self.highlight = highlight
+        self._move_agent()
+
+    def update_cells(self, cells, highlight=None):
+        """
+        Atualiza apenas as células indicadas (e o destaque anterior) e move o
+        agente, sem percorrer a grade: o custo não depende do tamanho dela.
+
+        Args:
+            cells: Posições (y, x) que podem ter mudado
+            highlight: Posição opcional (y, x) para destacar com cor diferente
+        """
+
+        if not hasattr(self, 'env') or self.env is None or self.canvas_shape != (self.env.height, self.env.width):
+            self.draw_grid(highlight)
+            return
+        dirty = set(cells)
+        for pos in (self.highlight, highlight):
+            if pos is not None:
+                dirty.add(pos)
+        for y, x in dirty:
+            if 0 <= y < self.env.height and 0 <= x < self.env.width:
+                self._paint_cell(y, x, highlight)
+        self.highlight = highlight
+        self._move_agent()
+
+    def _build_canvas_items(self):
+        """Cria os itens do canvas (um retângulo por célula e o agente)."""
+
+        self.canvas.delete("all")
+        size = self.CELL_SIZE
+        self.cell_items = []
+        self.cell_colors = []
+        for y in range(self.env.height):
+            items = []
+            for x in range(self.env.width):
+                items.append(self.canvas.create_rectangle(
+                    x*size, y*size, x*size+size, y*size+size, fill="white", outline="black"
+                ))
+            self.cell_items.append(items)
+            self.cell_colors.append(["white"] * self.env.width)
+        # Criado por último para ficar acima das células
+        self.agent_item = self.canvas.create_oval(5, 5, size-5, size-5, fill="blue")
+        self.agent_drawn_pos = (0, 0)
+        self.canvas_shape = (self.env.height, self.env.width)
+
+    def _paint_cell(self, y, x, highlight):
+        """Reconfigura a cor de uma célula se ela mudou."""
+
+        if highlight == (y, x):
+            color = "red"
+        elif self.env.is_obstacle(y, x):
+            color = "gray"
+        elif self.env.is_dirty(y, x):
+            color = "brown"
+        else:
+            color = "white"
+        if self.cell_colors[y][x] != color:
+            self.cell_colors[y][x] = color
+            self.canvas.itemconfig(self.cell_items[y][x], fill=color)
+
+    def _move_agent(self):
+        """Move o item do agente para a posição atual, se ela mudou."""
+
+        if self.env.agent_pos == self.agent_drawn_pos:
             return
-        for y in range(self.height):
-            for x in range(self.width):
-                cell_x = x * self.CELL_SIZE
-                cell_y = y * self.CELL_SIZE
-                if highlight == (y, x):
-                    color = "red"
-                elif self.env.is_obstacle(y, x):
-                    color = "gray"
-                elif self.env.grid[y][x]:
-                    color = "brown"
-                else:
-                    color = "white"
-                self.canvas.create_rectangle(cell_x, cell_y, cell_x+self.CELL_SIZE, cell_y+self.CELL_SIZE, fill=color, outline="black")
         ay, ax = self.env.agent_pos
-        self.canvas.create_oval(
-            ax*self.CELL_SIZE+5, ay*self.CELL_SIZE+5,
-            ax*self.CELL_SIZE+self.CELL_SIZE-5, ay*self.CELL_SIZE+self.CELL_SIZE-5,
-            fill="blue"
-        )
+        size = self.CELL_SIZE
+        self.canvas.coords(self.agent_item, ax*size+5, ay*size+5, ax*size+size-5, ay*size+size-5)
+        self.agent_drawn_pos = self.env.agent_pos
 
     def reset_scenario(self):
         """Restaura o cenário ao estado inicial."""
 
         scenario_name = self.scenario_var.get()
-        if scenario_name in ["Cenário 1", "Cenário 2", "Cenário 3"]:
+        if scenario_name not in ("Aleatório", "Custom") and scenario_name in self.scenarios:
             self.load_scenario(scenario_name)
             self.agent = None
-            self.measure1 = None
-            self.measure2 = None
+            self.episode_actions = None
             self.running = False
             self.current_step = 0
             self.started = False
-            self.penalty_score = 0
             self.status_label.config(text="Cenário redefinido.")
-        elif self.initial_grid is not None and self.initial_obstacles is not None and self.initial_agent_pos is not None:
-            self.env.grid = [row[:] for row in self.initial_grid]
-            self.env.obstacles = [row[:] for row in self.initial_obstacles]
-            self.env.agent_pos = self.initial_agent_pos
+        elif self.initial_snapshot is not None:
+            snapshot = self.initial_snapshot
+            try:
+                self.env.restore(snapshot)
+            except ValueError:
+                # O ambiente atual tem outro armazenamento (ex.: esparso x listas)
+                self.env = snapshot.env_class.from_snapshot(snapshot)
             self.agent = None
-            self.measure1 = None
-            self.measure2 = None
+            self.episode_actions = None
             self.running = False
             self.current_step = 0
             self.started = False
-            self.penalty_score = 0
             self.draw_grid()
             self.status_label.config(text="Cenário redefinido.")
         else:
@@ -602,18 +769,24 @@ class VacuumSimulatorGUI:
             else:
                 self.create_env()
             self.agent = None
-            self.measure1 = None
-            self.measure2 = None
+            self.episode_actions = None
             self.running = False
             self.current_step = 0
             self.started = False
-            self.penalty_score = 0
             self.status_label.config(text="Cenário redefinido.")
 
-def main():
-    """Inicializa e executa a interface do simulador."""
+def main(profiler=None, trace_path=None):
+    """
+    Inicializa e executa a interface do simulador.
+
+    Args:
+        profiler: Profiler opcional repassado à interface
+        trace_path: Trace opcional reproduzido ao abrir a janela
+    """
 
-    gui = VacuumSimulatorGUI()
+    gui = VacuumSimulatorGUI(profiler)
+    if trace_path:
+        gui.load_trace(trace_path)
     gui.root.mainloop()
 
 if __name__ == "__main__":
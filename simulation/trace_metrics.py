@@ -0,0 +1,63 @@
+import glob
+import os
+from evaluation.metrics import METRICS, EpisodeBatch, compute_metrics
+from simulation.traces import Trace
+
+# Métricas calculadas sobre traces já gravados, sem simular de novo.
+
+
+def load_traces(paths):
+    """
+    Carrega traces de arquivos ou diretórios (todos os .vtrace de cada um).
+
+    Retorna:
+        Lista de (caminho, Trace) em ordem de nome
+    """
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '*.vtrace'))))
+        else:
+            files.append(path)
+    return [(path, Trace.load(path)) for path in files]
+
+
+def format_table(names, values, labels):
+    """
+    Formata uma tabela com uma linha por episódio e a média no fim.
+
+    Args:
+        names: Métricas (colunas)
+        values: Dict nome -> array com um valor por episódio
+        labels: Rótulo de cada linha
+    """
+
+    width = max([len(label) for label in labels] + [len("média")])
+    lines = [f"{'':<{width}}  " + "  ".join(f"{name:>14}" for name in names)]
+    for i, label in enumerate(labels):
+        lines.append(f"{label:<{width}}  " + "  ".join(f"{values[name][i]:>14}" for name in names))
+    if labels:
+        lines.append(f"{'média':<{width}}  " + "  ".join(f"{values[name].mean():>14.2f}" for name in names))
+    return "\n".join(lines) + "\n"
+
+
+def add_arguments(parser):
+    """Registra as opções de linha de comando das métricas sobre traces."""
+
+    parser.add_argument('paths', nargs='+', help="Traces (.vtrace) ou diretórios gravados com 'batch --record'")
+    parser.add_argument('-m', '--metric', action='append', choices=sorted(METRICS), default=None,
+                        help="Métrica a calcular (pode repetir; padrão: todas por episódio)")
+
+
+def main(args):
+    """Calcula as métricas pedidas sobre os traces e imprime a tabela."""
+
+    traces = load_traces(args.paths)
+    if not traces:
+        raise SystemExit("Nenhum trace encontrado")
+    batch = EpisodeBatch.from_traces([trace for _, trace in traces])
+    names = args.metric or [name for name, metric in METRICS.items() if not metric.per_step]
+    values = compute_metrics(batch, names)
+    names = [name for name in names if not METRICS[name].per_step]
+    print(format_table(names, values, [os.path.basename(path) for path, _ in traces]), end="")
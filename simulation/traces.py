@@ -0,0 +1,335 @@
+import json
+import struct
+import numpy as np
+from environment.grid_environment import GridEnvironment
+from environment.vec_environment import ACTIONS, ACTION_CODES
+
+# Formato do arquivo de trace (inteiros little-endian):
+#
+#   cabeçalho   'VTRC', versão (u8), largura, altura, y0, x0, passos,
+#               intervalo de keyframes, nº de keyframes (u32 cada)
+#   metadados   tamanho (u32) + JSON em UTF-8 (semente, agente...)
+#   obstáculos  bitmap altura*largura, 1 bit por célula (np.packbits)
+#   sujeira     bitmap inicial, mesmo formato
+#   ações       códigos 0-4 (ordem de ACTIONS) com 3 bits cada
+#   keyframes   passo, y, x, nº de células limpas (u32 cada) seguido das
+#               células (y, x) limpas desde o keyframe anterior (u32 cada)
+#
+# A sujeira só muda quando o agente limpa, então um keyframe guarda apenas a
+# posição do agente e as células limpas no intervalo: gravar custa O(1) por
+# passo e o arquivo cresce com o número de limpezas, não com a área da grade.
+
+MAGIC = b'VTRC'
+VERSION = 1
+HEADER = struct.Struct('<4sB7I')
+KEYFRAME = struct.Struct('<4I')
+
+
+def pack_bitmap(grid):
+    """Empacota uma matriz booleana em 1 bit por célula."""
+
+    return np.packbits(np.asarray(grid, dtype=bool).reshape(-1)).tobytes()
+
+
+def unpack_bitmap(data, width, height):
+    """Desempacota um bitmap de `pack_bitmap` em um array (altura, largura)."""
+
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=width * height)
+    return bits.reshape(height, width).astype(bool)
+
+
+def pack_actions(codes):
+    """
+    Empacota códigos de ação (0-4) com 3 bits cada.
+
+    Args:
+        codes: Sequência de códigos (bytes, lista ou array)
+
+    Retorna:
+        bytes com ceil(3 * n / 8) bytes
+    """
+
+    codes = np.frombuffer(bytes(codes), dtype=np.uint8)
+    bits = np.unpackbits(codes[:, None], axis=1)[:, 5:]
+    return np.packbits(bits.reshape(-1)).tobytes()
+
+
+def unpack_actions(data, n):
+    """Desempacota `n` códigos de ação gravados por `pack_actions`."""
+
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=3 * n).reshape(n, 3)
+    return (bits[:, 0] << 2 | bits[:, 1] << 1 | bits[:, 2]).astype(np.uint8)
+
+
+class Trace:
+    """
+    Episódio gravado: mapa inicial, metadados, ações e keyframes.
+
+    Atributos:
+        width, height: Dimensões da grade
+        start: Posição inicial do agente (y, x)
+        obstacles, dirt: Arrays booleanos (altura, largura) do estado inicial
+        actions: Array uint8 com o código de cada ação (índice em ACTIONS)
+        keyframes: Lista de (passo, (y, x), células limpas no intervalo)
+        keyframe_interval: Passos entre keyframes consecutivos
+        meta: Dict de metadados (semente, agente...)
+    """
+
+    def __init__(self, width, height, start, obstacles, dirt, actions, keyframes,
+                 keyframe_interval, meta=None):
+        self.width = width
+        self.height = height
+        self.start = start
+        self.obstacles = obstacles
+        self.dirt = dirt
+        self.actions = actions
+        self.keyframes = keyframes
+        self.keyframe_interval = keyframe_interval
+        self.meta = meta or {}
+
+    def __len__(self):
+        return len(self.actions)
+
+    def initial_env(self):
+        """
+        Retorna:
+            GridEnvironment novo no estado inicial gravado
+        """
+
+        return GridEnvironment.from_arrays(self.dirt, self.obstacles, self.start)
+
+    def to_bytes(self):
+        """Serializa o trace no formato binário descrito no topo do módulo."""
+
+        meta = json.dumps(self.meta).encode('utf-8')
+        parts = [
+            HEADER.pack(MAGIC, VERSION, self.width, self.height, self.start[0], self.start[1],
+                        len(self.actions), self.keyframe_interval, len(self.keyframes)),
+            struct.pack('<I', len(meta)), meta,
+            pack_bitmap(self.obstacles), pack_bitmap(self.dirt),
+            pack_actions(self.actions),
+        ]
+        for step, (y, x), cleaned in self.keyframes:
+            parts.append(KEYFRAME.pack(step, y, x, len(cleaned)))
+            parts.append(np.asarray(cleaned, dtype='<u4').reshape(-1).tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Reconstrói um trace serializado por `to_bytes`."""
+
+        magic, version, width, height, y0, x0, steps, interval, n_keyframes = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Arquivo não é um trace de episódio")
+        if version != VERSION:
+            raise ValueError(f"Versão de trace não suportada: {version}")
+        offset = HEADER.size
+        (meta_len,) = struct.unpack_from('<I', data, offset)
+        offset += 4
+        meta = json.loads(data[offset:offset + meta_len].decode('utf-8'))
+        offset += meta_len
+        bitmap_len = (width * height + 7) // 8
+        obstacles = unpack_bitmap(data[offset:offset + bitmap_len], width, height)
+        offset += bitmap_len
+        dirt = unpack_bitmap(data[offset:offset + bitmap_len], width, height)
+        offset += bitmap_len
+        actions_len = (3 * steps + 7) // 8
+        actions = unpack_actions(data[offset:offset + actions_len], steps)
+        offset += actions_len
+        keyframes = []
+        for _ in range(n_keyframes):
+            step, y, x, n_cleaned = KEYFRAME.unpack_from(data, offset)
+            offset += KEYFRAME.size
+            cells = np.frombuffer(data, dtype='<u4', count=2 * n_cleaned, offset=offset)
+            offset += 8 * n_cleaned
+            keyframes.append((step, (y, x), [tuple(cell) for cell in cells.reshape(-1, 2).tolist()]))
+        return cls(width, height, (y0, x0), obstacles, dirt, actions, keyframes, interval, meta)
+
+    def save(self, path):
+        """Grava o trace em `path`."""
+
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """Lê um trace gravado por `save`."""
+
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+class TraceRecorder:
+    """
+    Grava as ações de um episódio à medida que são executadas.
+
+    O estado inicial é copiado na criação; depois, `record` só acrescenta um
+    byte por passo e, a cada `keyframe_interval` passos, a posição do agente.
+    """
+
+    def __init__(self, env, keyframe_interval=256, **meta):
+        """
+        Args:
+            env: Ambiente no estado inicial, antes do primeiro passo
+            keyframe_interval: Passos entre keyframes (custo máximo de um seek)
+            **meta: Metadados gravados no arquivo (ex.: seed, agent)
+        """
+
+        self.env = env
+        self.width = env.width
+        self.height = env.height
+        self.start = env.agent_pos
+        self.dirt, self.obstacles = env.to_arrays()
+        self.keyframe_interval = keyframe_interval
+        self.meta = meta
+        self.codes = bytearray()
+        self.keyframes = []
+        self.cleaned = []  # células limpas desde o último keyframe
+
+    def record(self, action):
+        """Registra uma ação logo depois de o ambiente executá-la."""
+
+        self.codes.append(ACTION_CODES[action])
+        if action == 'CLEAN':
+            self.cleaned.append(self.env.agent_pos)
+        if len(self.codes) % self.keyframe_interval == 0:
+            self.keyframes.append((len(self.codes), self.env.agent_pos, self.cleaned))
+            self.cleaned = []
+
+    def trace(self):
+        """
+        Retorna:
+            Trace com tudo o que foi gravado até agora
+        """
+
+        keyframes = list(self.keyframes)
+        # Um keyframe final guarda as limpezas depois do último periódico
+        if self.cleaned or not keyframes or keyframes[-1][0] != len(self.codes):
+            keyframes.append((len(self.codes), self.env.agent_pos, list(self.cleaned)))
+        actions = np.frombuffer(bytes(self.codes), dtype=np.uint8)
+        return Trace(self.width, self.height, self.start, self.obstacles, self.dirt, actions,
+                     keyframes, self.keyframe_interval, dict(self.meta))
+
+    def save(self, path):
+        """Grava o trace em `path`."""
+
+        self.trace().save(path)
+
+
+class TraceReplay:
+    """
+    Reproduz um trace aplicando as ações gravadas a um GridEnvironment,
+    sem chamar nenhum agente.
+
+    `seek(n)` parte do keyframe anterior a `n`: aplica as células limpas dos
+    keyframes ao mapa inicial, posiciona o agente e executa no máximo
+    `keyframe_interval` ações.
+    """
+
+    def __init__(self, trace):
+        """
+        Args:
+            trace: Trace carregado ou gravado
+        """
+
+        self.trace = trace
+        self.env = trace.initial_env()
+        self.initial = self.env.snapshot()
+        self.actions = [ACTIONS[code] for code in trace.actions.tolist()]
+        self.step_index = 0
+
+    def reset(self):
+        """Volta ao estado inicial (passo 0)."""
+
+        self.env.restore(self.initial)
+        self.step_index = 0
+
+    def done(self):
+        return self.step_index >= len(self.actions)
+
+    def step(self):
+        """
+        Aplica a próxima ação gravada.
+
+        Retorna:
+            (ação, células que podem ter mudado) ou None no fim do trace
+        """
+
+        if self.done():
+            return None
+        action = self.actions[self.step_index]
+        prev_pos = self.env.agent_pos
+        self.env.execute_action(action)
+        self.step_index += 1
+        return action, (prev_pos, self.env.agent_pos)
+
+    def seek(self, n):
+        """
+        Posiciona a reprodução logo depois da ação `n` (0 = estado inicial).
+
+        Args:
+            n: Passo de destino, limitado ao tamanho do trace
+        """
+
+        n = max(0, min(n, len(self.actions)))
+        if not (self.step_index <= n <= self.step_index + self.trace.keyframe_interval):
+            self.reset()
+            for step, pos, cleaned in self.trace.keyframes:
+                if step > n:
+                    break
+                for y, x in cleaned:
+                    self.env.set_dirt(y, x, False)
+                self.env.agent_pos = pos
+                self.step_index = step
+        execute = self.env.execute_action
+        for action in self.actions[self.step_index:n]:
+            execute(action)
+        self.step_index = n
+
+    def run(self):
+        """
+        Reproduz até o fim do trace.
+
+        Retorna:
+            Ambiente no estado final
+        """
+
+        self.seek(len(self.actions))
+        return self.env
+
+
+def describe(trace, replay):
+    """
+    Retorna:
+        Texto com os metadados do trace e o estado atual da reprodução
+    """
+
+    counts = {action: 0 for action in ACTIONS}
+    for code, n in enumerate(np.bincount(trace.actions, minlength=len(ACTIONS)).tolist()):
+        counts[ACTIONS[code]] = n
+    env = replay.env
+    msg = f"Trace {trace.width}x{trace.height}, {len(trace)} passos, início em {trace.start}\n"
+    for key, value in sorted(trace.meta.items()):
+        msg += f"  {key}: {value}\n"
+    msg += "  Ações: " + ", ".join(f"{action}={n}" for action, n in counts.items()) + "\n"
+    msg += f"  Keyframes: {len(trace.keyframes)} (a cada {trace.keyframe_interval} passos)\n"
+    msg += f"Passo {replay.step_index}: agente em {env.agent_pos}, sujeiras restantes: {env.dirt_count()}\n"
+    return msg
+
+
+def add_arguments(parser):
+    """Registra as opções de linha de comando da reprodução de traces."""
+
+    parser.add_argument('file', help="Arquivo de trace gravado com 'batch --record'")
+    parser.add_argument('--step', type=int, default=None,
+                        help="Passo onde posicionar a reprodução (padrão: fim do trace)")
+    parser.add_argument('--gui', action='store_true', help="Reproduz o trace na interface gráfica")
+
+
+def main(args):
+    """Mostra o estado de um trace no passo pedido, sem interface gráfica."""
+
+    trace = Trace.load(args.file)
+    replay = TraceReplay(trace)
+    replay.seek(len(trace) if args.step is None else args.step)
+    print(describe(trace, replay), end="")
@@ -0,0 +1,87 @@
+import time
+import numpy as np
+from environment.vec_environment import VecGridEnvironment, CLEAN
+from agents.vec_reactive_agent import VecReactiveAgent
+from evaluation.statistics import StatsAggregator
+
+# Número de ambientes simulados por lote vetorizado; limita a memória usada
+# em grades grandes sem perder a vetorização.
+DEFAULT_BATCH_SIZE = 10000
+
+
+def run_vec_episodes(env, agent, max_steps=100):
+    """
+    Executa uma simulação em cada ambiente de um VecGridEnvironment.
+
+    Segue as regras de `headless.run_episode`: cada ambiente termina ao
+    atingir `max_steps` ou quando o agente retorna a (0, 0) depois de ter
+    saído de lá; ambientes terminados deixam de receber ações.
+
+    Args:
+        env: VecGridEnvironment com K ambientes
+        agent: Agente vetorizado (ex.: VecReactiveAgent)
+        max_steps: Número máximo de passos
+
+    Retorna:
+        Dict de arrays (K,) com penalty, steps, cleaned, final e all_cleaned
+    """
+
+    k = env.num_envs
+    penalty = np.zeros(k, dtype=np.int64)
+    steps = np.zeros(k, dtype=np.int64)
+    cleaned = np.zeros(k, dtype=np.int64)
+    started = np.zeros(k, dtype=bool)
+    active = np.ones(k, dtype=bool)
+    percepts = env.get_local_percepts()
+    for _ in range(max_steps):
+        if not active.any():
+            break
+        actions = agent.select_actions(percepts)
+        clean = active & (actions == CLEAN)
+        moved = active & (actions != CLEAN)
+        percepts = env.step(actions, active)
+        # Penalidade: +1 por movimento, -1 por limpar
+        cleaned += clean
+        penalty += moved
+        penalty -= clean
+        steps += active
+        home = env.at_home()
+        started |= active & ~home
+        active &= ~(started & home)
+    return {
+        'penalty': penalty,
+        'steps': steps,
+        'cleaned': cleaned,
+        'final': env.at_home().astype(np.int64),
+        'all_cleaned': env.is_clean().astype(np.int64),
+    }
+
+
+def run_vec_batch(n, width=4, height=4, dirt_prob=0.3, obstacle_prob=0.15, max_steps=100,
+                  seed=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Executa N simulações do agente reativo em lotes vetorizados.
+
+    Args:
+        n: Número de simulações (mapas aleatórios)
+        width: Largura do ambiente
+        height: Altura do ambiente
+        dirt_prob: Probabilidade de sujeira por célula
+        obstacle_prob: Probabilidade de obstáculo por célula
+        max_steps: Número máximo de passos por simulação
+        seed: Semente do numpy.random.Generator; aleatório se None
+        batch_size: Número de ambientes simulados ao mesmo tempo
+
+    Retorna:
+        StatsAggregator com as estatísticas do lote e `elapsed` (segundos)
+    """
+
+    rng = np.random.default_rng(seed)
+    stats = StatsAggregator()
+    start = time.perf_counter()
+    for offset in range(0, n, batch_size):
+        k = min(batch_size, n - offset)
+        env = VecGridEnvironment(k, width, height, dirt_prob, obstacle_prob=obstacle_prob, rng=rng)
+        stats.add_arrays(run_vec_episodes(env, VecReactiveAgent(rng), max_steps))
+    stats.elapsed = time.perf_counter() - start
+    return stats